@@ -0,0 +1,113 @@
+from module_registry import MODULE_NAMES
+
+
+class ModuleResult:
+    """Egy elemző modul eredménye: pontszám, problémák, javaslatok és a modul saját mezői
+
+    Az issues / recommendations None, ha a modul nem adta vissza (pl. betöltési
+    hibánál nincs javaslat lista), így a to_dict() ugyanazt a szerkezetet adja.
+    """
+
+    __slots__ = ('name', 'score', 'issues', 'recommendations', 'details')
+
+    def __init__(self, name, score=0, issues=None, recommendations=None, details=None):
+        self.name = name
+        self.score = score
+        self.issues = issues
+        self.recommendations = recommendations
+        self.details = details or {}
+
+    @classmethod
+    def from_dict(cls, name, data):
+        details = dict(data)
+        return cls(
+            name,
+            details.pop('score', 0),
+            details.pop('issues', None),
+            details.pop('recommendations', None),
+            details
+        )
+
+    def to_dict(self):
+        data = {'score': self.score}
+        data.update(self.details)
+        if self.issues is not None:
+            data['issues'] = self.issues
+        if self.recommendations is not None:
+            data['recommendations'] = self.recommendations
+        return data
+
+    def get(self, key, default=None):
+        """Olvasás a régi dict kulcsokkal (export és sablonok)"""
+        if key in ('score', 'issues', 'recommendations'):
+            value = getattr(self, key)
+            return default if value is None else value
+        return self.details.get(key, default)
+
+
+class AnalysisResult:
+    """Teljes elemzés kompakt rekordja; a dokumentumra és a nyers törzsre nem hivatkozik"""
+
+    __slots__ = (
+        'url', 'domain', 'analyzed_at', 'fetch', 'parser', 'timings', 'modules', 'total_score',
+        'grade', 'analysis_time', 'network_timeline', 'seo_recommendations', 'improvement_potential'
+    )
+
+    def __init__(self, url, domain, analyzed_at, fetch=None, parser=None, timings=None, modules=None,
+                 total_score=0, grade='', analysis_time=0, network_timeline=None,
+                 seo_recommendations=None, improvement_potential=None):
+        self.url = url
+        self.domain = domain
+        self.analyzed_at = analyzed_at
+        self.fetch = fetch
+        self.parser = parser
+        self.timings = timings
+        # Modulnév -> ModuleResult, MODULE_NAMES sorrendben
+        self.modules = modules or {}
+        self.total_score = total_score
+        self.grade = grade
+        self.analysis_time = analysis_time
+        self.network_timeline = network_timeline
+        self.seo_recommendations = seo_recommendations
+        self.improvement_potential = improvement_potential
+
+    @classmethod
+    def from_dict(cls, analysis):
+        """get_comprehensive_analysis() eredményéből"""
+        modules = {
+            name: ModuleResult.from_dict(name, analysis[name])
+            for name in MODULE_NAMES if name in analysis
+        }
+        fields = {name: analysis[name] for name in cls.__slots__ if name != 'modules' and name in analysis}
+        return cls(modules=modules, **fields)
+
+    def to_dict(self):
+        """JSON válaszhoz, a get_comprehensive_analysis() szerkezetével"""
+        data = {
+            'url': self.url,
+            'domain': self.domain,
+            'analyzed_at': self.analyzed_at,
+            'fetch': self.fetch,
+            'parser': self.parser,
+            'timings': self.timings,
+        }
+        for name, module in self.modules.items():
+            data[name] = module.to_dict()
+        data.update({
+            'total_score': self.total_score,
+            'grade': self.grade,
+            'analysis_time': self.analysis_time,
+            'network_timeline': self.network_timeline,
+            'seo_recommendations': self.seo_recommendations,
+            'improvement_potential': self.improvement_potential,
+        })
+        return data
+
+    def get(self, key, default=None):
+        """Olvasás a régi dict kulcsokkal: modulnévre a ModuleResult, egyébként a mező"""
+        if key in self.modules:
+            return self.modules[key]
+        if key in self.__slots__ and key != 'modules':
+            value = getattr(self, key)
+            return default if value is None else value
+        return default
@@ -5,14 +5,27 @@ import io
 import re
 import urllib.parse
 from datetime import datetime
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, Response, request, jsonify, send_file, stream_with_context
 from flask_cors import CORS
 import requests
-from bs4 import BeautifulSoup
 import validators
 import warnings
 from urllib.robotparser import RobotFileParser
+import threading
 import time
+from analysis_result import AnalysisResult
+from batch_engine import analyze_batch, get_shared_executor
+from charset import decode_html
+from http_client import get_http_client
+from keyword_matcher import KeywordMatcher, load_keywords
+from module_registry import DEFAULT_PARALLEL_MODULES, build_plan, parse_module_names, run_plan
+from network_probes import NetworkProbes, NetworkTimeline
+from parser_backends import HEAD_END_RE, get_parser_backend, requires_tags
+from sitemap_parser import SitemapCrawler
+from structured_data import StructuredData
+from text_layer import TextLayer
+from text_stats import TextStats, stop_words_for, zone_density
+from warc_replay import open_warc_archive
 
 # SSL figyelmeztetések kikapcsolása
 warnings.filterwarnings('ignore', message='Unverified HTTPS request')
@@ -20,75 +33,173 @@ warnings.filterwarnings('ignore', message='Unverified HTTPS request')
 app = Flask(__name__)
 CORS(app)
 
+# Kulcsszó szótárak: az automaták importkor egyszer épülnek, a keresés szó elején kezdődő találatokat ad
+CTA_MATCHER = KeywordMatcher(['kattints', 'látogass', 'tudj meg többet', 'olvass tovább', 'fedezd fel'])
+GENERIC_LINK_TEXTS = frozenset(['kattints ide', 'tovább', 'itt', 'link', 'oldalra'])
+# Magyar városok és régiók (példa); SEO_CITY_DICTIONARY-vel teljes településlista tölthető be
+HUNGARIAN_CITIES = [
+    'budapest', 'debrecen', 'szeged', 'miskolc', 'pécs', 'győr', 'nyíregyháza',
+    'kecskemét', 'székesfehérvár', 'szombathely', 'szolnok', 'tatabánya'
+]
+if os.environ.get('SEO_CITY_DICTIONARY'):
+    HUNGARIAN_CITIES = load_keywords(os.environ['SEO_CITY_DICTIONARY'])
+CITY_MATCHER = KeywordMatcher(HUNGARIAN_CITIES)
+ADDRESS_MATCHER = KeywordMatcher(['utca', 'út', 'tér', 'körút', 'köz', 'sor', 'sétány'])
+PRODUCT_INDICATOR_MATCHER = KeywordMatcher([
+    'ár', 'vásárlás', 'kosár', 'szállítás', 'termék', 'bolt', 'shop',
+    'webshop', 'áruház', 'kedvezmény', 'akció', 'ft', 'forint'
+])
+
+DEFAULT_PORTS = {'http': ':80', 'https': ':443'}
+
+def normalize_url(url):
+    """Összehasonlítható URL: kisbetűs séma és host, alapértelmezett port és fragment nélkül; nem http(s) esetén None"""
+    parts = urllib.parse.urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    if scheme not in DEFAULT_PORTS or not parts.netloc:
+        return None
+    netloc = parts.netloc.lower()
+    if netloc.endswith(DEFAULT_PORTS[scheme]):
+        netloc = netloc[:-len(DEFAULT_PORTS[scheme])]
+    return urllib.parse.urlunsplit((scheme, netloc, parts.path or '/', parts.query, ''))
+
 class AdvancedSEOAnalyzer:
-    def __init__(self, url):
+    def __init__(self, url, http_client=None, max_body_bytes=None, download_deadline=None, warc=None, parser=None,
+                 parallel_modules=None, collect_links=False):
         self.url = url
         self.soup = None
+        self.index = None
+        # A JSON-LD blokkok feldolgozva, első használatkor (get_structured_data)
+        self.structured_data = None
+        # A látható szöveg, első használatkor (get_text_layer)
+        self.text_layer = None
         self.response = None
         self.domain = urllib.parse.urlparse(url).netloc
         self.start_time = None
-        
-    def fetch_page(self):
-        """Weboldal letöltése és BeautifulSoup objektum létrehozása"""
+        # WARC fájl vagy könyvtár megadásakor az oldal az archívumból töltődik be, hálózat nélkül
+        if warc is not None and http_client is None:
+            http_client = open_warc_archive(warc)
+        self.http = http_client or get_http_client()
+        self.timeline = NetworkTimeline()
+        self.probes = None
+        self.sitemap_crawler = None
+        self.max_body_bytes = max_body_bytes
+        self.download_deadline = download_deadline
+        # html.parser / lxml / lxml-native / stream (alapértelmezés: SEO_PARSER_BACKEND)
+        self.parser = get_parser_backend(parser)
+        # Független modulok párhuzamosan a közös szálkészleten (alapértelmezés: SEO_PARALLEL_MODULES)
+        self.parallel_modules = DEFAULT_PARALLEL_MODULES if parallel_modules is None else parallel_modules
+        # Crawlerhez: a belső linkek a dokumentum elengedése előtt a discovered_links listába kerülnek
+        self.collect_links = collect_links
+        self.discovered_links = None
+        
+    def fetch_page(self, module=None, only=None, parse=True):
+        """Weboldal letöltése és a dokumentum feldolgozása
+        
+        module (pl. self.analyze_title) megadásakor csak a modul által olvasott
+        elemek kerülnek a dokumentumba (requires_tags), csak head elemeket olvasó
+        modulnál a letöltés is megáll a </head> után. Több modulnál az igényük
+        uniója adható meg only-ként; parse=False esetén dokumentum nem készül.
+        """
         self.start_time = time.time()
+        if module is not None:
+            only = getattr(module, 'required_tags', None)
         try:
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36',
-                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8',
-                'Accept-Language': 'hu-HU,hu;q=0.9,en;q=0.8,en-US;q=0.7',
-                'Accept-Encoding': 'gzip, deflate, br',
-                'DNT': '1',
-                'Connection': 'keep-alive',
-                'Upgrade-Insecure-Requests': '1',
-                'Sec-Fetch-Dest': 'document',
-                'Sec-Fetch-Mode': 'navigate',
-                'Sec-Fetch-Site': 'none',
-                'Cache-Control': 'max-age=0',
-            }
-            
-            session = requests.Session()
-            session.headers.update(headers)
-            
-            self.response = session.get(
-                self.url, 
-                timeout=20,
-                verify=False,
-                allow_redirects=True,
-                stream=False
+            # Streamelt letöltés bájtkerettel és határidővel
+            page = self.timeline.timed(
+                'page_fetch',
+                self.http.fetch,
+                self.url,
+                20,
+                self.max_body_bytes,
+                self.download_deadline,
+                stop_at=HEAD_END_RE if only is not None and only.head_only else None,
+                priority=True
             )
-            self.response.raise_for_status()
-            
-            if not self.response.content:
-                return False, "Üres válasz a szervertől"
             
-            # Encoding detection
-            self.response.encoding = self.response.apparent_encoding or 'utf-8'
-            
-            # BeautifulSoup objektum létrehozása
-            self.soup = BeautifulSoup(self.response.content, 'html.parser')
-            
-            if self.soup is None:
-                return False, "Nem sikerült feldolgozni a HTML tartalmat"
-                
-            return True, "Sikeres"
+            return self.load_page(page, only, parse)
             
         except requests.exceptions.Timeout:
             return False, "Időtúllépés - A weboldal túl lassan válaszol (>20s)"
         except requests.exceptions.ConnectionError:
             return False, "Kapcsolódási hiba - Nem sikerült elérni a weboldalt"
-        except requests.exceptions.HTTPError as e:
-            return False, f"HTTP hiba: {e.response.status_code} - {e.response.reason}"
         except requests.exceptions.RequestException as e:
             return False, f"Kérés hiba: {str(e)}"
         except Exception as e:
             return False, f"Váratlan hiba: {str(e)}"
     
+    def load_page(self, page, only=None, parse=True):
+        """Már letöltött oldal (FetchedPage) feldolgozása a kiválasztott parser backenddel (only: TagFilter)"""
+        self.response = page
+        self.structured_data = None
+        self.text_layer = None
+        
+        if not page.ok:
+            return False, f"HTTP hiba: {page.status_code} - {page.reason}"
+        
+        if not page.content:
+            return False, "Üres válasz a szervertől"
+        
+        if not parse:
+            # Csak a választ olvasó modulok futnak (pl. performance)
+            return True, "Sikeres"
+        
+        try:
+            if self.parser.streaming:
+                # Fa nélküli mód: a bájtok darabonként mennek a parserbe, DOM és teljes szöveg nem készül
+                self.soup = self.timeline.timed(
+                    'page_parse', self.parser.parse_bytes, page.content,
+                    page.headers.get('Content-Type'), page.encoding
+                )
+                page.encoding, page.encoding_source = self.soup.encoding, self.soup.encoding_source
+                self.index = self.timeline.timed('page_index', self.parser.index, self.soup)
+                return True, "Sikeres"
+
+            # Dekódolás egyszer (BOM, Content-Type, meta charset, korlátozott felismerés),
+            # a parser már szöveget kap, így nem detektál újra
+            if page.encoding is None:
+                text, page.encoding, page.encoding_source = self.timeline.timed(
+                    'page_decode', decode_html, page.content, page.headers.get('Content-Type')
+                )
+            else:
+                text = page.content.decode(page.encoding, 'replace')
+                page.encoding_source = 'preset'
+            
+            # Dokumentum létrehozása (BeautifulSoup vagy natív lxml fa)
+            self.soup = self.timeline.timed('page_parse', self.parser.parse, text, only)
+            # Egyetlen bejárás: az elemzők az indexből olvasnak
+            self.index = self.timeline.timed('page_index', self.parser.index, self.soup)
+        except Exception as e:
+            return False, f"Váratlan hiba: {str(e)}"
+        
+        if self.soup is None:
+            return False, "Nem sikerült feldolgozni a HTML tartalmat"
+            
+        return True, "Sikeres"
+    
+    def get_structured_data(self):
+        """JSON-LD blokkok egyszeri feldolgozása; a strukturált adat, helyi és e-commerce modul ezen osztozik"""
+        if self.structured_data is None:
+            self.structured_data = self.timeline.timed(
+                'structured_data', StructuredData, self.index.scripts('application/ld+json')
+            )
+        return self.structured_data
+    
+    def get_text_layer(self):
+        """Látható szöveg egyszeri kinyerése (script/style/noscript nélkül); minden modul ezt használja"""
+        if self.text_layer is None:
+            self.text_layer = self.timeline.timed(
+                'text_layer', TextLayer, self.parser.visible_strings(self.soup)
+            )
+        return self.text_layer
+    
+    @requires_tags('title', head_only=True)
     def analyze_title(self):
         """Fejlesztett Title tag elemzése"""
-        if self.soup is None:
+        if self.index is None:
             return {'score': 0, 'title': '', 'length': 0, 'issues': ['Nem sikerült betölteni az oldalt']}
             
-        title = self.soup.find('title')
+        title = self.index.first('title')
         if not title:
             return {'score': 0, 'title': '', 'length': 0, 'issues': ['Nincs title tag']}
         
@@ -130,12 +241,13 @@ class AdvancedSEOAnalyzer:
             'word_count': len(words)
         }
     
+    @requires_tags('meta', head_only=True)
     def analyze_meta_description(self):
         """Fejlesztett Meta description elemzése"""
-        if self.soup is None:
+        if self.index is None:
             return {'score': 0, 'description': '', 'length': 0, 'issues': ['Nem sikerült betölteni az oldalt']}
             
-        meta_desc = self.soup.find('meta', attrs={'name': re.compile(r'^description$', re.I)})
+        meta_desc = self.index.meta('description', ignore_case=True)
         if not meta_desc:
             return {
                 'score': 0, 
@@ -165,8 +277,7 @@ class AdvancedSEOAnalyzer:
             score -= 2
             
         # Call-to-action check
-        cta_words = ['kattints', 'látogass', 'tudj meg többet', 'olvass tovább', 'fedezd fel']
-        has_cta = any(word in desc_text.lower() for word in cta_words)
+        has_cta = CTA_MATCHER.contains_any(desc_text.lower())
         if not has_cta and length > 50:
             recommendations.append('Adj hozzá cselekvésre ösztönző szöveget')
             
@@ -179,9 +290,10 @@ class AdvancedSEOAnalyzer:
             'has_cta': has_cta
         }
     
+    @requires_tags('h1', 'h2', 'h3', 'h4', 'h5', 'h6')
     def analyze_headings(self):
         """Fejlesztett Heading struktúra elemzése"""
-        if self.soup is None:
+        if self.index is None:
             return {'score': 0, 'headings': {}, 'issues': ['Nem sikerült betölteni az oldalt']}
             
         headings = {'h1': [], 'h2': [], 'h3': [], 'h4': [], 'h5': [], 'h6': []}
@@ -190,7 +302,7 @@ class AdvancedSEOAnalyzer:
         score = 10
         
         for level in headings.keys():
-            tags = self.soup.find_all(level)
+            tags = self.index.all(level)
             headings[level] = [tag.get_text().strip() for tag in tags if tag.get_text().strip()]
         
         # H1 ellenőrzés
@@ -233,12 +345,13 @@ class AdvancedSEOAnalyzer:
             'total_count': total_headings
         }
     
+    @requires_tags('img')
     def analyze_images(self):
         """Fejlesztett képek elemzése"""
-        if self.soup is None:
+        if self.index is None:
             return {'score': 0, 'total_images': 0, 'missing_alt': 0, 'empty_alt': 0, 'issues': ['Nem sikerült betölteni az oldalt']}
             
-        images = self.soup.find_all('img')
+        images = self.index.all('img')
         total_images = len(images)
         missing_alt = 0
         empty_alt = 0
@@ -296,20 +409,12 @@ class AdvancedSEOAnalyzer:
             'recommendations': recommendations
         }
     
-    def analyze_links(self):
-        """Fejlesztett linkek elemzése"""
-        if self.soup is None:
-            return {'score': 0, 'total_links': 0, 'internal_links': 0, 'external_links': 0, 'issues': ['Nem sikerült betölteni az oldalt']}
-            
-        links = self.soup.find_all('a', href=True)
+    def classify_links(self):
+        """Linkek besorolása: (belső hrefek, külső hrefek, nofollow külső linkek száma)"""
         internal_links = []
         external_links = []
-        broken_links = 0
         nofollow_links = 0
-        issues = []
-        recommendations = []
-        
-        for link in links:
+        for link in self.index.anchors:
             href = link['href']
             rel = link.get('rel', [])
             
@@ -330,6 +435,30 @@ class AdvancedSEOAnalyzer:
                 internal_links.append(href)
             elif not href.startswith('javascript:'):
                 internal_links.append(href)
+        return internal_links, external_links, nofollow_links
+    
+    def internal_link_urls(self):
+        """Belső linkek abszolút, normalizált URL-ként (a végső oldal URL-jéhez feloldva), ismétlés nélkül"""
+        if self.index is None:
+            return []
+        base = self.response.url if self.response is not None else self.url
+        urls = {}
+        for href in self.classify_links()[0]:
+            url = normalize_url(urllib.parse.urljoin(base, href.strip()))
+            if url is not None:
+                urls[url] = None
+        return list(urls)
+    
+    @requires_tags('a')
+    def analyze_links(self):
+        """Fejlesztett linkek elemzése"""
+        if self.index is None:
+            return {'score': 0, 'total_links': 0, 'internal_links': 0, 'external_links': 0, 'issues': ['Nem sikerült betölteni az oldalt']}
+            
+        links = self.index.anchors
+        internal_links, external_links, nofollow_links = self.classify_links()
+        issues = []
+        recommendations = []
         
         score = 10
         
@@ -350,11 +479,10 @@ class AdvancedSEOAnalyzer:
             score -= 1
             
         # Link text analysis (basic)
-        generic_texts = ['kattints ide', 'tovább', 'itt', 'link', 'oldalra']
         generic_count = 0
         for link in links:
             link_text = link.get_text().strip().lower()
-            if link_text in generic_texts:
+            if link_text in GENERIC_LINK_TEXTS:
                 generic_count += 1
                 
         if generic_count > 0:
@@ -373,9 +501,10 @@ class AdvancedSEOAnalyzer:
             'recommendations': recommendations
         }
     
+    @requires_tags('script', 'meta', attributes=('itemscope',))
     def analyze_structured_data(self):
         """Fejlesztett strukturált adatok elemzése"""
-        if self.soup is None:
+        if self.index is None:
             return {'score': 0, 'structured_data': [], 'valid_json_ld': 0, 'issues': ['Nem sikerült betölteni az oldalt']}
             
         score = 10
@@ -383,43 +512,29 @@ class AdvancedSEOAnalyzer:
         recommendations = []
         structured_data = []
         
-        # JSON-LD keresése
-        json_scripts = self.soup.find_all('script', type='application/ld+json')
-        valid_json_count = 0
-        schema_types = set()
-        
-        for script in json_scripts:
-            if script.string:
-                try:
-                    data = json.loads(script.string.strip())
-                    structured_data.append({'type': 'JSON-LD', 'valid': True, 'data': data})
-                    valid_json_count += 1
-                    
-                    # Schema type extraction
-                    if isinstance(data, dict) and '@type' in data:
-                        schema_types.add(data['@type'])
-                    elif isinstance(data, list):
-                        for item in data:
-                            if isinstance(item, dict) and '@type' in item:
-                                schema_types.add(item['@type'])
-                                
-                except json.JSONDecodeError as e:
-                    structured_data.append({'type': 'JSON-LD', 'valid': False, 'error': str(e)})
-                    issues.append('Érvénytelen JSON-LD struktúra')
-                    score -= 3
+        # JSON-LD blokkok (egyszer feldolgozva, a modulok osztoznak rajta)
+        json_ld = self.get_structured_data()
+        for block in json_ld.blocks:
+            if block['valid']:
+                structured_data.append({'type': 'JSON-LD', 'valid': True, 'data': block['data']})
+            else:
+                structured_data.append({'type': 'JSON-LD', 'valid': False, 'error': block['error']})
+                issues.append('Érvénytelen JSON-LD struktúra')
+                score -= 3
+        valid_json_count = json_ld.valid_count
         
         # Microdata keresése
-        microdata = self.soup.find_all(attrs={'itemscope': True})
+        microdata = self.index.itemscopes
         if microdata:
             structured_data.append({'type': 'Microdata', 'count': len(microdata)})
         
         # Open Graph tags
-        og_tags = self.soup.find_all('meta', attrs={'property': re.compile(r'^og:')})
+        og_tags = self.index.meta_with_prefix('property', 'og:')
         if og_tags:
             structured_data.append({'type': 'Open Graph', 'count': len(og_tags)})
         
         # Twitter Cards
-        twitter_tags = self.soup.find_all('meta', attrs={'name': re.compile(r'^twitter:')})
+        twitter_tags = self.index.meta_with_prefix('name', 'twitter:')
         if twitter_tags:
             structured_data.append({'type': 'Twitter Cards', 'count': len(twitter_tags)})
         
@@ -435,13 +550,14 @@ class AdvancedSEOAnalyzer:
             'score': max(0, score),
             'structured_data': structured_data,
             'valid_json_ld': valid_json_count,
-            'schema_types': list(schema_types),
+            'schema_types': json_ld.top_level_types(),
             'og_tags': len(og_tags) if og_tags else 0,
             'twitter_tags': len(twitter_tags) if twitter_tags else 0,
             'issues': issues,
             'recommendations': recommendations
         }
     
+    @requires_tags()
     def analyze_performance(self):
         """Fejlesztett teljesítmény elemzés"""
         if self.response is None:
@@ -453,6 +569,8 @@ class AdvancedSEOAnalyzer:
         
         # Oldal méret
         page_size = len(self.response.content) / 1024  # KB
+        if self.response.truncated:
+            issues.append(f'Az oldal letöltése csonkolva ({self.response.truncated_reason}), a méret legalább {page_size:.1f} KB')
         if page_size > 2000:  # 2MB
             issues.append(f'Nagyon nagy oldal méret: {page_size:.1f} KB')
             recommendations.append('Optimalizáld a képeket és tömörítsd a fájlokat')
@@ -511,9 +629,10 @@ class AdvancedSEOAnalyzer:
             'recommendations': recommendations
         }
     
+    @requires_tags('meta', 'img', 'style')
     def analyze_mobile_friendly(self):
         """Fejlesztett mobilbarát elemzés"""
-        if self.soup is None:
+        if self.index is None:
             return {'score': 0, 'has_viewport': False, 'responsive_images': 0, 'issues': ['Nem sikerült betölteni az oldalt']}
             
         score = 10
@@ -521,7 +640,7 @@ class AdvancedSEOAnalyzer:
         recommendations = []
         
         # Viewport meta tag
-        viewport = self.soup.find('meta', attrs={'name': 'viewport'})
+        viewport = self.index.meta('viewport')
         has_viewport = viewport is not None
         
         if not has_viewport:
@@ -536,8 +655,8 @@ class AdvancedSEOAnalyzer:
                 score -= 2
         
         # Responsive képek
-        responsive_images = len(self.soup.find_all('img', attrs={'srcset': True}))
-        total_images = len(self.soup.find_all('img'))
+        responsive_images = len(self.index.with_attribute('img', 'srcset'))
+        total_images = len(self.index.all('img'))
         
         if total_images > 5 and responsive_images == 0:
             issues.append('Nincsenek responsive képek')
@@ -545,7 +664,7 @@ class AdvancedSEOAnalyzer:
             score -= 2
         
         # Media queries in CSS (basic check)
-        style_tags = self.soup.find_all('style')
+        style_tags = self.index.all('style')
         has_media_queries = False
         for style in style_tags:
             if '@media' in style.get_text():
@@ -557,7 +676,7 @@ class AdvancedSEOAnalyzer:
         
         # Mobile-specific meta tags
         mobile_tags = ['apple-mobile-web-app-capable', 'mobile-web-app-capable']
-        mobile_optimized = any(self.soup.find('meta', attrs={'name': tag}) for tag in mobile_tags)
+        mobile_optimized = any(self.index.meta(tag) for tag in mobile_tags)
         
         return {
             'score': max(0, score),
@@ -570,6 +689,7 @@ class AdvancedSEOAnalyzer:
             'recommendations': recommendations
         }
     
+    @requires_tags('link', head_only=True)
     def analyze_seo_fundamentals(self):
         """További SEO alapok elemzése"""
         fundamentals = {
@@ -593,46 +713,39 @@ class AdvancedSEOAnalyzer:
             'total_passed': sum(1 for r in fundamentals.values() if r['exists'])
         }
     
+    def start_network_probes(self):
+        """robots.txt és sitemap lekérések indítása a háttérben"""
+        if self.probes is None:
+            self.probes = NetworkProbes(self.url, self.http, self.timeline).start()
+        return self.probes
+    
     def check_robots_txt(self):
         """Robots.txt ellenőrzése"""
-        try:
-            robots_url = f"{self.url.rstrip('/')}/robots.txt"
-            response = requests.get(robots_url, timeout=5)
-            return {
-                'exists': response.status_code == 200,
-                'url': robots_url,
-                'status_code': response.status_code
-            }
-        except:
-            return {'exists': False, 'url': '', 'status_code': 0}
+        return self.start_network_probes().robots_txt()
     
     def check_sitemap(self):
         """Sitemap ellenőrzése"""
-        sitemaps = [
-            f"{self.url.rstrip('/')}/sitemap.xml",
-            f"{self.url.rstrip('/')}/sitemap_index.xml"
-        ]
-        
-        for sitemap_url in sitemaps:
-            try:
-                response = requests.get(sitemap_url, timeout=5)
-                if response.status_code == 200:
-                    return {
-                        'exists': True,
-                        'url': sitemap_url,
-                        'status_code': response.status_code
-                    }
-            except:
-                continue
-                
-        return {'exists': False, 'url': '', 'status_code': 0}
+        return self.start_network_probes().sitemap()
+    
+    def iter_sitemap_urls(self, **crawler_options):
+        """A megtalált sitemap (és indexeinek) URL-jei generátorként, streamelt feldolgozással
+
+        A bejáró a self.sitemap_crawler attribútumon érhető el (errors, sitemaps_processed);
+        a gyökér sitemap letöltési vagy feldolgozási hibája kivételként jelenik meg.
+        """
+        sitemap = self.check_sitemap()
+        if not sitemap['exists']:
+            self.sitemap_crawler = None
+            return iter(())
+        self.sitemap_crawler = SitemapCrawler(self.http, **crawler_options)
+        return self.sitemap_crawler.iter_urls(sitemap['url'])
     
     def check_canonical(self):
         """Canonical URL ellenőrzése"""
-        if self.soup is None:
+        if self.index is None:
             return {'exists': False}
             
-        canonical = self.soup.find('link', attrs={'rel': 'canonical'})
+        canonical = self.index.first_link('canonical')
         return {
             'exists': canonical is not None,
             'url': canonical.get('href') if canonical else ''
@@ -640,10 +753,10 @@ class AdvancedSEOAnalyzer:
     
     def check_hreflang(self):
         """Hreflang ellenőrzése"""
-        if self.soup is None:
+        if self.index is None:
             return {'exists': False, 'count': 0}
             
-        hreflang_tags = self.soup.find_all('link', attrs={'hreflang': True})
+        hreflang_tags = self.index.with_attribute('link', 'hreflang')
         return {
             'exists': len(hreflang_tags) > 0,
             'count': len(hreflang_tags)
@@ -651,24 +764,32 @@ class AdvancedSEOAnalyzer:
     
     def check_favicon(self):
         """Favicon ellenőrzése"""
-        if self.soup is None:
+        if self.index is None:
             return {'exists': False}
             
-        favicon_selectors = [
-            'link[rel="icon"]',
-            'link[rel="shortcut icon"]',
-            'link[rel="apple-touch-icon"]'
-        ]
+        favicon_rels = ['icon', 'shortcut icon', 'apple-touch-icon']
         
-        for selector in favicon_selectors:
-            if self.soup.select(selector):
+        for rel in favicon_rels:
+            if self.index.links_with_rel_value(rel):
                 return {'exists': True}
                 
         return {'exists': False}
     
-    def get_comprehensive_analysis(self):
-        """Teljes SEO elemzés végrehajtása"""
-        success, message = self.fetch_page()
+    def get_comprehensive_analysis(self, page=None, modules=None):
+        """Teljes SEO elemzés végrehajtása (opcionálisan már letöltött oldalon)
+        
+        modules: modulnevek (module_registry); csak ezek és az általuk igényelt
+        szakaszok futnak (pl. szövegréteg, hálózati ellenőrzések). None: minden modul.
+        """
+        plan = build_plan(modules)
+        only = plan.tag_filter(type(self))
+        if page is None:
+            if plan.needs('probes'):
+                # Hálózati ellenőrzések indítása a fő oldal letöltésével párhuzamosan
+                self.start_network_probes()
+            success, message = self.fetch_page(only=only, parse=plan.needs('index'))
+        else:
+            success, message = self.load_page(page, only, plan.needs('index'))
         if not success:
             return {'error': f'Nem sikerült betölteni a weboldalt: {message}'}
         
@@ -676,62 +797,56 @@ class AdvancedSEOAnalyzer:
             'url': self.url,
             'domain': self.domain,
             'analyzed_at': datetime.now().isoformat(),
-            'title': self.analyze_title(),
-            'meta_description': self.analyze_meta_description(),
-            'headings': self.analyze_headings(),
-            'images': self.analyze_images(),
-            'links': self.analyze_links(),
-            'structured_data': self.analyze_structured_data(),
-            'performance': self.analyze_performance(),
-            'mobile_friendly': self.analyze_mobile_friendly(),
-            'seo_fundamentals': self.analyze_seo_fundamentals(),
-            'content_quality': self.analyze_content_quality(),
-            'technical_seo': self.analyze_technical_seo(),
-            'social_media_optimization': self.analyze_social_media_optimization(),
-            'accessibility_seo': self.analyze_accessibility_seo(),
-            'core_web_vitals': self.analyze_core_web_vitals(),
-            'local_seo': self.analyze_local_seo(),
-            'e_commerce_seo': self.analyze_e_commerce_seo()
+            'fetch': self.response.fetch_info(),
+            'parser': self.parser.name,
+            'timings': self.response.timings,
         }
+        # Közös rétegek és modulok (sorban vagy párhuzamosan), az eredmény a nyilvántartás sorrendjében
+        analysis.update(run_plan(plan, self, self.parallel_modules))
         
-        # Összpontszám számítása súlyozott átlaggal
-        weights = {
-            'title': 1.2,
-            'meta_description': 1.1,
-            'headings': 1.0,
-            'images': 0.8,
-            'links': 0.9,
-            'structured_data': 0.7,
-            'performance': 1.3,
-            'mobile_friendly': 1.1,
-            'seo_fundamentals': 0.9,
-            'content_quality': 1.0,
-            'technical_seo': 0.9,
-            'social_media_optimization': 0.8,
-            'accessibility_seo': 0.7,
-            'core_web_vitals': 1.2,
-            'local_seo': 0.9,
-            'e_commerce_seo': 0.8        }
-        
+        # Összpontszám számítása súlyozott átlaggal (a modulok súlya a nyilvántartásban)
         total_weighted_score = 0
         total_weight = 0
         
-        for key, weight in weights.items():
-            if key in analysis and 'score' in analysis[key]:
-                total_weighted_score += analysis[key]['score'] * weight
-                total_weight += weight
+        for module in plan.modules:
+            if 'score' in analysis[module.name]:
+                total_weighted_score += analysis[module.name]['score'] * module.weight
+                total_weight += module.weight
         
         final_score = total_weighted_score / total_weight if total_weight > 0 else 0
         analysis['total_score'] = round(final_score, 1)
         analysis['grade'] = self.get_grade(analysis['total_score'])
         analysis['analysis_time'] = round(time.time() - self.start_time, 2) if self.start_time else 0
+        analysis['network_timeline'] = self.timeline.to_dict()
         
         # AI-alapú javaslatok és fejlesztési potenciál
         analysis['seo_recommendations'] = self.generate_seo_recommendations(analysis)
         analysis['improvement_potential'] = self.calculate_seo_improvement_potential(analysis)
         
+        if self.collect_links:
+            self.discovered_links = self.internal_link_urls()
+        # A pontozás kész: a dokumentum és a nyers törzs nem kell tovább
+        self.release_resources()
         return analysis
     
+    def run_analysis(self, page=None, modules=None):
+        """Teljes elemzés kompakt rekordként: (True, AnalysisResult) vagy (False, hibaüzenet)"""
+        analysis = self.get_comprehensive_analysis(page, modules)
+        if 'error' in analysis:
+            return False, analysis['error']
+        return True, AnalysisResult.from_dict(analysis)
+    
+    def release_resources(self):
+        """A DOM, az index, a szöveg- és JSON-LD réteg, valamint a letöltött oldal elengedése"""
+        if self.soup is not None:
+            self.parser.release(self.soup)
+        self.soup = None
+        self.index = None
+        self.structured_data = None
+        self.text_layer = None
+        self.response = None
+        self.probes = None
+    
     def get_grade(self, score):
         """Pontszám alapján osztályzat meghatározása"""
         if score >= 9.5:
@@ -757,16 +872,17 @@ class AdvancedSEOAnalyzer:
     
     def analyze_content_quality(self):
         """Tartalom minőség és SEO relevancia elemzése"""
-        if self.soup is None:
+        if self.index is None:
             return {'score': 0, 'issues': ['Nem sikerült betölteni az oldalt']}
             
         score = 10
         issues = []
         recommendations = []
         
-        # Szöveg tartalom kinyerése
-        text_content = self.soup.get_text(separator=' ', strip=True)
-        words = text_content.split()
+        # Szöveg tartalom (közös, egyszer kinyert szövegréteg)
+        text_layer = self.get_text_layer()
+        text_content = text_layer.text
+        words = text_layer.words
         word_count = len(words)
         
         # Szó szám ellenőrzés
@@ -780,7 +896,7 @@ class AdvancedSEOAnalyzer:
             score -= 5
             
         # Bekezdések elemzése
-        paragraphs = self.soup.find_all('p')
+        paragraphs = self.index.all('p')
         paragraph_count = len([p for p in paragraphs if p.get_text().strip()])
         
         if paragraph_count < 3:
@@ -788,21 +904,29 @@ class AdvancedSEOAnalyzer:
             recommendations.append('Strukturáld a tartalmat több bekezdésre')
             score -= 2
             
-        # Kulcsszó sűrűség elemzés (egyszerű)
+        # Kulcsszó statisztika (egy tokenizálás: gyakoriság, n-gramok, mondatszám)
         if word_count > 0:
-            # A 3 leggyakoribb szó (kivéve stop words)
-            stop_words = {'a', 'az', 'és', 'de', 'hogy', 'ez', 'is', 'ki', 'be', 'el', 'fel', 'le', 'meg', 'át'}
-            word_freq = {}
-            for word in words:
-                clean_word = word.lower().strip('.,!?;:()[]{}"\'-')
-                if len(clean_word) > 3 and clean_word not in stop_words:
-                    word_freq[clean_word] = word_freq.get(clean_word, 0) + 1
-                    
-            top_words = sorted(word_freq.items(), key=lambda x: x[1], reverse=True)[:5]
+            html = self.index.first('html')
+            stop_words = stop_words_for(html.get('lang') if html else None)
+            stats = self.timeline.timed('text_stats', TextStats, text_content, stop_words)
+            
+            # A leggyakoribb szavak (kivéve stop words)
+            top_words = stats.top_keywords(5)
+            top_bigrams = stats.top_ngrams(2, 5)
+            top_trigrams = stats.top_ngrams(3, 5)
+            
+            # Kulcsszó sűrűség zónánként (title, címsorok, törzsszöveg)
+            title = self.index.first('title')
+            headings = [tag.get_text() for level in range(1, 7) for tag in self.index.headings(level)]
+            zones = {
+                'title': TextStats(title.get_text() if title else '', stop_words, ngram_sizes=()),
+                'headings': TextStats(' '.join(headings), stop_words, ngram_sizes=()),
+                'body': stats,
+            }
+            keyword_density = zone_density([word for word, _ in top_words[:3]], zones)
             
             # Olvashatóság (átlagos mondat hossz)
-            sentences = re.split(r'[.!?]+', text_content)
-            avg_sentence_length = word_count / max(len(sentences), 1)
+            avg_sentence_length = word_count / stats.sentence_count
             
             if avg_sentence_length > 25:
                 issues.append(f'Hosszú mondatok (átlag: {avg_sentence_length:.1f} szó)')
@@ -815,13 +939,16 @@ class AdvancedSEOAnalyzer:
             'paragraph_count': paragraph_count,
             'avg_sentence_length': avg_sentence_length if 'avg_sentence_length' in locals() else 0,
             'top_keywords': top_words[:3] if 'top_words' in locals() else [],
+            'top_bigrams': top_bigrams if 'top_bigrams' in locals() else [],
+            'top_trigrams': top_trigrams if 'top_trigrams' in locals() else [],
+            'keyword_density': keyword_density if 'keyword_density' in locals() else {},
             'issues': issues,
             'recommendations': recommendations
         }
 
     def analyze_technical_seo(self):
         """Technikai SEO elemzés"""
-        if self.soup is None or self.response is None:
+        if self.index is None or self.response is None:
             return {'score': 0, 'issues': ['Nem sikerült betölteni az oldalt']}
             
         score = 10
@@ -854,15 +981,16 @@ class AdvancedSEOAnalyzer:
             score -= 1
             
         # Breadcrumb ellenőrzés
-        breadcrumb = self.soup.find('nav', {'aria-label': re.compile(r'breadcrumb', re.I)}) or \
-                    self.soup.find(class_=re.compile(r'breadcrumb', re.I))
+        breadcrumb_pattern = re.compile(r'breadcrumb', re.I)
+        breadcrumb = self.index.first_matching('nav', 'aria-label', breadcrumb_pattern) or \
+                    self.index.has_class(breadcrumb_pattern)
         checks['breadcrumb'] = bool(breadcrumb)
         if not breadcrumb:
             recommendations.append('Adj hozzá breadcrumb navigációt')
             
         # Internal linking depth
         internal_links = []
-        for link in self.soup.find_all('a', href=True):
+        for link in self.index.anchors:
             href = link['href']
             if href.startswith('/') or self.domain in href:
                 internal_links.append(href)
@@ -877,13 +1005,13 @@ class AdvancedSEOAnalyzer:
         render_blocking_resources = []
         
         # CSS files in head
-        css_links = self.soup.find_all('link', {'rel': 'stylesheet'})
+        css_links = self.index.links('stylesheet')
         for css in css_links:
             if css.get('href'):
                 render_blocking_resources.append('CSS: ' + css['href'][:50])
                 
         # JS files in head
-        head_scripts = self.soup.head.find_all('script', src=True) if self.soup.head else []
+        head_scripts = self.index.head_scripts()
         for script in head_scripts:
             render_blocking_resources.append('JS: ' + script['src'][:50])
             
@@ -901,9 +1029,10 @@ class AdvancedSEOAnalyzer:
             'recommendations': recommendations
         }
 
+    @requires_tags('meta', 'a')
     def analyze_social_media_optimization(self):
         """Social Media Optimization (SMO) elemzés"""
-        if self.soup is None:
+        if self.index is None:
             return {'score': 0, 'issues': ['Nem sikerült betölteni az oldalt']}
             
         score = 10
@@ -911,7 +1040,7 @@ class AdvancedSEOAnalyzer:
         recommendations = []
         
         # Open Graph tags
-        og_tags = self.soup.find_all('meta', property=re.compile(r'^og:', re.I))
+        og_tags = self.index.meta_with_prefix('property', 'og:', ignore_case=True)
         og_dict = {tag.get('property', '').lower(): tag.get('content', '') for tag in og_tags}
         
         required_og = ['og:title', 'og:description', 'og:image', 'og:url', 'og:type']
@@ -923,7 +1052,7 @@ class AdvancedSEOAnalyzer:
             score -= len(missing_og)
             
         # Twitter Card tags
-        twitter_tags = self.soup.find_all('meta', attrs={'name': re.compile(r'^twitter:', re.I)})
+        twitter_tags = self.index.meta_with_prefix('name', 'twitter:', ignore_case=True)
         twitter_dict = {tag.get('name', '').lower(): tag.get('content', '') for tag in twitter_tags}
         
         if not twitter_dict.get('twitter:card'):
@@ -938,7 +1067,7 @@ class AdvancedSEOAnalyzer:
             r'linkedin\.com', r'youtube\.com', r'tiktok\.com'
         ]
         
-        for link in self.soup.find_all('a', href=True):
+        for link in self.index.anchors:
             href = link['href']
             for pattern in social_patterns:
                 if re.search(pattern, href, re.I):
@@ -957,7 +1086,7 @@ class AdvancedSEOAnalyzer:
 
     def analyze_accessibility_seo(self):
         """Akadálymentesítés és SEO kapcsolat elemzése"""
-        if self.soup is None:
+        if self.index is None:
             return {'score': 0, 'issues': ['Nem sikerült betölteni az oldalt']}
             
         score = 10
@@ -965,19 +1094,17 @@ class AdvancedSEOAnalyzer:
         recommendations = []
         
         # Language attribute
-        html_lang = self.soup.html.get('lang') if self.soup.html else None
+        html = self.index.first('html')
+        html_lang = html.get('lang') if html else None
         if not html_lang:
             issues.append('Nincs lang attribútum a HTML elemen')
             recommendations.append('Adj hozzá lang="hu" attribútumot a HTML taghez')
             score -= 2
             
-        # Heading hierarchy check
-        headings = []
-        for i in range(1, 7):
-            headings.extend([(f'h{i}', tag) for tag in self.soup.find_all(f'h{i}')])
-            
+        # Heading hierarchy check (szintenként csoportosítva)
+        heading_levels = sorted(level for level, tag in self.index.outline)
+        
         # Check for proper heading order
-        heading_levels = [int(h[0][1]) for h in headings]
         if heading_levels:
             prev_level = 0
             for level in heading_levels:
@@ -989,7 +1116,7 @@ class AdvancedSEOAnalyzer:
                 prev_level = level
                 
         # Form labels
-        forms = self.soup.find_all('form')
+        forms = self.index.all('form')
         form_issues = 0
         for form in forms:
             inputs = form.find_all(['input', 'textarea', 'select'])
@@ -1007,7 +1134,8 @@ class AdvancedSEOAnalyzer:
             score -= min(form_issues, 3)
             
         # Skip links
-        skip_link = self.soup.find('a', {'href': re.compile(r'#.*content|#.*main', re.I)})
+        skip_pattern = re.compile(r'#.*content|#.*main', re.I)
+        skip_link = any(skip_pattern.search(link['href']) for link in self.index.anchors)
         if not skip_link:
             recommendations.append('Adj hozzá "skip to main content" linket')
             
@@ -1021,6 +1149,7 @@ class AdvancedSEOAnalyzer:
             'recommendations': recommendations
         }
 
+    @requires_tags('script', 'img')
     def analyze_core_web_vitals(self):
         """Core Web Vitals elemzés (szimulált)"""
         if self.response is None:
@@ -1045,7 +1174,7 @@ class AdvancedSEOAnalyzer:
             score -= 2
             
         # First Input Delay (FID) - JavaScript elemzés
-        script_tags = self.soup.find_all('script')
+        script_tags = self.index.all('script')
         js_size = 0
         external_js = 0
         
@@ -1062,7 +1191,7 @@ class AdvancedSEOAnalyzer:
             
         # Cumulative Layout Shift (CLS) - képek és CSS elemzés
         images_without_dimensions = 0
-        for img in self.soup.find_all('img'):
+        for img in self.index.all('img'):
             if not (img.get('width') and img.get('height')):
                 images_without_dimensions += 1
                 
@@ -1083,7 +1212,7 @@ class AdvancedSEOAnalyzer:
 
     def analyze_local_seo(self):
         """Helyi SEO elemzés"""
-        if self.soup is None:
+        if self.index is None:
             return {'score': 0, 'issues': ['Nem sikerült betölteni az oldalt']}
             
         score = 10
@@ -1092,15 +1221,10 @@ class AdvancedSEOAnalyzer:
         local_signals = {}
         
         # Címkeresés
-        text_content = self.soup.get_text().lower()
+        text_content = self.get_text_layer().lower
         
-        # Magyar városok és régiók (példa)
-        hungarian_cities = [
-            'budapest', 'debrecen', 'szeged', 'miskolc', 'pécs', 'győr', 'nyíregyháza',
-            'kecskemét', 'székesfehérvár', 'szombathely', 'szolnok', 'tatabánya'
-        ]
-        
-        found_cities = [city for city in hungarian_cities if city in text_content]
+        # Városok egyetlen menetben (toldalékos alak is: budapesti, pécsen)
+        found_cities = CITY_MATCHER.found(text_content)
         local_signals['cities_mentioned'] = found_cities
         
         # Telefonszám keresés
@@ -1114,27 +1238,14 @@ class AdvancedSEOAnalyzer:
             score -= 2
             
         # Cím keresés (egyszerű)
-        address_keywords = ['utca', 'út', 'tér', 'körút', 'köz', 'sor', 'sétány']
-        has_address = any(keyword in text_content for keyword in address_keywords)
+        has_address = ADDRESS_MATCHER.contains_any(text_content)
         local_signals['has_address'] = has_address
         
         if not has_address:
             recommendations.append('Adj meg teljes címet a jobb helyi SEO-ért')
             
-        # Structured data - Local Business
-        local_business_schema = False
-        json_ld_scripts = self.soup.find_all('script', {'type': 'application/ld+json'})
-        
-        for script in json_ld_scripts:
-            try:
-                data = json.loads(script.string)
-                if isinstance(data, dict):
-                    schema_type = data.get('@type', '')
-                    if 'LocalBusiness' in schema_type or 'Organization' in schema_type:
-                        local_business_schema = True
-                        break
-            except:
-                continue
+        # Structured data - Local Business (@graph és beágyazott entitások is)
+        local_business_schema = self.get_structured_data().has_type_containing('LocalBusiness', 'Organization')
                 
         local_signals['has_local_business_schema'] = local_business_schema
         
@@ -1152,7 +1263,7 @@ class AdvancedSEOAnalyzer:
 
     def analyze_e_commerce_seo(self):
         """E-commerce specifikus SEO elemzés"""
-        if self.soup is None:
+        if self.index is None:
             return {'score': 0, 'issues': ['Nem sikerült betölteni az oldalt']}
             
         score = 10
@@ -1161,13 +1272,8 @@ class AdvancedSEOAnalyzer:
         ecommerce_signals = {}
         
         # Termék indikátorok keresés
-        product_indicators = [
-            'ár', 'vásárlás', 'kosár', 'szállítás', 'termék', 'bolt', 'shop',
-            'webshop', 'áruház', 'kedvezmény', 'akció', 'ft', 'forint'
-        ]
-        
-        text_content = self.soup.get_text().lower()
-        found_indicators = [indicator for indicator in product_indicators if indicator in text_content]
+        text_content = self.get_text_layer().lower
+        found_indicators = PRODUCT_INDICATOR_MATCHER.found(text_content)
         ecommerce_signals['product_indicators'] = len(found_indicators)
         
         # Ár megjelenítés
@@ -1181,20 +1287,8 @@ class AdvancedSEOAnalyzer:
         has_prices = any(re.search(pattern, text_content, re.I) for pattern in price_patterns)
         ecommerce_signals['has_prices'] = has_prices
         
-        # Product schema
-        product_schema = False
-        json_ld_scripts = self.soup.find_all('script', {'type': 'application/ld+json'})
-        
-        for script in json_ld_scripts:
-            try:
-                data = json.loads(script.string)
-                if isinstance(data, dict):
-                    schema_type = data.get('@type', '')
-                    if 'Product' in schema_type or 'Offer' in schema_type:
-                        product_schema = True
-                        break
-            except:
-                continue
+        # Product schema (@graph és beágyazott entitások is)
+        product_schema = self.get_structured_data().has_type_containing('Product', 'Offer')
                 
         ecommerce_signals['has_product_schema'] = product_schema
         
@@ -1204,7 +1298,7 @@ class AdvancedSEOAnalyzer:
             score -= 3
             
         # Breadcrumb e-commerce specifikus
-        breadcrumb = self.soup.find('nav', {'aria-label': re.compile(r'breadcrumb', re.I)})
+        breadcrumb = self.index.first_matching('nav', 'aria-label', re.compile(r'breadcrumb', re.I))
         if len(found_indicators) > 5 and not breadcrumb:
             issues.append('E-commerce oldalon nincs breadcrumb navigáció')
             recommendations.append('Implementálj breadcrumb navigációt a kategóriákhoz')
@@ -1320,8 +1414,24 @@ def get_url_from_request():
         url = 'https://' + url
     if not validators.url(url):
         return None, jsonify({'error': 'Érvénytelen URL formátum'}), 400
+    try:
+        get_parser_backend(data.get('parser'))
+    except ValueError as e:
+        return None, jsonify({'error': str(e)}), 400
     return url, None, None
 
+def get_requested_modules():
+    """Kért modulok: ?modules=title,links vagy a JSON 'modules' mezője (None: mind); ismeretlenre ValueError"""
+    data = request.get_json(silent=True) or {}
+    modules = parse_module_names(request.args.get('modules') or data.get('modules'))
+    build_plan(modules)
+    return modules
+
+def create_analyzer(url):
+    """Elemző a kérésben megadott parser backenddel ('parser' mező)"""
+    data = request.get_json()
+    return AdvancedSEOAnalyzer(url, parser=data.get('parser'))
+
 @app.route('/api/analyze', methods=['POST'])
 def api_analyze():
     global current_analysis_data
@@ -1329,22 +1439,132 @@ def api_analyze():
     if error_resp:
         return error_resp, status
     try:
-        analyzer = AdvancedSEOAnalyzer(url)
-        analysis = analyzer.get_comprehensive_analysis()
-        if 'error' in analysis:
-            return jsonify(analysis), 500
-        current_analysis_data = analysis
-        return jsonify(analysis)
+        modules = get_requested_modules()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    try:
+        analyzer = create_analyzer(url)
+        success, result = analyzer.run_analysis(modules=modules)
+        if not success:
+            return jsonify({'error': result}), 500
+        current_analysis_data = result
+        return jsonify(result.to_dict())
     except Exception as e:
         return jsonify({'error': f'Elemzési hiba: {str(e)}'}), 500
 
+# Tömeges elemzés korlátai (szerver oldalon, kérésenként)
+BATCH_MAX_URLS = int(os.environ.get('SEO_BATCH_MAX_URLS', '10000'))
+BATCH_MAX_CONCURRENCY = int(os.environ.get('SEO_BATCH_CONCURRENCY', '50'))
+BATCH_DEADLINE = float(os.environ.get('SEO_BATCH_DEADLINE', '600'))
+BATCH_MAX_JOBS = int(os.environ.get('SEO_BATCH_MAX_JOBS', '4'))
+# Egyidejű tömeges elemzések korlátja; a munkafolyamat-készlet közös (batch_engine.get_shared_executor)
+batch_jobs = threading.BoundedSemaphore(BATCH_MAX_JOBS)
+
+def normalize_batch_url(url):
+    """URL előkészítése a get_url_from_request szabályaival: (url, None) vagy (None, hibaüzenet)"""
+    if not isinstance(url, str) or not url.strip():
+        return None, 'URL megadása kötelező'
+    url = url.strip()
+    if not url.startswith(('http://', 'https://')):
+        url = 'https://' + url
+    if not validators.url(url):
+        return None, 'Érvénytelen URL formátum'
+    return url, None
+
+def ndjson_line(record):
+    return json.dumps(record, ensure_ascii=False, default=str) + '\n'
+
+@app.route('/api/batch', methods=['POST'])
+def api_batch():
+    """Több URL elemzése; NDJSON válasz soronként egy eredménnyel, a befejezés sorrendjében
+    
+    Bemenet: {"urls": [...], "modules": [...] vagy "title,links", "parser": ..., "concurrency": ...}.
+    A hibás URL-ek és a sikertelen elemzések is soronként jelennek meg ("success": false),
+    az utolsó sor összesítés. A párhuzamosság felső korlátja és a határidő szerver oldali.
+    """
+    data = request.get_json(silent=True) or {}
+    urls = data.get('urls')
+    if not isinstance(urls, list) or not urls:
+        return jsonify({'error': 'URL lista megadása kötelező (urls)'}), 400
+    if len(urls) > BATCH_MAX_URLS:
+        return jsonify({'error': f'Legfeljebb {BATCH_MAX_URLS} URL adható meg egy kérésben'}), 400
+    try:
+        modules = get_requested_modules()
+        get_parser_backend(data.get('parser'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    try:
+        concurrency = min(int(data.get('concurrency') or BATCH_MAX_CONCURRENCY), BATCH_MAX_CONCURRENCY)
+    except (TypeError, ValueError):
+        concurrency = 0
+    if concurrency < 1:
+        return jsonify({'error': 'A concurrency értéke pozitív egész szám'}), 400
+    
+    valid, invalid = [], []
+    for url in urls:
+        normalized, error = normalize_batch_url(url)
+        if error:
+            invalid.append((url, error))
+        else:
+            valid.append(normalized)
+    if not batch_jobs.acquire(blocking=False):
+        response = jsonify({'error': 'Túl sok egyidejű tömeges elemzés, próbálja újra később'})
+        response.headers['Retry-After'] = '30'
+        return response, 503
+    try:
+        results = analyze_batch(valid, deadline=BATCH_DEADLINE, modules=modules, parser=data.get('parser'),
+                                concurrency=concurrency, executor=get_shared_executor())
+    except Exception:
+        batch_jobs.release()
+        raise
+    
+    def generate():
+        started = time.time()
+        succeeded = failed = 0
+        for url, error in invalid:
+            failed += 1
+            yield ndjson_line({'url': url, 'success': False, 'error': error})
+        # Határidő után a válasz nélkül maradt URL-ek is hibasort kapnak
+        unfinished = {}
+        for url in valid:
+            unfinished[url] = unfinished.get(url, 0) + 1
+        try:
+            for url, success, result in results:
+                unfinished[url] -= 1
+                if success:
+                    succeeded += 1
+                    yield ndjson_line({'url': url, 'success': True, 'result': result.to_dict()})
+                else:
+                    failed += 1
+                    yield ndjson_line({'url': url, 'success': False, 'error': result})
+        finally:
+            # Megszakadt kliensnél a folyamatban lévő elemzések is leállnak
+            results.close()
+        timed_out = 0
+        for url, count in unfinished.items():
+            for _ in range(count):
+                timed_out += 1
+                yield ndjson_line({'url': url, 'success': False, 'error': f'Határidő túllépve ({BATCH_DEADLINE:g} s)'})
+        yield ndjson_line({'summary': {
+            'total': len(urls),
+            'succeeded': succeeded,
+            'failed': failed,
+            'timed_out': timed_out,
+            'elapsed': round(time.time() - started, 2)
+        }})
+    
+    response = Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+    # A hely a válasz lezárásakor szabadul fel (akkor is, ha a kliens a stream előtt bont)
+    response.call_on_close(batch_jobs.release)
+    return response
+
 @app.route('/api/title', methods=['POST'])
 def api_title():
     url, error_resp, status = get_url_from_request()
     if error_resp:
         return error_resp, status
-    analyzer = AdvancedSEOAnalyzer(url)
-    ok, msg = analyzer.fetch_page()
+    analyzer = create_analyzer(url)
+    ok, msg = analyzer.fetch_page(analyzer.analyze_title)
     if not ok:
         return jsonify({'error': msg}), 500
     return jsonify(analyzer.analyze_title())
@@ -1354,8 +1574,8 @@ def api_meta_description():
     url, error_resp, status = get_url_from_request()
     if error_resp:
         return error_resp, status
-    analyzer = AdvancedSEOAnalyzer(url)
-    ok, msg = analyzer.fetch_page()
+    analyzer = create_analyzer(url)
+    ok, msg = analyzer.fetch_page(analyzer.analyze_meta_description)
     if not ok:
         return jsonify({'error': msg}), 500
     return jsonify(analyzer.analyze_meta_description())
@@ -1365,8 +1585,8 @@ def api_headings():
     url, error_resp, status = get_url_from_request()
     if error_resp:
         return error_resp, status
-    analyzer = AdvancedSEOAnalyzer(url)
-    ok, msg = analyzer.fetch_page()
+    analyzer = create_analyzer(url)
+    ok, msg = analyzer.fetch_page(analyzer.analyze_headings)
     if not ok:
         return jsonify({'error': msg}), 500
     return jsonify(analyzer.analyze_headings())
@@ -1376,8 +1596,8 @@ def api_images():
     url, error_resp, status = get_url_from_request()
     if error_resp:
         return error_resp, status
-    analyzer = AdvancedSEOAnalyzer(url)
-    ok, msg = analyzer.fetch_page()
+    analyzer = create_analyzer(url)
+    ok, msg = analyzer.fetch_page(analyzer.analyze_images)
     if not ok:
         return jsonify({'error': msg}), 500
     return jsonify(analyzer.analyze_images())
@@ -1387,8 +1607,8 @@ def api_links():
     url, error_resp, status = get_url_from_request()
     if error_resp:
         return error_resp, status
-    analyzer = AdvancedSEOAnalyzer(url)
-    ok, msg = analyzer.fetch_page()
+    analyzer = create_analyzer(url)
+    ok, msg = analyzer.fetch_page(analyzer.analyze_links)
     if not ok:
         return jsonify({'error': msg}), 500
     return jsonify(analyzer.analyze_links())
@@ -1398,8 +1618,8 @@ def api_structured_data():
     url, error_resp, status = get_url_from_request()
     if error_resp:
         return error_resp, status
-    analyzer = AdvancedSEOAnalyzer(url)
-    ok, msg = analyzer.fetch_page()
+    analyzer = create_analyzer(url)
+    ok, msg = analyzer.fetch_page(analyzer.analyze_structured_data)
     if not ok:
         return jsonify({'error': msg}), 500
     return jsonify(analyzer.analyze_structured_data())
@@ -1409,8 +1629,8 @@ def api_performance():
     url, error_resp, status = get_url_from_request()
     if error_resp:
         return error_resp, status
-    analyzer = AdvancedSEOAnalyzer(url)
-    ok, msg = analyzer.fetch_page()
+    analyzer = create_analyzer(url)
+    ok, msg = analyzer.fetch_page(analyzer.analyze_performance)
     if not ok:
         return jsonify({'error': msg}), 500
     return jsonify(analyzer.analyze_performance())
@@ -1420,8 +1640,8 @@ def api_mobile_friendly():
     url, error_resp, status = get_url_from_request()
     if error_resp:
         return error_resp, status
-    analyzer = AdvancedSEOAnalyzer(url)
-    ok, msg = analyzer.fetch_page()
+    analyzer = create_analyzer(url)
+    ok, msg = analyzer.fetch_page(analyzer.analyze_mobile_friendly)
     if not ok:
         return jsonify({'error': msg}), 500
     return jsonify(analyzer.analyze_mobile_friendly())
@@ -1431,8 +1651,8 @@ def api_seo_fundamentals():
     url, error_resp, status = get_url_from_request()
     if error_resp:
         return error_resp, status
-    analyzer = AdvancedSEOAnalyzer(url)
-    ok, msg = analyzer.fetch_page()
+    analyzer = create_analyzer(url)
+    ok, msg = analyzer.fetch_page(analyzer.analyze_seo_fundamentals)
     if not ok:
         return jsonify({'error': msg}), 500
     return jsonify(analyzer.analyze_seo_fundamentals())
@@ -1442,8 +1662,8 @@ def api_content_quality():
     url, error_resp, status = get_url_from_request()
     if error_resp:
         return error_resp, status
-    analyzer = AdvancedSEOAnalyzer(url)
-    ok, msg = analyzer.fetch_page()
+    analyzer = create_analyzer(url)
+    ok, msg = analyzer.fetch_page(analyzer.analyze_content_quality)
     if not ok:
         return jsonify({'error': msg}), 500
     return jsonify(analyzer.analyze_content_quality())
@@ -1453,8 +1673,8 @@ def api_technical_seo():
     url, error_resp, status = get_url_from_request()
     if error_resp:
         return error_resp, status
-    analyzer = AdvancedSEOAnalyzer(url)
-    ok, msg = analyzer.fetch_page()
+    analyzer = create_analyzer(url)
+    ok, msg = analyzer.fetch_page(analyzer.analyze_technical_seo)
     if not ok:
         return jsonify({'error': msg}), 500
     return jsonify(analyzer.analyze_technical_seo())
@@ -1464,8 +1684,8 @@ def api_social_media_optimization():
     url, error_resp, status = get_url_from_request()
     if error_resp:
         return error_resp, status
-    analyzer = AdvancedSEOAnalyzer(url)
-    ok, msg = analyzer.fetch_page()
+    analyzer = create_analyzer(url)
+    ok, msg = analyzer.fetch_page(analyzer.analyze_social_media_optimization)
     if not ok:
         return jsonify({'error': msg}), 500
     return jsonify(analyzer.analyze_social_media_optimization())
@@ -1475,8 +1695,8 @@ def api_accessibility_seo():
     url, error_resp, status = get_url_from_request()
     if error_resp:
         return error_resp, status
-    analyzer = AdvancedSEOAnalyzer(url)
-    ok, msg = analyzer.fetch_page()
+    analyzer = create_analyzer(url)
+    ok, msg = analyzer.fetch_page(analyzer.analyze_accessibility_seo)
     if not ok:
         return jsonify({'error': msg}), 500
     return jsonify(analyzer.analyze_accessibility_seo())
@@ -1486,8 +1706,8 @@ def api_core_web_vitals():
     url, error_resp, status = get_url_from_request()
     if error_resp:
         return error_resp, status
-    analyzer = AdvancedSEOAnalyzer(url)
-    ok, msg = analyzer.fetch_page()
+    analyzer = create_analyzer(url)
+    ok, msg = analyzer.fetch_page(analyzer.analyze_core_web_vitals)
     if not ok:
         return jsonify({'error': msg}), 500
     return jsonify(analyzer.analyze_core_web_vitals())
@@ -1497,8 +1717,8 @@ def api_local_seo():
     url, error_resp, status = get_url_from_request()
     if error_resp:
         return error_resp, status
-    analyzer = AdvancedSEOAnalyzer(url)
-    ok, msg = analyzer.fetch_page()
+    analyzer = create_analyzer(url)
+    ok, msg = analyzer.fetch_page(analyzer.analyze_local_seo)
     if not ok:
         return jsonify({'error': msg}), 500
     return jsonify(analyzer.analyze_local_seo())
@@ -1508,8 +1728,8 @@ def api_e_commerce_seo():
     url, error_resp, status = get_url_from_request()
     if error_resp:
         return error_resp, status
-    analyzer = AdvancedSEOAnalyzer(url)
-    ok, msg = analyzer.fetch_page()
+    analyzer = create_analyzer(url)
+    ok, msg = analyzer.fetch_page(analyzer.analyze_e_commerce_seo)
     if not ok:
         return jsonify({'error': msg}), 500
     return jsonify(analyzer.analyze_e_commerce_seo())
@@ -1533,6 +1753,7 @@ def api_export(format):
             'Links Score', 'Internal Links', 'External Links',
             'Structured Data Score', 'Valid JSON-LD', 'Schema Types',
             'Performance Score', 'Page Size (KB)', 'Load Time (s)',
+            'DNS (s)', 'Connect (s)', 'TLS (s)', 'TTFB (s)', 'Server Wait (s)', 'Download (s)',
             'Mobile Score', 'Has Viewport', 'Responsive Images',
             'SEO Fundamentals Score', 'Robots.txt', 'Sitemap',
             'Content Quality Score', 'Word Count', 'Paragraph Count',
@@ -1569,6 +1790,12 @@ def api_export(format):
             current_analysis_data.get('performance', {}).get('score', 0),
             current_analysis_data.get('performance', {}).get('page_size_kb', 0),
             current_analysis_data.get('performance', {}).get('load_time_seconds', 0),
+            current_analysis_data.get('timings', {}).get('dns', ''),
+            current_analysis_data.get('timings', {}).get('connect', ''),
+            current_analysis_data.get('timings', {}).get('tls', ''),
+            current_analysis_data.get('timings', {}).get('ttfb', ''),
+            current_analysis_data.get('timings', {}).get('wait', ''),
+            current_analysis_data.get('timings', {}).get('download', ''),
             current_analysis_data.get('mobile_friendly', {}).get('score', 0),
             current_analysis_data.get('mobile_friendly', {}).get('has_viewport', False),
             current_analysis_data.get('mobile_friendly', {}).get('responsive_images', 0),
@@ -0,0 +1,438 @@
+import asyncio
+import os
+import ssl
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import timedelta
+
+import aiohttp
+
+from fetch_timing import build_timings
+from host_scheduler import HostScheduler, HostSlotTimeout, parse_retry_after
+from http_client import (
+    DEFAULT_CHUNK_SIZE, DEFAULT_DOWNLOAD_DEADLINE, DEFAULT_HEADERS, DEFAULT_MAX_BODY_BYTES, FetchedPage
+)
+from network_probes import PROBE_MAX_BYTES, PROBE_RETRY_POLICY, probe_result
+from network_probes import NetworkProbes, NetworkTimeline
+from retry_policy import RetryPolicy, attempt_record
+
+# Átmeneti hálózati hibák, amelyek után újrapróbálunk
+RETRYABLE_EXCEPTIONS = (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError, asyncio.TimeoutError)
+
+# Tanúsítvány ellenőrzés kérésenként (a session alapértelmezése ssl=False, az oldal letöltéséhez)
+VERIFIED_SSL_CONTEXT = ssl.create_default_context()
+
+
+class AsyncSEOEngine:
+    """asyncio alapú elemző motor: minden hálózati kérés egy eseményhurkon, korlátozott párhuzamossággal"""
+
+    def __init__(self, concurrency=100, per_host_limit=8, timeout=20, probe_timeout=5,
+                 headers=None, cpu_workers=None, analyzer_class=None,
+                 max_body_bytes=DEFAULT_MAX_BODY_BYTES, download_deadline=DEFAULT_DOWNLOAD_DEADLINE,
+                 scheduler=None, retry_policy=None, politeness=True, slot_timeout=None):
+        self.concurrency = concurrency
+        self.per_host_limit = per_host_limit
+        self.timeout = timeout
+        self.probe_timeout = probe_timeout
+        self.headers = dict(headers or DEFAULT_HEADERS)
+        self.cpu_workers = cpu_workers or os.cpu_count() or 4
+        self.analyzer_class = analyzer_class
+        self.max_body_bytes = max_body_bytes
+        self.download_deadline = download_deadline
+        # Tömeges letöltésnél saját host ütemező (robots.txt, crawl-delay, AIMD); politeness=False kikapcsolja.
+        # A robots.txt-t a motor tölti le a saját session-jével, az ütemező csak feldolgozza
+        if scheduler is None and politeness:
+            scheduler = HostScheduler(user_agent=self.headers.get('User-Agent', '*'))
+        self.scheduler = scheduler
+        # A host ütemezőre várakozás felső korlátja (None: nincs); a sorban állás nem számít bele
+        # a kérés időkorlátjába, így egy hostra irányuló nagy köteg sem hiúsul meg várakozás miatt
+        self.slot_timeout = slot_timeout
+        self.retry_policy = retry_policy or RetryPolicy()
+        # Host -> robots.txt betöltő task (hostonként egyszer, a várakozók osztoznak rajta)
+        self._robots_tasks = {}
+        # Host -> az utolsó kapcsolatfelépítés ideje (újrahasznosított kapcsolatok időzítéséhez)
+        self._connection_setups = {}
+        self._session = None
+        self._cpu_executor = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def start(self):
+        """HTTP session és feldolgozó szálkészlet létrehozása"""
+        if self._session is None:
+            connector = aiohttp.TCPConnector(
+                limit=self.concurrency,
+                limit_per_host=self.per_host_limit,
+                ttl_dns_cache=300,
+                ssl=False
+            )
+            self._session = aiohttp.ClientSession(connector=connector, headers=self.headers,
+                                                  trace_configs=[self._timing_trace_config()])
+            self._cpu_executor = ThreadPoolExecutor(max_workers=self.cpu_workers, thread_name_prefix='seo-parse')
+        if self.analyzer_class is None:
+            from app import AdvancedSEOAnalyzer
+            self.analyzer_class = AdvancedSEOAnalyzer
+
+    @staticmethod
+    def _timing_trace_config():
+        """Kapcsolatfelépítés mérése aiohttp trace eseményekkel (a TLS a connect időben van)"""
+        async def on_connection_create_start(session, context, params):
+            context.trace_request_ctx['pending'] = {'started': time.perf_counter(), 'dns': 0.0}
+
+        async def on_dns_resolvehost_start(session, context, params):
+            context.dns_started = time.perf_counter()
+
+        async def on_dns_resolvehost_end(session, context, params):
+            pending = context.trace_request_ctx.get('pending')
+            if pending is not None:
+                pending['dns'] += time.perf_counter() - context.dns_started
+
+        async def on_connection_create_end(session, context, params):
+            request_ctx = context.trace_request_ctx
+            pending = request_ctx.pop('pending', None)
+            if pending is not None:
+                setup = time.perf_counter() - pending['started']
+                request_ctx['connections'].append({
+                    'dns': pending['dns'],
+                    'connect': max(0.0, setup - pending['dns']),
+                    'tls': None if request_ctx['tls'] else 0.0
+                })
+
+        # A kérésenkénti adatokat a _fetch_once adja át (trace_request_ctx)
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_connection_create_start.append(on_connection_create_start)
+        trace_config.on_dns_resolvehost_start.append(on_dns_resolvehost_start)
+        trace_config.on_dns_resolvehost_end.append(on_dns_resolvehost_end)
+        trace_config.on_connection_create_end.append(on_connection_create_end)
+        return trace_config
+
+    async def close(self):
+        """Kapcsolatok és szálak lezárása"""
+        loading = [task for task in self._robots_tasks.values() if not task.done()]
+        for task in loading:
+            task.cancel()
+        if loading:
+            await asyncio.gather(*loading, return_exceptions=True)
+        self._robots_tasks.clear()
+        if self._session is not None:
+            await self._session.close()
+            self._cpu_executor.shutdown(wait=False)
+            self._session = None
+            self._cpu_executor = None
+
+    async def fetch(self, url, timeout=None, max_bytes=None, retry_policy=None, verify=False, priority=False):
+        """Egy URL letöltése a host ütemezőn keresztül, átmeneti hibáknál újrapróbálással
+
+        verify: TLS tanúsítvány ellenőrzés; priority: soron kívül, a host limitjére
+        és a crawl-delay-re várakozás nélkül (pl. robots.txt / sitemap ellenőrzések).
+        """
+        policy = retry_policy or self.retry_policy
+        attempts = []
+        origin = time.perf_counter()
+        backoff = 0.0
+        number = 1
+        while True:
+            try:
+                page = await self._hedged_attempt(url, timeout, max_bytes, policy, number, attempts, origin, backoff,
+                                                  verify, priority)
+            except HostSlotTimeout:
+                raise
+            except RETRYABLE_EXCEPTIONS:
+                if not policy.should_retry(number):
+                    raise
+                backoff = policy.backoff(number)
+            else:
+                if not policy.should_retry(number, page.status_code):
+                    break
+                backoff = policy.backoff(number, parse_retry_after(page.headers.get('Retry-After')))
+            await asyncio.sleep(backoff)
+            number += 1
+        page.attempts = attempts
+        return page
+
+    async def _hedged_attempt(self, url, timeout, max_bytes, policy, number, attempts, origin, backoff,
+                              verify=False, priority=False):
+        """Egy próbálkozás; ha a percentilisnél tovább tart, egy második kérés is indul és a gyorsabb nyer"""
+        hedge_after = policy.hedge_delay()
+        primary = asyncio.ensure_future(
+            self._attempt(url, timeout, max_bytes, policy, number, False, attempts, origin, backoff, verify, priority)
+        )
+        if hedge_after is None:
+            return await primary
+        done, _ = await asyncio.wait({primary}, timeout=hedge_after)
+        if done:
+            return primary.result()
+
+        hedge = asyncio.ensure_future(
+            self._attempt(url, timeout, max_bytes, policy, number, True, attempts, origin, 0.0, verify, priority)
+        )
+        pending = {primary, hedge}
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+            return primary.result()
+        finally:
+            # A vesztes kérés megszakítása (a host foglalás a finally ágban szabadul fel)
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+    async def _attempt(self, url, timeout, max_bytes, policy, number, hedge, attempts, origin, backoff,
+                       verify=False, priority=False):
+        started = time.perf_counter()
+        record = attempt_record(number, hedge, origin, started, backoff)
+        attempts.append(record)
+        try:
+            await self._acquire_slot(url, priority)
+            # Megszakított (vesztes hedged) kérésnél nincs megfigyelés, a host limit nem változik
+            outcome = {}
+            try:
+                page = await self._fetch_once(url, timeout, max_bytes, verify)
+                outcome = {
+                    'latency': page.ttfb,
+                    'status_code': page.status_code,
+                    'retry_after': parse_retry_after(page.headers.get('Retry-After'))
+                }
+            except Exception:
+                outcome = {'error': True}
+                raise
+            finally:
+                if self.scheduler is not None:
+                    self.scheduler.release(url, **outcome)
+            record['status_code'] = page.status_code
+            if page.status_code not in policy.retry_status_codes:
+                policy.latency.observe(time.perf_counter() - started)
+            return page
+        except asyncio.CancelledError:
+            record['error'] = 'Cancelled'
+            raise
+        except Exception as e:
+            record['error'] = type(e).__name__
+            raise
+        finally:
+            record['duration'] = round(time.perf_counter() - started, 3)
+
+    async def _acquire_slot(self, url, priority=False):
+        """Host foglalás; slot_timeout megadásakor legfeljebb annyi várakozással, utána HostSlotTimeout"""
+        if self.scheduler is None:
+            return
+        if priority:
+            self.scheduler.try_acquire(url, priority=True)
+            return
+        timeout = self.slot_timeout
+        expires = time.monotonic() + timeout if timeout is not None else None
+        host = self.scheduler.host_key(url)
+        await self._prepare_host(url, timeout)
+        while True:
+            wait = self.scheduler.try_acquire(url)
+            if not wait:
+                return
+            if expires is not None:
+                remaining = expires - time.monotonic()
+                if remaining <= 0:
+                    raise HostSlotTimeout(f'Host ütemező időtúllépés: {host}')
+                wait = min(wait, remaining)
+            await asyncio.sleep(wait)
+
+    async def _prepare_host(self, url, timeout=None):
+        """A host robots.txt-jének egyszeri betöltése az eseményhurkon, legfeljebb timeout másodperc várakozással"""
+        host = self.scheduler.host_key(url)
+        task = self._robots_tasks.get(host)
+        if task is None:
+            if self.scheduler.is_prepared(url):
+                return
+            task = self._robots_tasks[host] = asyncio.ensure_future(self._load_robots(url))
+        if task.done():
+            return
+        try:
+            # A betöltés a várakozó megszakításakor (időkorlát) is fut tovább a többi kérésnek
+            await asyncio.wait_for(asyncio.shield(task), timeout)
+        except asyncio.TimeoutError:
+            raise HostSlotTimeout(f'Host ütemező időtúllépés: {host}') from None
+
+    async def _load_robots(self, url):
+        robots_url = f'{self.scheduler.host_key(url)}/robots.txt'
+        try:
+            # Közvetlen letöltés: a robots.txt nem megy át a host ütemezőn
+            page = await self._fetch_once(robots_url, self.probe_timeout, PROBE_MAX_BYTES, verify=True)
+            status_code, text = page.status_code, page.content.decode('utf-8', 'replace')
+        except Exception:
+            status_code, text = None, None
+        self.scheduler.load_robots(url, status_code, text)
+
+    async def can_fetch(self, url):
+        """robots.txt szerint lekérhető-e az URL (kikapcsolt ütemezőnél mindig True)"""
+        if self.scheduler is None:
+            return True
+        await self.start()
+        await self._prepare_host(url)
+        return self.scheduler.can_fetch(url)
+
+    async def _fetch_once(self, url, timeout=None, max_bytes=None, verify=False):
+        """Egy URL streamelt letöltése FetchedPage formában, bájtkerettel és határidővel"""
+        max_bytes = self.max_body_bytes if max_bytes is None else max_bytes
+        started = time.perf_counter()
+        client_timeout = aiohttp.ClientTimeout(total=None, sock_connect=timeout or self.timeout,
+                                               sock_read=timeout or self.timeout)
+        trace_ctx = {'connections': [], 'tls': url.lower().startswith('https://')}
+        extra = {'ssl': VERIFIED_SSL_CONTEXT} if verify else {}
+        async with self._session.get(url, timeout=client_timeout, allow_redirects=True,
+                                     trace_request_ctx=trace_ctx, **extra) as response:
+            ttfb = time.perf_counter() - started
+            origin = str(response.url.origin())
+            if trace_ctx['connections']:
+                self._connection_setups[origin] = trace_ctx['connections'][-1]
+            setup = self._connection_setups.get(origin)
+            parts = []
+            received = 0
+            truncated_reason = None
+            async for chunk in response.content.iter_chunked(DEFAULT_CHUNK_SIZE):
+                parts.append(chunk)
+                received += len(chunk)
+                if received > max_bytes:
+                    truncated_reason = 'max_bytes'
+                    break
+                if time.perf_counter() - started > self.download_deadline:
+                    truncated_reason = 'deadline'
+                    break
+            if truncated_reason is not None:
+                # A félbehagyott kapcsolat nem kerülhet vissza a poolba
+                response.close()
+            content = b''.join(parts)[:max_bytes]
+            download_time = time.perf_counter() - started - ttfb
+            return FetchedPage(
+                url=str(response.url),
+                status_code=response.status,
+                headers=response.headers,
+                content=content,
+                elapsed=timedelta(seconds=ttfb),
+                reason=response.reason or '',
+                ttfb=ttfb,
+                download_time=download_time,
+                truncated=truncated_reason is not None,
+                truncated_reason=truncated_reason,
+                timings=build_timings(trace_ctx['connections'], ttfb, download_time, len(response.history), setup)
+            )
+
+    async def _probe(self, name, url):
+        try:
+            # Az ellenőrzések (mint korábban) tanúsítvány ellenőrzéssel futnak; soron kívül, hogy a
+            # host sorában várakozás ne jelenjen meg hiányzó robots.txt / sitemap eredményként
+            page = await self.fetch(url, timeout=self.probe_timeout, max_bytes=PROBE_MAX_BYTES,
+                                    retry_policy=PROBE_RETRY_POLICY, verify=True, priority=True)
+            return probe_result(name, url, page)
+        except Exception:
+            return None
+
+    @staticmethod
+    async def _timed(timeline, name, coro):
+        started = time.perf_counter()
+        try:
+            return await coro
+        finally:
+            timeline.record(name, started, time.perf_counter())
+
+    def _start_probes(self, url, timeline):
+        """Ellenőrzések indítása; az eredmények a feldolgozó szál felé Future-ökön érkeznek"""
+        probes = NetworkProbes(url, None, timeline)
+        tasks = []
+        for name, probe_url in probes.probe_urls().items():
+            future = Future()
+            probes.futures[name] = future
+            task = asyncio.ensure_future(self._timed(timeline, name, self._probe(name, probe_url)))
+            task.add_done_callback(lambda t, f=future: f.set_result(None if t.cancelled() else t.result()))
+            tasks.append(task)
+        return probes, tasks
+
+    async def site_checks(self, base_url, timeline=None):
+        """robots.txt és sitemap ellenőrzések egy adott alap URL-en (pl. a host gyökerén), kész NetworkProbes-ként"""
+        await self.start()
+        probes, tasks = self._start_probes(base_url, timeline or NetworkTimeline())
+        await asyncio.gather(*tasks)
+        return probes
+
+    async def prefetch(self, url, timeline, probes=True):
+        """Oldal és ellenőrzések letöltése, mindkettő megvárásával: (FetchedPage, ellenőrzés név -> eredmény)
+
+        Másik folyamatban futó elemzéshez (batch_engine): az ellenőrzések eredménye
+        egyszerű szótár. Az oldal letöltési hibája kivételként jön, a futó
+        ellenőrzések ilyenkor megszakadnak.
+        """
+        await self.start()
+        if probes:
+            network_probes, probe_tasks = self._start_probes(url, timeline)
+        else:
+            network_probes, probe_tasks = None, []
+        try:
+            page = await self._timed(timeline, 'page_fetch', self.fetch(url))
+        except BaseException:
+            # Letöltési hiba vagy megszakítás: az ellenőrzések sem futhatnak tovább
+            for task in probe_tasks:
+                task.cancel()
+            await asyncio.gather(*probe_tasks, return_exceptions=True)
+            raise
+        if network_probes is None:
+            return page, None
+        return page, dict(zip(network_probes.futures, await asyncio.gather(*probe_tasks)))
+
+    async def analyze(self, url):
+        """Egy URL teljes elemzése (letöltés és ellenőrzések párhuzamosan)"""
+        await self.start()
+        # Az oldalak már párhuzamosan futnak, az oldalon belüli modulok sorban
+        analyzer = self.analyzer_class(url, parallel_modules=False)
+        analyzer.start_time = time.time()
+        timeline = analyzer.timeline = NetworkTimeline()
+        analyzer.probes, probe_tasks = self._start_probes(url, timeline)
+
+        try:
+            page = await self._timed(timeline, 'page_fetch', self.fetch(url))
+        except Exception as e:
+            for task in probe_tasks:
+                task.cancel()
+            return {'error': f'Nem sikerült betölteni a weboldalt: {self.error_message(e)}'}
+
+        # A feldolgozás CPU-igényes, ezért nem az eseményhurkon fut
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._cpu_executor, analyzer.get_comprehensive_analysis, page)
+
+    async def analyze_many(self, urls):
+        """Több URL elemzése egyszerre; az eredmények a bemenet sorrendjében"""
+        await self.start()
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def bounded(url):
+            async with semaphore:
+                try:
+                    return await self.analyze(url)
+                except Exception as e:
+                    return {'url': url, 'error': f'Elemzési hiba: {str(e)}'}
+
+        return await asyncio.gather(*(bounded(url) for url in urls))
+
+    def error_message(self, error):
+        if isinstance(error, HostSlotTimeout):
+            return f"Időtúllépés - A host ütemezőre várakozás túllépte az időkorlátot (>{self.slot_timeout}s)"
+        if isinstance(error, asyncio.TimeoutError):
+            return f"Időtúllépés - A weboldal túl lassan válaszol (>{self.timeout}s)"
+        if isinstance(error, aiohttp.ClientConnectionError):
+            return "Kapcsolódási hiba - Nem sikerült elérni a weboldalt"
+        if isinstance(error, aiohttp.ClientError):
+            return f"Kérés hiba: {str(error)}"
+        return f"Váratlan hiba: {str(error)}"
+
+
+def analyze_urls(urls, **engine_options):
+    """Szinkron belépési pont: URL lista elemzése egyetlen eseményhurkon"""
+    async def run():
+        async with AsyncSEOEngine(**engine_options) as engine:
+            return await engine.analyze_many(urls)
+    return asyncio.run(run())
@@ -0,0 +1,270 @@
+import asyncio
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import resource_tracker, shared_memory
+
+from async_engine import AsyncSEOEngine
+from http_client import FetchedPage
+from module_registry import build_plan
+from network_probes import NetworkProbes, NetworkTimeline
+
+# Munkafolyamatok száma (alapértelmezés: a processzormagok száma)
+DEFAULT_BATCH_WORKERS = int(os.environ.get('SEO_BATCH_WORKERS', '0')) or os.cpu_count() or 4
+
+
+def export_page(page):
+    """Letöltött oldal átadása: a törzs megosztott memória szegmensbe, a többi mező egyszerű szótárba
+
+    (szegmens, leírás) párt ad; a szegmenst a szülő zárja le és törli, miután a
+    munkafolyamat végzett. A leírás kicsi, ez megy pickle-lel a folyamatok között.
+    """
+    size = len(page.content)
+    segment = shared_memory.SharedMemory(create=True, size=max(size, 1))
+    segment.buf[:size] = page.content
+    state = dict(vars(page))
+    state['content'] = None
+    return segment, (segment.name, size, state)
+
+
+def import_page(name, size, state):
+    """export_page() leírásából FetchedPage a munkafolyamatban (a törzs egyszer másolódik ki)"""
+    # A munkafolyamatok a szülő resource trackerét használják: a csatlakozás ott nem
+    # új bejegyzés, a szegmenst a szülő unlink() hívása törli és jelenti ki
+    segment = shared_memory.SharedMemory(name=name)
+    try:
+        content = bytes(segment.buf[:size])
+    finally:
+        segment.close()
+    page = FetchedPage.__new__(FetchedPage)
+    vars(page).update(state)
+    page.content = content
+    return page
+
+
+def _init_worker():
+    # Az elemző (és a szótárak, automaták) betöltése egyszer, az első oldal előtt
+    import app  # noqa: F401
+
+
+def _analyze_shared(url, shared_page, probe_results, timeline, start_time, collect_links, parser, modules):
+    from app import AdvancedSEOAnalyzer
+    page = import_page(*shared_page)
+    # A folyamatkészlet oldalanként párhuzamosít, az oldalon belüli modulok sorban futnak
+    analyzer = AdvancedSEOAnalyzer(url, parser=parser, parallel_modules=False, collect_links=collect_links)
+    analyzer.start_time = start_time
+    analyzer.timeline = timeline
+    if probe_results is not None:
+        analyzer.probes = NetworkProbes.from_results(url, probe_results, timeline)
+    success, result = analyzer.run_analysis(page, modules)
+    return success, result, analyzer.discovered_links or []
+
+
+def _new_executor(workers):
+    # A resource tracker a munkafolyamatok előtt induljon, hogy azok a szülőét örököljék
+    resource_tracker.ensure_running()
+    return ProcessPoolExecutor(max_workers=workers, initializer=_init_worker)
+
+
+_shared_executor = None
+_shared_executor_lock = threading.Lock()
+
+
+def _reset_after_fork():
+    # A gyermek folyamat nem használhatja a szülő munkafolyamatait
+    global _shared_executor, _shared_executor_lock
+    _shared_executor = None
+    _shared_executor_lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def get_shared_executor():
+    """A folyamat szintű megosztott munkafolyamat-készlet (lusta indítással, DEFAULT_BATCH_WORKERS korláttal)
+
+    Több egyidejű tömeges elemzés (pl. REST kérések) ezen osztozik, így a
+    munkafolyamatok száma összesen sem haladja meg a korlátot. Egy munkafolyamat
+    összeomlása után a következő hívás új készletet indít.
+    """
+    global _shared_executor
+    with _shared_executor_lock:
+        if _shared_executor is None or getattr(_shared_executor, '_broken', False):
+            _shared_executor = _new_executor(DEFAULT_BATCH_WORKERS)
+        return _shared_executor
+
+
+class BatchEngine:
+    """Tömeges elemzés folyamatkészlettel: letöltés a szülő eseményhurkán, feldolgozás munkafolyamatokban
+
+    A parse-olás és az elemzők tiszta Python CPU munka, szálakon egy magot
+    használnának. A letöltött törzs megosztott memória szegmensben jut a
+    munkafolyamathoz (nem pickle másolatként), vissza csak a kompakt
+    AnalysisResult rekord érkezik. A feldolgozásra váró oldalak számát
+    max_pending, a letöltéseket az AsyncSEOEngine concurrency korlátja fogja
+    vissza, így a memória a feladat méretétől független. executor megadásakor
+    (pl. get_shared_executor()) a motor azt használja és nem állítja le.
+    """
+
+    def __init__(self, workers=None, modules=None, parser=None, max_pending=None, executor=None, **engine_options):
+        self.workers = workers or DEFAULT_BATCH_WORKERS
+        # Ismeretlen modulnévre már itt ValueError
+        self.plan = build_plan(modules)
+        self.modules = modules
+        self.parser = parser
+        self.max_pending = max_pending or self.workers * 2
+        self.engine = AsyncSEOEngine(**engine_options)
+        self._pending = asyncio.Semaphore(self.max_pending)
+        self._executor = executor
+        self._owns_executor = executor is None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def start(self):
+        """HTTP session és munkafolyamatok indítása"""
+        await self.engine.start()
+        if self._executor is None:
+            self._executor = _new_executor(self.workers)
+
+    async def close(self):
+        """Kapcsolatok lezárása, a várakozó feladatok elvetése és a munkafolyamatok leállítása"""
+        await self.engine.close()
+        if self._executor is not None and self._owns_executor:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    async def analyze(self, url):
+        """Egy URL elemzése: (url, True, AnalysisResult) vagy (url, False, hibaüzenet)"""
+        url, success, result, _ = await self.analyze_with_links(url, collect_links=False)
+        return url, success, result
+
+    async def analyze_with_links(self, url, collect_links=True):
+        """Mint az analyze(), negyedik elemként az oldal belső linkjeivel (normalizált abszolút URL-ek)"""
+        await self.start()
+        start_time = time.time()
+        timeline = NetworkTimeline()
+        try:
+            page, probe_results = await self.engine.prefetch(url, timeline, self.plan.needs('probes'))
+        except Exception as e:
+            return url, False, f'Nem sikerült betölteni a weboldalt: {self.engine.error_message(e)}', []
+
+        async with self._pending:
+            segment, shared_page = export_page(page)
+            page = None
+            try:
+                loop = asyncio.get_running_loop()
+                success, result, links = await loop.run_in_executor(
+                    self._executor, _analyze_shared, url, shared_page, probe_results, timeline, start_time,
+                    collect_links, self.parser, self.modules
+                )
+            except Exception as e:
+                return url, False, f'Elemzési hiba: {str(e)}', []
+            finally:
+                segment.close()
+                segment.unlink()
+        return url, success, result, links
+
+    async def analyze_stream(self, urls):
+        """(url, siker, AnalysisResult vagy hibaüzenet) hármasok a befejezés sorrendjében
+
+        Az URL-ek lustán olvasódnak (generátor is lehet), egyszerre legfeljebb
+        concurrency + max_pending URL van folyamatban.
+        """
+        await self.start()
+        limit = self.engine.concurrency + self.max_pending
+        urls = iter(urls)
+        running = set()
+        try:
+            while True:
+                for url in urls:
+                    running.add(asyncio.ensure_future(self.analyze(url)))
+                    if len(running) >= limit:
+                        break
+                if not running:
+                    return
+                done, running = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield task.result()
+        finally:
+            # Megszakított futásnál (pl. lezárt generátor) a folyamatban lévő elemzések is leállnak
+            for task in running:
+                task.cancel()
+            if running:
+                await asyncio.gather(*running, return_exceptions=True)
+
+    async def run(self, urls):
+        """analyze_stream() a motor indításával és lezárásával"""
+        async with self:
+            async for item in self.analyze_stream(urls):
+                yield item
+
+
+def analyze_batch(urls, deadline=None, **batch_options):
+    """Szinkron belépési pont: eredmény generátor, (url, siker, AnalysisResult vagy hibaüzenet) hármasokkal
+
+    Az eseményhurok háttérszálon fut, az eredmények a befejezés sorrendjében
+    érkeznek. A generátor lezárása (pl. megszakadt kliens) vagy a deadline
+    (másodperc az indítástól) lejárta leállítja a feldolgozást; ilyenkor a még
+    folyamatban lévő URL-ekre nem érkezik eredmény. Ismeretlen modulnévre
+    ValueError már a híváskor.
+    """
+    return iterate_in_thread(BatchEngine(**batch_options).run(urls), deadline)
+
+
+def iterate_in_thread(stream, deadline=None):
+    """Async generator bejárása szinkron generátorként, saját eseményhurokkal egy háttérszálon
+
+    A generátor lezárása vagy a deadline (másodperc) lejárta megszakítja a streamet.
+    """
+    results = queue.Queue()
+    finished = object()
+    errors = []
+    loop = asyncio.new_event_loop()
+
+    async def produce():
+        async for item in stream:
+            results.put(item)
+
+    task = loop.create_task(produce())
+
+    def run():
+        try:
+            loop.run_until_complete(task)
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            errors.append(e)
+        finally:
+            loop.close()
+            results.put(finished)
+
+    thread = threading.Thread(target=run, name='seo-batch', daemon=True)
+    thread.start()
+    expires = time.monotonic() + deadline if deadline is not None else None
+    try:
+        while True:
+            try:
+                item = results.get(timeout=None if expires is None else max(0.0, expires - time.monotonic()))
+            except queue.Empty:
+                break
+            if item is finished:
+                break
+            yield item
+        if errors:
+            raise errors[0]
+    finally:
+        if thread.is_alive():
+            try:
+                loop.call_soon_threadsafe(task.cancel)
+            except RuntimeError:
+                # A hurok közben befejeződött
+                pass
+            thread.join()
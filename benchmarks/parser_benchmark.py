@@ -0,0 +1,332 @@
+"""Parser backendek összehasonlítása: sebesség és azonos elemzési eredmény
+
+Használat (a projekt gyökeréből):
+    python benchmarks/parser_benchmark.py
+    python benchmarks/parser_benchmark.py --pages 40 --scale 200 --repeat 3   # ~2 MB-os oldalak
+    python benchmarks/parser_benchmark.py --corpus ./mentett_oldalak   # saját .html fájlok
+    python benchmarks/parser_benchmark.py --memory   # memóriacsúcs oldalanként (tracemalloc)
+
+Alapértelmezésben determinisztikusan generált, valós oldalakhoz hasonló korpuszon fut
+(cikk, termékoldal, kategória lista, hírportál nyitóoldal, landing oldal sok inline
+JS/CSS-sel, lezáratlan <p>/<li> elemekkel, kommentekkel, SVG ikonokkal). A referencia
+a html.parser eredménye; minden backendnél kiírja, hány oldalon tér el bármelyik modul.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+from datetime import timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import AdvancedSEOAnalyzer  # noqa: E402
+from http_client import FetchedPage  # noqa: E402
+from parser_backends import available_parser_backends  # noqa: E402
+
+# A dokumentumból dolgozó modulok (a hálózati ellenőrzések nélkül)
+DOCUMENT_ANALYZERS = (
+    'analyze_title', 'analyze_meta_description', 'analyze_headings', 'analyze_images',
+    'analyze_links', 'analyze_structured_data', 'analyze_mobile_friendly', 'check_canonical',
+    'check_hreflang', 'check_favicon', 'analyze_content_quality', 'analyze_technical_seo',
+    'analyze_social_media_optimization', 'analyze_accessibility_seo', 'analyze_core_web_vitals',
+    'analyze_local_seo', 'analyze_e_commerce_seo'
+)
+REFERENCE_BACKEND = 'html.parser'
+
+WORDS = (
+    'termék ár szállítás budapest minőség kedvezmény webshop akció garancia vásárlás kosár '
+    'szolgáltatás ügyfél tapasztalat megoldás fejlesztés csapat partner ajánlat részletek '
+    'olvasás cikk hír esemény program időpont helyszín kapcsolat iroda utca tér'
+).split()
+
+SVG_ICON = ('<svg class="icon" viewBox="0 0 24 24" aria-hidden="true"><path d="M12 2L2 7l10 5 10-5-10-5z"/>'
+            '<path d="M2 17l10 5 10-5"/></svg>')
+
+
+def _sentence(rng, length=None):
+    words = [rng.choice(WORDS) for _ in range(length or rng.randint(6, 22))]
+    return ' '.join(words).capitalize() + rng.choice(('.', '.', '.', '!', '?'))
+
+
+def _paragraph(rng, closed=True):
+    text = ' '.join(_sentence(rng) for _ in range(rng.randint(2, 6)))
+    if rng.random() < 0.3:
+        text = text.replace(' ', ' <strong>', 1).replace('.', '</strong>.', 1)
+    if rng.random() < 0.2:
+        text += ' <a href="/cikk/%d">tovább</a>' % rng.randint(1, 500)
+    return '<p>%s%s\n' % (text, '</p>' if closed else '')
+
+
+def _head(rng, kind, index):
+    title = _sentence(rng, rng.randint(3, 9)).rstrip('.!?')
+    parts = [
+        '<!DOCTYPE html>',
+        '<html lang="hu">' if rng.random() < 0.8 else '<html>',
+        '<head>',
+        '<meta charset="utf-8">',
+        '<meta http-equiv="X-UA-Compatible" content="IE=edge">',
+        '<title>%s | Példa Kft.</title>' % title,
+        '<meta name="description" content="%s">' % _sentence(rng, 24),
+        '<meta name="viewport" content="width=device-width, initial-scale=1">',
+        '<link rel="canonical" href="https://pelda.hu/%s/%d">' % (kind, index),
+        '<link rel="icon" href="/favicon.ico">' if rng.random() < 0.7 else '<link rel="shortcut icon" href="/favicon.ico">',
+        '<link rel="alternate" hreflang="en" href="https://pelda.hu/en/%s/%d">' % (kind, index),
+        '<meta property="og:title" content="%s">' % title,
+        '<meta property="og:type" content="%s">' % ('product' if kind == 'termek' else 'article'),
+        '<meta property="og:image" content="https://pelda.hu/img/%d.jpg">' % index,
+        '<meta name="twitter:card" content="summary_large_image">',
+        '<!-- Google Tag Manager -->',
+        '<script>(function(w,d,s,l,i){w[l]=w[l]||[];w[l].push({"gtm.start":new Date().getTime()});})'
+        '(window,document,"script","dataLayer","GTM-XXXX");</script>',
+        '<link rel="stylesheet" href="/static/main.%d.css">' % index,
+        '<link rel="preload" href="/fonts/inter.woff2" as="font" crossorigin>',
+        '<script src="/static/vendor.js" defer></script>',
+        '<style>.hero{display:flex}@media (max-width:768px){.hero{display:block}}</style>',
+    ]
+    if kind == 'termek':
+        parts.append('<script type="application/ld+json">%s</script>' % json.dumps({
+            '@context': 'https://schema.org', '@type': 'Product', 'name': title,
+            'offers': {'@type': 'Offer', 'price': str(rng.randint(990, 99990)), 'priceCurrency': 'HUF'}
+        }, ensure_ascii=False))
+    parts.append('<script type="application/ld+json">%s</script>' % json.dumps({
+        '@context': 'https://schema.org', '@type': 'Organization', 'name': 'Példa Kft.',
+        'address': {'@type': 'PostalAddress', 'streetAddress': 'Fő utca 1.', 'addressLocality': 'Budapest'}
+    }, ensure_ascii=False))
+    parts.append('</head>')
+    return '\n'.join(parts)
+
+
+def _navigation(rng, items):
+    links = ''.join(
+        '<li class="menu-item"><a href="/kategoria/%d">%s%s</a>' % (i, SVG_ICON if i % 5 == 0 else '', rng.choice(WORDS))
+        for i in range(items)
+    )
+    return ('<header class="site-header"><a class="skip-link" href="#main-content">Ugrás a tartalomra</a>'
+            '<nav class="main-nav"><ul>%s</ul></nav></header>\n' % links)
+
+
+def _breadcrumb(rng):
+    return ('<nav aria-label="breadcrumb"><ol class="breadcrumb"><li><a href="/">Főoldal</a></li>'
+            '<li><a href="/kategoria/%d">%s</a></li></ol></nav>\n' % (rng.randint(1, 50), rng.choice(WORDS)))
+
+
+def _footer(rng):
+    return ('<footer><div class="contact">Példa Kft. – 1052 Budapest, Fő utca 1. Tel.: +36 1 234 5678</div>'
+            '<a href="https://facebook.com/pelda">Facebook</a> <a href="https://www.instagram.com/pelda">Instagram</a>'
+            '<form class="newsletter"><label for="email">E-mail</label><input id="email" name="email" type="email">'
+            '<input id="consent" type="checkbox"><button>Feliratkozás</button></form>'
+            '<p class="copy">&copy; 2024 Példa Kft. &ndash; Minden jog fenntartva&nbsp;</footer>\n'
+            '<script>window.dataLayer=window.dataLayer||[];function gtag(){dataLayer.push(arguments);}</script>\n')
+
+
+def _image(rng, index):
+    attrs = ['src="/img/%s-%d.jpg"' % (rng.choice(('large', 'thumb', 'photo')), index)]
+    if rng.random() < 0.8:
+        attrs.append('alt="%s"' % (rng.choice(WORDS) if rng.random() < 0.8 else ''))
+    if rng.random() < 0.5:
+        attrs.append('width="640" height="480"')
+    if rng.random() < 0.4:
+        attrs.append('loading="lazy"')
+    if rng.random() < 0.3:
+        attrs.append('srcset="/img/%d@2x.jpg 2x"' % index)
+    return '<img %s>' % ' '.join(attrs)
+
+
+def _article(rng, index, scale):
+    body = ['<main id="main-content"><article>', '<h1>%s</h1>' % _sentence(rng, 8).rstrip('.!?')]
+    for section in range(3 * scale):
+        body.append('<h2>%s</h2>' % _sentence(rng, 5).rstrip('.!?'))
+        for _ in range(rng.randint(2, 5)):
+            body.append(_paragraph(rng, closed=rng.random() < 0.85))
+        if rng.random() < 0.4:
+            body.append('<h3>%s</h3><ul>%s</ul>' % (
+                rng.choice(WORDS), ''.join('<li>%s' % _sentence(rng, 6) for _ in range(4))))
+        body.append(_image(rng, section))
+    body.append('</article></main>')
+    return '\n'.join(body)
+
+
+def _product(rng, index, scale):
+    body = ['<main id="main-content">', _breadcrumb(rng),
+            '<div class="product" itemscope itemtype="https://schema.org/Product">',
+            '<h1 itemprop="name">%s</h1>' % _sentence(rng, 5).rstrip('.!?'),
+            '<span class="price">%d Ft</span> <button class="add-to-cart">Kosárba</button>' % rng.randint(990, 99990)]
+    for i in range(6):
+        body.append(_image(rng, i))
+    body.append('<h2>Leírás</h2>')
+    body.extend(_paragraph(rng) for _ in range(3 * scale))
+    body.append('<h2>Vélemények</h2>')
+    for _ in range(5 * scale):
+        body.append('<div class="review"><h4>%s</h4>%s</div>' % (rng.choice(WORDS), _paragraph(rng, closed=False)))
+    body.append('<table class="specs">%s</table></div></main>' % ''.join(
+        '<tr><td>%s<td>%s' % (rng.choice(WORDS), rng.randint(1, 100)) for _ in range(10)))
+    return '\n'.join(body)
+
+
+def _listing(rng, index, scale):
+    cards = []
+    for i in range(24 * scale):
+        cards.append('<div class="card"><a href="/termek/%d">%s<h3>%s</h3></a><span class="price">%d Ft</span></div>' % (
+            i, _image(rng, i), _sentence(rng, 4).rstrip('.!?'), rng.randint(990, 99990)))
+    return '<main id="main-content">%s<h1>%s</h1><div class="grid">%s</div></main>' % (
+        _breadcrumb(rng), rng.choice(WORDS).capitalize(), '\n'.join(cards))
+
+
+def _news(rng, index, scale):
+    blocks = ['<main id="main-content"><h1>Friss hírek</h1>']
+    for i in range(30 * scale):
+        blocks.append('<section class="teaser"><h2><a href="https://pelda.hu/hir/%d">%s</a></h2>%s%s</section>' % (
+            i, _sentence(rng, 7).rstrip('.!?'), _image(rng, i), _paragraph(rng, closed=rng.random() < 0.7)))
+        if i % 10 == 9:
+            blocks.append('<div class="ad"><!-- hirdetés --><script>googletag.cmd.push(function(){});</script></div>')
+    blocks.append('</main>')
+    return '\n'.join(blocks)
+
+
+def _landing(rng, index, scale):
+    inline_js = '<script>%s</script>' % ('var config=%s;' % json.dumps({'k%d' % i: rng.choice(WORDS) for i in range(200)}))
+    sections = [inline_js, '<main id="main-content"><section class="hero"><h1>%s</h1>%s</section>' % (
+        _sentence(rng, 6).rstrip('.!?'), _paragraph(rng))]
+    for i in range(4 * scale):
+        sections.append('<section><h2>%s</h2><div class="features">%s</div></section>' % (
+            rng.choice(WORDS), ''.join('<div class="feature">%s<h3>%s</h3>%s</div>' % (
+                SVG_ICON, rng.choice(WORDS), _paragraph(rng)) for _ in range(3))))
+    sections.append('<template id="modal"><div class="modal"><p>%s</p></div></template></main>' % _sentence(rng))
+    return '\n'.join(sections)
+
+
+PAGE_KINDS = (('cikk', _article), ('termek', _product), ('kategoria', _listing), ('hirek', _news), ('landing', _landing))
+
+
+def generate_corpus(pages, scale, seed=2024):
+    """(url, html) párok determinisztikus, valós oldalakhoz hasonló korpusza"""
+    rng = random.Random(seed)
+    corpus = []
+    for index in range(pages):
+        kind, builder = PAGE_KINDS[index % len(PAGE_KINDS)]
+        html = '\n'.join([
+            _head(rng, kind, index),
+            '<body class="%s">' % kind,
+            _navigation(rng, 40),
+            builder(rng, index, scale),
+            _footer(rng),
+            '</body></html>'
+        ])
+        corpus.append(('https://pelda.hu/%s/%d' % (kind, index), html))
+    return corpus
+
+
+def load_corpus(directory):
+    """Saját korpusz: a könyvtár .html / .htm fájljai"""
+    corpus = []
+    for name in sorted(os.listdir(directory)):
+        if name.lower().endswith(('.html', '.htm')):
+            with open(os.path.join(directory, name), 'rb') as f:
+                corpus.append(('https://pelda.hu/' + name, f.read().decode('utf-8', 'replace')))
+    return corpus
+
+
+def _fetched_page(url, html):
+    content = html.encode('utf-8')
+    return FetchedPage(url, 200, {'Content-Type': 'text/html; charset=utf-8'}, content, timedelta(0))
+
+
+def run_backend(backend, corpus, repeat):
+    """Egy backend futtatása a korpuszon: fázisidők (legjobb ismétlés) és eredmények"""
+    best = None
+    results = []
+    for _ in range(repeat):
+        totals = {'parse': 0.0, 'index': 0.0, 'analyze': 0.0}
+        results = []
+        for url, html in corpus:
+            page = _fetched_page(url, html)
+            analyzer = AdvancedSEOAnalyzer(url, parser=backend)
+            analyzer.load_page(page)
+            spans = analyzer.timeline.spans
+            totals['parse'] += spans['page_parse']['duration']
+            totals['index'] += spans['page_index']['duration']
+            started = time.perf_counter()
+            result = {name: getattr(analyzer, name)() for name in DOCUMENT_ANALYZERS}
+            totals['analyze'] += time.perf_counter() - started
+            results.append(json.dumps(result, sort_keys=True, default=str))
+        totals['total'] = sum(totals.values())
+        if best is None or totals['total'] < best['total']:
+            best = totals
+    return best, results
+
+
+def peak_memory(backend, corpus):
+    """A betöltés (dekódolás, parse, index) memóriacsúcsa MB-ban, a letöltött bájtok nélkül
+
+    A tracemalloc csak a Python allokációkat látja: az lxml-native C-ben tárolt fája
+    nem számít bele, így annál a szám alsó becslés.
+    """
+    peak = 0
+    for url, html in corpus:
+        page = _fetched_page(url, html)
+        analyzer = AdvancedSEOAnalyzer(url, parser=backend)
+        tracemalloc.start()
+        analyzer.load_page(page)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    return peak / 1024 / 1024
+
+
+def differing_modules(reference, result):
+    reference, result = json.loads(reference), json.loads(result)
+    return [name for name in DOCUMENT_ANALYZERS if reference[name] != result[name]]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pages', type=int, default=25, help='generált oldalak száma')
+    parser.add_argument('--scale', type=int, default=20, help='oldalméret szorzó (40: átlag ~350 KB, 200: átlag ~2 MB)')
+    parser.add_argument('--repeat', type=int, default=2, help='ismétlések száma (a legjobb számít)')
+    parser.add_argument('--corpus', help='könyvtár saját .html fájlokkal a generált korpusz helyett')
+    parser.add_argument('--memory', action='store_true', help='memóriacsúcs mérése külön menetben')
+    parser.add_argument('--backends', default=','.join(available_parser_backends()), help='vesszővel elválasztott lista')
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus) if args.corpus else generate_corpus(args.pages, args.scale)
+    size = sum(len(html.encode('utf-8')) for _, html in corpus)
+    print(f"Korpusz: {len(corpus)} oldal, {size / 1024 / 1024:.1f} MB (átlag {size / max(len(corpus), 1) / 1024:.0f} KB)")
+
+    backends = [name.strip() for name in args.backends.split(',') if name.strip()]
+    if REFERENCE_BACKEND not in backends:
+        backends.insert(0, REFERENCE_BACKEND)
+
+    measurements = {}
+    memory = {}
+    for backend in backends:
+        measurements[backend] = run_backend(backend, corpus, args.repeat)
+        if args.memory:
+            memory[backend] = peak_memory(backend, corpus)
+
+    reference_total = measurements[REFERENCE_BACKEND][0]['total']
+    reference_results = measurements[REFERENCE_BACKEND][1]
+    memory_header = f"{'mem. csúcs':>12}" if args.memory else ''
+    print(f"\n{'backend':<14}{'parse':>9}{'index':>9}{'elemzés':>9}{'összesen':>10}{'gyorsulás':>11}{memory_header}"
+          f"  eltérő oldalak")
+    identical = []
+    for backend, (totals, results) in measurements.items():
+        differences = {}
+        for (url, _), reference, result in zip(corpus, reference_results, results):
+            if reference != result:
+                differences[url] = differing_modules(reference, result)
+        if not differences:
+            identical.append((totals['total'], backend))
+        print(f"{backend:<14}{totals['parse']:>8.2f}s{totals['index']:>8.2f}s{totals['analyze']:>8.2f}s"
+              f"{totals['total']:>9.2f}s{reference_total / totals['total']:>10.2f}x"
+              f"{f'{memory[backend]:>9.1f} MB' if args.memory else ''}  {len(differences)}/{len(corpus)}")
+        for url, modules in list(differences.items())[:5]:
+            print(f"    {url}: {', '.join(modules)}")
+
+    fastest = min(identical)[1]
+    print(f"\nLeggyorsabb azonos eredményt adó backend: {fastest} (SEO_PARSER_BACKEND={fastest})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+import codecs
+import re
+
+# Statisztikai felismerés csak az oldal elején fut
+DETECTION_PREFIX_BYTES = 64 * 1024
+META_SNIFF_BYTES = 4096
+
+BOMS = (
+    (codecs.BOM_UTF8, 'utf-8'),
+    (codecs.BOM_UTF32_LE, 'utf-32-le'),
+    (codecs.BOM_UTF32_BE, 'utf-32-be'),
+    (codecs.BOM_UTF16_LE, 'utf-16-le'),
+    (codecs.BOM_UTF16_BE, 'utf-16-be'),
+)
+
+# A böngészők ezeket a címkéket windows-1252-ként értelmezik
+WINDOWS_1252_ALIASES = {'ascii', 'us-ascii', 'iso-8859-1', 'iso8859-1', 'latin1', 'latin-1', 'l1'}
+
+_HEADER_CHARSET_RE = re.compile(r'charset\s*=\s*["\']?\s*([^"\';\s]+)', re.I)
+_META_CHARSET_RE = re.compile(rb'<meta[^>]+?charset\s*=\s*["\']?\s*([a-zA-Z0-9_:.\-]+)', re.I)
+_XML_ENCODING_RE = re.compile(rb'^\s*<\?xml[^>]+encoding\s*=\s*["\']([a-zA-Z0-9_.\-]+)', re.I)
+
+
+def normalize_encoding(name):
+    """Kódolás nevének ellenőrzése és egységesítése (None, ha ismeretlen)"""
+    if not name:
+        return None
+    name = name.strip().strip('"\'').lower()
+    if name in WINDOWS_1252_ALIASES:
+        name = 'windows-1252'
+    try:
+        return codecs.lookup(name).name
+    except LookupError:
+        return None
+
+
+def encoding_from_content_type(content_type):
+    """charset paraméter a Content-Type fejlécből"""
+    match = _HEADER_CHARSET_RE.search(content_type or '')
+    return normalize_encoding(match.group(1)) if match else None
+
+
+def encoding_from_bom(content):
+    for bom, encoding in BOMS:
+        if content.startswith(bom):
+            return encoding, len(bom)
+    return None, 0
+
+
+def encoding_from_meta(content):
+    """<meta charset> / http-equiv / XML deklaráció keresése az oldal elején"""
+    head = content[:META_SNIFF_BYTES]
+    match = _META_CHARSET_RE.search(head) or _XML_ENCODING_RE.search(head)
+    if not match:
+        return None
+    encoding = normalize_encoding(match.group(1).decode('ascii', 'ignore'))
+    # ASCII-kompatibilis bájtokban deklarált UTF-16/32 valójában UTF-8
+    if encoding and encoding.startswith(('utf-16', 'utf-32', 'utf_16', 'utf_32')):
+        return 'utf-8'
+    return encoding
+
+
+def detect_encoding(content):
+    """Statisztikai felismerés korlátozott előtagon (charset_normalizer / chardet)"""
+    prefix = content[:DETECTION_PREFIX_BYTES]
+    try:
+        from charset_normalizer import from_bytes
+        best = from_bytes(prefix).best()
+        return normalize_encoding(best.encoding) if best is not None else None
+    except ImportError:
+        pass
+    try:
+        import chardet
+        return normalize_encoding(chardet.detect(prefix).get('encoding'))
+    except ImportError:
+        return None
+
+
+def decode_html(content, content_type=None):
+    """HTML bájtok dekódolása egyetlen lépésben: (szöveg, kódolás, forrás)
+
+    Sorrend: BOM, Content-Type charset, <meta charset> az első néhány KB-ban,
+    érvényes UTF-8, végül statisztikai felismerés az oldal elején.
+    """
+    encoding, bom_length = encoding_from_bom(content)
+    if encoding:
+        return content[bom_length:].decode(encoding, 'replace'), encoding, 'bom'
+
+    for source, encoding in (('header', encoding_from_content_type(content_type)),
+                             ('meta', encoding_from_meta(content))):
+        if encoding:
+            return content.decode(encoding, 'replace'), encoding, source
+
+    try:
+        return content.decode('utf-8'), 'utf-8', 'utf-8'
+    except UnicodeDecodeError:
+        pass
+
+    encoding = detect_encoding(content)
+    if encoding:
+        return content.decode(encoding, 'replace'), encoding, 'detected'
+    encoding = normalize_encoding('windows-1252')
+    return content.decode(encoding, 'replace'), encoding, 'fallback'
@@ -0,0 +1,144 @@
+import socket
+import threading
+import time
+from contextlib import contextmanager
+
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import NewConnectionError
+from urllib3.util.connection import allowed_gai_family
+
+try:
+    from urllib3.exceptions import NameResolutionError
+except ImportError:
+    # urllib3 1.x: a névfeloldási hiba NewConnectionError-ként jelenik meg (mint az eredeti _new_conn-ban)
+    NameResolutionError = None
+
+TIMING_KEYS = ('dns', 'connect', 'tls', 'ttfb', 'wait', 'download', 'total')
+
+_local = threading.local()
+
+
+class _TimedConnectionMixin:
+    """Kapcsolatfelépítés fázisainak mérése (DNS, TCP connect, TLS kézfogás)"""
+
+    is_tls = False
+
+    def _new_conn(self):
+        host = self._dns_host
+        started = time.perf_counter()
+        try:
+            addresses = socket.getaddrinfo(host, self.port, allowed_gai_family(), socket.SOCK_STREAM)
+        except socket.gaierror as e:
+            if NameResolutionError is None:
+                raise NewConnectionError(self, f"Failed to establish a new connection: {e}") from e
+            raise NameResolutionError(self.host, self, e) from e
+        resolved = time.perf_counter()
+        self._phase_dns = resolved - started
+
+        # A feloldott címekhez az eredeti urllib3 logikával csatlakozunk (hibakezelés, socket opciók)
+        error = None
+        try:
+            for address in dict.fromkeys(info[4][0] for info in addresses):
+                self._dns_host = address
+                try:
+                    sock = super()._new_conn()
+                except NewConnectionError as e:
+                    error = e
+                    continue
+                self._phase_connect = time.perf_counter() - resolved
+                return sock
+        finally:
+            self._dns_host = host
+        raise error or NewConnectionError(self, f"Failed to establish a new connection: no address for {host}")
+
+    def connect(self):
+        self._phase_dns = 0.0
+        self._phase_connect = 0.0
+        started = time.perf_counter()
+        super().connect()
+        total = time.perf_counter() - started
+        # A proxy tunnel ideje TLS-nél a kézfogáshoz, egyébként a csatlakozáshoz számít
+        setup = total - self._phase_dns
+        timing = {
+            'dns': self._phase_dns,
+            'connect': self._phase_connect if self.is_tls else setup,
+            'tls': max(0.0, setup - self._phase_connect) if self.is_tls else 0.0
+        }
+        # Újrahasznosításkor is a kapcsolat saját felépítési ideje jelenik meg
+        self.setup_timing = timing
+        collector = getattr(_local, 'collector', None)
+        if collector is not None:
+            collector.append(timing)
+
+
+class TimedHTTPConnection(_TimedConnectionMixin, HTTPConnection):
+    pass
+
+
+class TimedHTTPSConnection(_TimedConnectionMixin, HTTPSConnection):
+    is_tls = True
+
+
+class TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+
+class TimedHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter, amelynek poolja mérő kapcsolatokat hoz létre"""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': TimedHTTPConnectionPool,
+            'https': TimedHTTPSConnectionPool
+        }
+
+
+@contextmanager
+def collect_connection_timings():
+    """Az adott szálon a blokk alatt felépített kapcsolatok időzítései (átirányításokkal együtt)"""
+    previous = getattr(_local, 'collector', None)
+    connections = _local.collector = []
+    try:
+        yield connections
+    finally:
+        _local.collector = previous
+
+
+def connection_setup(response):
+    """A választ kiszolgáló kapcsolat felépítési ideje (requests válasz, olvasás előtt)"""
+    return getattr(getattr(response.raw, 'connection', None), 'setup_timing', None)
+
+
+def build_timings(connections, ttfb, download, redirects=0, setup=None):
+    """Időzítési blokk: DNS, connect, TLS, TTFB, szerver várakozás, letöltés
+
+    A DNS / connect / TLS a választ kiszolgáló kapcsolat felépítési ideje akkor is,
+    ha a kapcsolat egy korábbi kérésből maradt meg (connection_reused). A 'wait' a TTFB-ből
+    az ebben a kérésben történt kapcsolatfelépítések levonása után maradó idő,
+    vagyis nagyjából a szerver feldolgozási ideje.
+    """
+    timings = dict.fromkeys(TIMING_KEYS)
+    if setup is None and connections:
+        setup = connections[-1]
+    if setup is not None:
+        # Ha a backend egy fázist nem mér külön, az értéke None
+        for phase in ('dns', 'connect', 'tls'):
+            timings[phase] = setup.get(phase)
+    timings['ttfb'] = ttfb
+    timings['download'] = download
+    if ttfb is not None:
+        spent = sum(connection.get(phase) or 0.0 for connection in connections or () for phase in ('dns', 'connect', 'tls'))
+        timings['wait'] = max(0.0, ttfb - spent)
+        timings['total'] = ttfb + (download or 0.0)
+    timings = {key: round(value, 4) if value is not None else None for key, value in timings.items()}
+    timings['connection_reused'] = None if setup is None else not any(setup is connection for connection in connections or ())
+    timings['new_connections'] = len(connections) if connections is not None else None
+    timings['redirects'] = redirects
+    return timings
@@ -0,0 +1,278 @@
+import os
+import threading
+import time
+import urllib.parse
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+from urllib.robotparser import RobotFileParser
+
+THROTTLE_STATUS_CODES = (429, 503)
+
+DEFAULT_INITIAL_LIMIT = int(os.environ.get('SEO_HOST_INITIAL_CONCURRENCY', '4'))
+DEFAULT_MAX_LIMIT = int(os.environ.get('SEO_HOST_MAX_CONCURRENCY', '32'))
+DEFAULT_RESPECT_CRAWL_DELAY = os.environ.get('SEO_RESPECT_CRAWL_DELAY', '1') != '0'
+
+
+class HostSlotTimeout(TimeoutError):
+    """A host foglalásra (limit, crawl-delay, robots.txt betöltés) várakozás túllépte a kérés időkorlátját"""
+
+
+def parse_retry_after(value):
+    """Retry-After fejléc másodpercben (szám vagy HTTP dátum formátum)"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class HostState:
+    """Egy host ütemezési állapota"""
+
+    def __init__(self, limit):
+        self.limit = float(limit)
+        self.in_flight = 0
+        self.next_start = 0.0
+        self.crawl_delay = 0.0
+        self.min_latency = None
+        self.latency_ewma = None
+        self.last_decrease = 0.0
+        self.ceiling = None
+        self.ceiling_until = 0.0
+        self.requests = 0
+        self.throttled = 0
+        self.errors = 0
+        self.robots = None
+        self.robots_state = 'pending'  # pending / loading / ready
+
+    def to_dict(self):
+        return {
+            'limit': round(self.limit, 2),
+            'in_flight': self.in_flight,
+            'crawl_delay': self.crawl_delay,
+            'latency_ewma': round(self.latency_ewma, 3) if self.latency_ewma is not None else None,
+            'requests': self.requests,
+            'throttled': self.throttled,
+            'errors': self.errors
+        }
+
+
+class HostScheduler:
+    """Host-onkénti párhuzamossági korlát robots.txt crawl-delay-jel és AIMD adaptív limittel"""
+
+    def __init__(self, robots_fetcher=None, user_agent='*', initial_limit=DEFAULT_INITIAL_LIMIT,
+                 min_limit=1, max_limit=DEFAULT_MAX_LIMIT, decrease_factor=0.5, latency_factor=3.0,
+                 latency_floor=0.5, respect_crawl_delay=DEFAULT_RESPECT_CRAWL_DELAY,
+                 max_crawl_delay=10.0, max_retry_after=60.0, ceiling_ttl=30.0):
+        self.robots_fetcher = robots_fetcher
+        self.user_agent = user_agent
+        self.initial_limit = initial_limit
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.decrease_factor = decrease_factor
+        self.latency_factor = latency_factor
+        self.latency_floor = latency_floor
+        self.respect_crawl_delay = respect_crawl_delay
+        self.max_crawl_delay = max_crawl_delay
+        self.max_retry_after = max_retry_after
+        self.ceiling_ttl = ceiling_ttl
+        self._cond = threading.Condition()
+        self._hosts = {}
+
+    @staticmethod
+    def host_key(url):
+        parsed = urllib.parse.urlparse(url)
+        return f"{parsed.scheme}://{parsed.netloc.lower()}"
+
+    def _state(self, host):
+        # A hívó tartja a zárat
+        state = self._hosts.get(host)
+        if state is None:
+            state = self._hosts[host] = HostState(self.initial_limit)
+        return state
+
+    @staticmethod
+    def _expires(timeout):
+        return time.monotonic() + timeout if timeout is not None else None
+
+    def _wait(self, wait, expires, url):
+        # A hívó tartja a zárat; lejárt határidőnél HostSlotTimeout
+        if expires is not None:
+            remaining = expires - time.monotonic()
+            if remaining <= 0:
+                raise HostSlotTimeout(f'Host ütemező időtúllépés: {self.host_key(url)}')
+            wait = remaining if wait is None else min(wait, remaining)
+        self._cond.wait(wait)
+
+    def prepare(self, url, timeout=None):
+        """A host robots.txt-jének egyszeri betöltése (crawl-delay, szabályok)
+
+        timeout: legfeljebb ennyi másodperc várakozás egy másik szálon folyó betöltésre.
+        """
+        host = self.host_key(url)
+        expires = self._expires(timeout)
+        with self._cond:
+            state = self._state(host)
+            while state.robots_state == 'loading':
+                self._wait(None, expires, url)
+            if state.robots_state == 'ready' or self.robots_fetcher is None:
+                state.robots_state = 'ready'
+                return state
+            state.robots_state = 'loading'
+
+        try:
+            status_code, text = self.robots_fetcher(f"{host}/robots.txt")
+        except Exception:
+            status_code, text = None, None
+        return self.load_robots(url, status_code, text)
+
+    def load_robots(self, url, status_code, text):
+        """Máshol (pl. az aszinkron motor session-jével) letöltött robots.txt betöltése
+
+        status_code None: a letöltés nem sikerült, a host szabályok nélkül engedélyezett.
+        """
+        host = self.host_key(url)
+        robots = None
+        if status_code is not None:
+            robots = RobotFileParser(f"{host}/robots.txt")
+            if status_code in (401, 403):
+                robots.disallow_all = True
+            elif status_code >= 400:
+                robots.allow_all = True
+            else:
+                robots.parse((text or '').splitlines())
+
+        with self._cond:
+            state = self._state(host)
+            state.robots = robots
+            if robots is not None and self.respect_crawl_delay:
+                delay = robots.crawl_delay(self.user_agent) or 0
+                state.crawl_delay = min(float(delay), self.max_crawl_delay)
+            state.robots_state = 'ready'
+            self._cond.notify_all()
+        return state
+
+    def is_prepared(self, url):
+        """Be van-e már töltve a host robots.txt-je"""
+        with self._cond:
+            state = self._hosts.get(self.host_key(url))
+            return state is not None and state.robots_state == 'ready'
+
+    def can_fetch(self, url):
+        """robots.txt szerint lekérhető-e az URL"""
+        state = self.prepare(url)
+        if state.robots is None:
+            return True
+        return state.robots.can_fetch(self.user_agent, url)
+
+    def try_acquire(self, url, priority=False):
+        """Nem blokkoló foglalás: 0, ha sikerült, különben a javasolt várakozási idő (priority: mindig sikerül)"""
+        host = self.host_key(url)
+        with self._cond:
+            return self._try_acquire(self._state(host), priority)
+
+    def _try_acquire(self, state, priority=False):
+        if priority:
+            # Soron kívüli kérés: a limit és a crawl-delay nem tartja vissza, de beleszámít a host terhelésébe
+            state.in_flight += 1
+            state.requests += 1
+            return 0
+        now = time.monotonic()
+        if state.in_flight >= max(self.min_limit, int(state.limit)):
+            return 0.05
+        if now < state.next_start:
+            return state.next_start - now
+        state.in_flight += 1
+        state.requests += 1
+        state.next_start = now + state.crawl_delay
+        return 0
+
+    def acquire(self, url, timeout=None, priority=False):
+        """Blokkoló foglalás, amíg a host limitje és a crawl-delay engedi
+
+        timeout: a teljes várakozás felső korlátja másodpercben, túllépésekor
+        HostSlotTimeout. priority: várakozás nélküli foglalás (pl. a felhasználó
+        által kért oldal), amely beleszámít a host terhelésébe és az AIMD limitbe.
+        """
+        host = self.host_key(url)
+        if priority:
+            with self._cond:
+                self._try_acquire(self._state(host), priority)
+            return
+        expires = self._expires(timeout)
+        self.prepare(url, timeout)
+        with self._cond:
+            state = self._state(host)
+            while True:
+                wait = self._try_acquire(state)
+                if not wait:
+                    return
+                self._wait(wait, expires, url)
+
+    def release(self, url, latency=None, status_code=None, error=False, retry_after=None):
+        """Foglalás felszabadítása és a limit igazítása a megfigyelt válasz alapján"""
+        host = self.host_key(url)
+        with self._cond:
+            state = self._state(host)
+            state.in_flight = max(0, state.in_flight - 1)
+            if latency is None and status_code is None and not error:
+                # Nincs megfigyelés (pl. megszakított hedged kérés): a limit változatlan
+                self._cond.notify_all()
+                return
+            now = time.monotonic()
+            throttled = status_code in THROTTLE_STATUS_CODES
+            congested = error or throttled
+
+            if latency is not None and not congested:
+                state.min_latency = latency if state.min_latency is None else min(state.min_latency, latency)
+                state.latency_ewma = latency if state.latency_ewma is None else 0.8 * state.latency_ewma + 0.2 * latency
+                threshold = max(self.latency_floor, state.min_latency * self.latency_factor)
+                congested = latency > threshold
+
+            if error:
+                state.errors += 1
+            if throttled:
+                state.throttled += 1
+                if retry_after is not None:
+                    state.next_start = max(state.next_start, now + min(retry_after, self.max_retry_after))
+
+            if congested:
+                # Multiplikatív csökkentés, legfeljebb körülbelül egy válaszidőnként egyszer
+                window = state.latency_ewma or self.latency_floor
+                if now - state.last_decrease >= window:
+                    if throttled:
+                        # A túlterhelési pont megjegyzése: egy ideig alatta maradunk
+                        state.ceiling = max(self.min_limit + 1, int(state.limit))
+                        state.ceiling_until = now + self.ceiling_ttl
+                    state.limit = max(self.min_limit, state.limit * self.decrease_factor)
+                    state.last_decrease = now
+            else:
+                # Additív növelés: kb. +1 teljes limitnyi sikeres válasz után
+                upper = self.max_limit
+                if state.ceiling is not None and now < state.ceiling_until:
+                    upper = min(upper, state.ceiling - 0.01)
+                state.limit = max(state.limit, min(upper, state.limit + 1.0 / state.limit))
+            self._cond.notify_all()
+
+    @contextmanager
+    def slot(self, url, timeout=None, priority=False):
+        """Foglalás kontextuskezelőként; a hívó az observe()-val jelzi az eredményt"""
+        self.acquire(url, timeout, priority)
+        outcome = {'error': True}
+
+        def observe(latency=None, status_code=None, retry_after=None):
+            outcome.update(error=False, latency=latency, status_code=status_code, retry_after=retry_after)
+
+        try:
+            yield observe
+        finally:
+            self.release(url, **outcome)
+
+    def snapshot(self):
+        """Host-onkénti állapot (diagnosztikához)"""
+        with self._cond:
+            return {host: state.to_dict() for host, state in self._hosts.items()}
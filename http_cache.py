@@ -0,0 +1,186 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from email.utils import parsedate_to_datetime
+
+from requests.structures import CaseInsensitiveDict
+
+DEFAULT_CACHE_MAX_BYTES = int(os.environ.get('SEO_HTTP_CACHE_MAX_BYTES', str(1024 * 1024 * 1024)))
+
+_MAX_AGE_RE = re.compile(r'(?:^|,)\s*(?:s-)?max-age\s*=\s*"?(\d+)', re.I)
+
+
+class CacheEntry:
+    """Egy tárolt válasz metaadatai; a törzs a lemezen marad, amíg nem kell"""
+
+    def __init__(self, cache, key, meta):
+        self.cache = cache
+        self.key = key
+        self.meta = meta
+
+    @property
+    def headers(self):
+        return self.meta['headers']
+
+    def is_fresh(self):
+        """Friss-e még a tárolt válasz a Cache-Control / Expires alapján"""
+        cache_control = self._header('Cache-Control')
+        if 'no-cache' in cache_control.lower() or 'no-store' in cache_control.lower():
+            return False
+        age = time.time() - self.meta['stored_at']
+        match = _MAX_AGE_RE.search(cache_control)
+        if match:
+            return age < int(match.group(1))
+        expires = self._header('Expires')
+        if expires:
+            try:
+                return parsedate_to_datetime(expires).timestamp() > time.time()
+            except (TypeError, ValueError):
+                return False
+        return False
+
+    def validators(self):
+        """Feltételes kérés fejlécei (If-None-Match / If-Modified-Since)"""
+        headers = {}
+        etag = self._header('ETag')
+        last_modified = self._header('Last-Modified')
+        if etag:
+            headers['If-None-Match'] = etag
+        if last_modified:
+            headers['If-Modified-Since'] = last_modified
+        return headers
+
+    def read_body(self):
+        """Tárolt törzs beolvasása (None, ha időközben kiürült)"""
+        try:
+            with open(self.cache._body_path(self.key), 'rb') as body_file:
+                return body_file.read()
+        except OSError:
+            return None
+
+    def _header(self, name):
+        name = name.lower()
+        for key, value in self.headers.items():
+            if key.lower() == name:
+                return value
+        return ''
+
+
+class DiskHTTPCache:
+    """Perzisztens HTTP cache helyi lemezen, teljes méret szerinti LRU kiürítéssel"""
+
+    def __init__(self, directory, max_bytes=DEFAULT_CACHE_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # kulcs -> méret, a legrégebben használt elöl
+        self._total_bytes = 0
+        os.makedirs(directory, exist_ok=True)
+        self._load_index()
+
+    @staticmethod
+    def _key(url):
+        return hashlib.sha256(url.encode('utf-8')).hexdigest()
+
+    def _meta_path(self, key):
+        return os.path.join(self.directory, key[:2], key + '.json')
+
+    def _body_path(self, key):
+        return os.path.join(self.directory, key[:2], key + '.body')
+
+    def _load_index(self):
+        """Meglévő bejegyzések felolvasása; az LRU sorrend a metaadat fájlok mtime-ja"""
+        found = []
+        for shard in os.listdir(self.directory):
+            shard_dir = os.path.join(self.directory, shard)
+            if not os.path.isdir(shard_dir):
+                continue
+            for name in os.listdir(shard_dir):
+                if not name.endswith('.json'):
+                    continue
+                key = name[:-5]
+                try:
+                    accessed = os.path.getmtime(os.path.join(shard_dir, name))
+                    size = os.path.getsize(self._body_path(key))
+                except OSError:
+                    continue
+                found.append((accessed, key, size))
+        for _, key, size in sorted(found):
+            self._entries[key] = size
+            self._total_bytes += size
+
+    def get(self, url):
+        """Bejegyzés lekérése URL alapján (és LRU frissítés)"""
+        key = self._key(url)
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+        try:
+            with open(self._meta_path(key), 'r', encoding='utf-8') as meta_file:
+                meta = json.load(meta_file)
+            os.utime(self._meta_path(key))
+        except (OSError, ValueError):
+            return None
+        return CacheEntry(self, key, meta)
+
+    def put(self, url, page):
+        """Sikeres, teljes válasz eltárolása"""
+        cache_control = page.headers.get('Cache-Control', '').lower()
+        if page.status_code != 200 or page.truncated or 'no-store' in cache_control:
+            return
+        key = self._key(url)
+        meta = {
+            'url': url,
+            'final_url': page.url,
+            'status_code': page.status_code,
+            'reason': page.reason,
+            'headers': dict(page.headers),
+            'elapsed': page.elapsed.total_seconds(),
+            'stored_at': time.time()
+        }
+        os.makedirs(os.path.dirname(self._meta_path(key)), exist_ok=True)
+        self._write_atomic(self._body_path(key), page.content)
+        self._write_atomic(self._meta_path(key), json.dumps(meta).encode('utf-8'))
+        with self._lock:
+            self._total_bytes -= self._entries.pop(key, 0)
+            self._entries[key] = len(page.content)
+            self._total_bytes += len(page.content)
+            self._evict()
+
+    def refresh(self, entry, headers):
+        """304 válasz után a tárolt fejlécek frissítése"""
+        # Kis- és nagybetűtől független összevonás: az 'etag' a tárolt 'ETag'-et írja felül
+        merged = CaseInsensitiveDict(entry.meta['headers'])
+        merged.update(headers)
+        entry.meta['headers'] = dict(merged)
+        entry.meta['stored_at'] = time.time()
+        self._write_atomic(self._meta_path(entry.key), json.dumps(entry.meta).encode('utf-8'))
+
+    def _evict(self):
+        # A hívó tartja a zárat
+        while self._total_bytes > self.max_bytes and self._entries:
+            key, size = self._entries.popitem(last=False)
+            self._total_bytes -= size
+            for path in (self._meta_path(key), self._body_path(key)):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    @staticmethod
+    def _write_atomic(path, data):
+        # Folyamat- és szálazonosító: a cache könyvtáron több munkafolyamat is osztozhat
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, 'wb') as target:
+            target.write(data)
+        os.replace(temp_path, path)
+
+    def stats(self):
+        """Bejegyzések száma és teljes méret"""
+        with self._lock:
+            return {'entries': len(self._entries), 'total_bytes': self._total_bytes, 'max_bytes': self.max_bytes}
@@ -0,0 +1,467 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import timedelta
+import requests
+from requests.structures import CaseInsensitiveDict
+from fetch_timing import TimedHTTPAdapter, build_timings, collect_connection_timings, connection_setup
+from http_cache import DEFAULT_CACHE_MAX_BYTES, DiskHTTPCache
+from host_scheduler import HostScheduler, HostSlotTimeout, parse_retry_after
+from retry_policy import HedgeCancelled, RetryPolicy, attempt_record
+
+# Böngészőszerű alapértelmezett fejlécek minden kéréshez
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8',
+    'Accept-Language': 'hu-HU,hu;q=0.9,en;q=0.8,en-US;q=0.7',
+    'Accept-Encoding': 'gzip, deflate, br',
+    'DNT': '1',
+    'Connection': 'keep-alive',
+    'Upgrade-Insecure-Requests': '1',
+    'Sec-Fetch-Dest': 'document',
+    'Sec-Fetch-Mode': 'navigate',
+    'Sec-Fetch-Site': 'none',
+    'Cache-Control': 'max-age=0',
+}
+
+# Pool méretek (környezeti változóval felülírhatók)
+DEFAULT_POOL_CONNECTIONS = int(os.environ.get('SEO_HTTP_POOL_CONNECTIONS', '64'))
+DEFAULT_POOL_MAXSIZE = int(os.environ.get('SEO_HTTP_POOL_MAXSIZE', '16'))
+
+# Streamelt letöltés korlátai
+DEFAULT_MAX_BODY_BYTES = int(os.environ.get('SEO_MAX_BODY_BYTES', str(10 * 1024 * 1024)))
+DEFAULT_DOWNLOAD_DEADLINE = float(os.environ.get('SEO_DOWNLOAD_DEADLINE', '30'))
+DEFAULT_CHUNK_SIZE = 64 * 1024
+# A stop_at minta ennyi bájttal nyúlhat át az előző darabba
+STOP_MARKER_WINDOW = 64
+
+# Lemez cache (csak akkor aktív, ha a könyvtár meg van adva)
+DEFAULT_CACHE_DIR = os.environ.get('SEO_HTTP_CACHE_DIR') or None
+
+# Host ütemező (robots.txt, crawl-delay, AIMD) a megosztott kliensben: alapértelmezés szerint ki,
+# a tömeges elemzés és a bejárás saját ütemezőt használ
+DEFAULT_POLITENESS = os.environ.get('SEO_POLITENESS', '0') == '1'
+
+# Átmeneti hálózati hibák, amelyek után újrapróbálunk
+RETRYABLE_EXCEPTIONS = (
+    requests.exceptions.ConnectionError,
+    requests.exceptions.Timeout,
+    requests.exceptions.ChunkedEncodingError
+)
+
+
+class SchedulerTimeout(requests.exceptions.Timeout):
+    """A host ütemezőre várakozás túllépte a kérés időkorlátját (nem próbáljuk újra)"""
+
+
+class FetchedPage:
+    """Letöltött oldal adatai a letöltés módjától függetlenül"""
+
+    def __init__(self, url, status_code, headers, content, elapsed, reason='', encoding=None,
+                 ttfb=None, download_time=None, truncated=False, truncated_reason=None, cache_status=None,
+                 attempts=None, archived_at=None, timings=None):
+        self.url = url
+        self.status_code = status_code
+        self.reason = reason
+        self.headers = CaseInsensitiveDict(headers or {})
+        self.content = content
+        self.elapsed = elapsed
+        self.encoding = encoding
+        self.encoding_source = None
+        self.ttfb = ttfb
+        self.download_time = download_time
+        self.truncated = truncated
+        self.truncated_reason = truncated_reason
+        self.cache_status = cache_status
+        self.attempts = attempts or []
+        self.archived_at = archived_at
+        # Részletes időzítés hiányában (cache, archívum) csak a TTFB és a letöltés ismert
+        self.timings = timings if timings is not None else build_timings(None, ttfb, download_time)
+
+    @property
+    def ok(self):
+        return self.status_code < 400
+
+    def fetch_info(self):
+        """Letöltési összefoglaló az elemzési eredményhez"""
+        return {
+            'status_code': self.status_code,
+            'final_url': self.url,
+            'ttfb': round(self.ttfb, 3) if self.ttfb is not None else None,
+            'download_time': round(self.download_time, 3) if self.download_time is not None else None,
+            'body_bytes': len(self.content),
+            'truncated': self.truncated,
+            'truncated_reason': self.truncated_reason,
+            'cache_status': self.cache_status,
+            'encoding': self.encoding,
+            'encoding_source': self.encoding_source,
+            'attempts': self.attempts,
+            'archived_at': self.archived_at
+        }
+
+
+def read_body(chunks, started, max_bytes, deadline, stop_at=None, cancel=None):
+    """Törzs összegyűjtése darabokban; megáll a bájtkeret vagy a határidő elérésekor
+
+    stop_at (bytes regex, pl. </head>) megadásakor a minta végénél is megáll; a
+    darabhatáron átnyúló találathoz az előző darab vége is keresésre kerül.
+    cancel (threading.Event) beállításakor a következő darabnál megáll ('cancelled').
+    """
+    parts = []
+    received = 0
+    truncated_reason = None
+    tail = b''
+    for chunk in chunks:
+        parts.append(chunk)
+        received += len(chunk)
+        if stop_at is not None:
+            window = tail + chunk
+            match = stop_at.search(window)
+            if match is not None:
+                max_bytes = received - len(window) + match.end()
+                truncated_reason = 'stop_marker'
+                break
+            tail = window[-STOP_MARKER_WINDOW:]
+        if received > max_bytes:
+            truncated_reason = 'max_bytes'
+            break
+        if time.perf_counter() - started > deadline:
+            truncated_reason = 'deadline'
+            break
+        if cancel is not None and cancel.is_set():
+            truncated_reason = 'cancelled'
+            break
+    content = b''.join(parts)
+    if truncated_reason in ('max_bytes', 'stop_marker'):
+        content = content[:max_bytes]
+    return content, truncated_reason
+
+
+class PooledHTTPClient:
+    """Szálbiztos HTTP kliens host-onkénti, megosztott kapcsolat-poolokkal"""
+
+    def __init__(self, pool_connections=DEFAULT_POOL_CONNECTIONS, pool_maxsize=DEFAULT_POOL_MAXSIZE,
+                 headers=None, verify=False, cache_dir=DEFAULT_CACHE_DIR, cache_max_bytes=DEFAULT_CACHE_MAX_BYTES,
+                 politeness=DEFAULT_POLITENESS, retry_policy=None, hedge_workers=16):
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.headers = dict(headers or DEFAULT_HEADERS)
+        self.verify = verify
+        # Egyetlen adapter = egyetlen urllib3 PoolManager, ezen osztozik minden szál
+        self.adapter = TimedHTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            max_retries=0
+        )
+        # Tanúsítvány ellenőrzéses kérések (robots.txt, sitemap) külön poolon: a requests
+        # a már felépült, ellenőrzés nélküli kapcsolatot ellenőrzés nélkül használná újra
+        self.verified_adapter = TimedHTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            max_retries=0
+        )
+        self._local = threading.local()
+        self.cache = DiskHTTPCache(cache_dir, cache_max_bytes) if cache_dir else None
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.hedge_workers = hedge_workers
+        self._hedge_executor = None
+        self.scheduler = HostScheduler(
+            robots_fetcher=self.fetch_robots_txt,
+            user_agent=self.headers.get('User-Agent', '*')
+        ) if politeness else None
+
+    @property
+    def session(self):
+        """Szálankénti Session, a közös adapterre kötve"""
+        return self._session('session', self.adapter)
+
+    def _session(self, name, adapter):
+        session = getattr(self._local, name, None)
+        if session is None:
+            session = requests.Session()
+            session.headers.update(self.headers)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            setattr(self._local, name, session)
+        return session
+
+    def get(self, url, **kwargs):
+        """GET kérés a megosztott poolon keresztül
+        
+        A szálankénti Session cookie tára kérésenként ürül: egy letöltés
+        átirányításai között megmaradnak a cookie-k, de a független elemzések
+        (és oldalak) között nem öröklődnek (pl. consent vagy A/B cookie-k).
+        """
+        kwargs.setdefault('verify', self.verify)
+        if kwargs['verify']:
+            session = self._session('verified_session', self.verified_adapter)
+        else:
+            session = self.session
+        session.cookies.clear()
+        return session.get(url, **kwargs)
+
+    def fetch(self, url, timeout=20, max_bytes=None, deadline=None, chunk_size=DEFAULT_CHUNK_SIZE,
+              use_cache=True, retry_policy=None, stop_at=None, verify=None, priority=False):
+        """Streamelt letöltés bájtkerettel, falióra határidővel és újrapróbálással
+
+        stop_at: bytes regex, amelynek első találata után a letöltés megáll
+        (truncated_reason='stop_marker'; a csonkolt törzs nem kerül a cache-be).
+        verify: TLS tanúsítvány ellenőrzés (None: a kliens beállítása).
+        priority: a host ütemezőn várakozás nélkül megy át (a felhasználó által kért oldal);
+        egyébként a foglalásra várakozás legfeljebb timeout másodperc, utána SchedulerTimeout.
+        """
+        max_bytes = DEFAULT_MAX_BODY_BYTES if max_bytes is None else max_bytes
+        deadline = DEFAULT_DOWNLOAD_DEADLINE if deadline is None else deadline
+        cache = self.cache if use_cache else None
+        entry = cache.get(url) if cache else None
+        if entry is not None and entry.is_fresh():
+            page = self._page_from_cache(entry, 'hit', timedelta(seconds=entry.meta['elapsed']))
+            if page is not None:
+                return page
+
+        policy = retry_policy or self.retry_policy
+        fetch_args = (timeout, max_bytes, deadline, chunk_size, cache, entry, stop_at,
+                      self.verify if verify is None else verify)
+        attempts = []
+        origin = time.perf_counter()
+        backoff = 0.0
+        number = 1
+        while True:
+            try:
+                page = self._hedged_attempt(url, policy, number, attempts, origin, backoff, fetch_args, priority)
+            except SchedulerTimeout:
+                raise
+            except RETRYABLE_EXCEPTIONS:
+                if not policy.should_retry(number):
+                    raise
+                backoff = policy.backoff(number)
+            else:
+                if not policy.should_retry(number, page.status_code):
+                    break
+                backoff = policy.backoff(number, parse_retry_after(page.headers.get('Retry-After')))
+            time.sleep(backoff)
+            number += 1
+        page.attempts = attempts
+        return page
+
+    def _hedged_attempt(self, url, policy, number, attempts, origin, backoff, fetch_args, priority=False):
+        """Egy próbálkozás; ha a percentilisnél tovább tart, egy második kérés is indul és a gyorsabb nyer
+
+        A primer kérés a hívó szálon fut, a szálkészletre csak a hedged kérés kerül
+        (egy időzítő indítja). Ha a hedged végez előbb, a primer a törzs következő
+        darabjánál megáll; a válaszfejlécekre várakozás nem szakítható meg.
+        """
+        hedge_after = policy.hedge_delay()
+        if hedge_after is None:
+            return self._attempt(url, policy, number, False, attempts, origin, backoff, fetch_args,
+                                 priority=priority)
+
+        executor = self._get_hedge_executor()
+        settled = threading.Event()
+        hedge_won = threading.Event()
+        hedges = []
+
+        def launch():
+            if settled.is_set():
+                return
+            # A hedged kérés is a host ütemezőn megy át, így a host limitjét nem lépi túl
+            future = executor.submit(self._attempt, url, policy, number, True, attempts, origin, 0.0,
+                                     fetch_args, settled, priority)
+            future.add_done_callback(
+                lambda f: hedge_won.set() if not f.cancelled() and f.exception() is None else None
+            )
+            hedges.append(future)
+
+        timer = threading.Timer(hedge_after, launch)
+        timer.daemon = True
+        timer.start()
+        try:
+            try:
+                page = self._attempt(url, policy, number, False, attempts, origin, backoff, fetch_args,
+                                     priority=priority, cancel=hedge_won)
+            except Exception:
+                timer.cancel()
+                timer.join()
+                if not hedges:
+                    raise
+                # Primer hiba: a már elindult hedged kérés eredménye (vagy hibája) dönt
+                return hedges[0].result()
+            timer.cancel()
+            timer.join()
+            if hedge_won.is_set():
+                return hedges[0].result()
+            return page
+        finally:
+            # A már futó vesztes hedged kérés eredménye eldobódik, a még foglalásra váró el sem indul
+            settled.set()
+
+    def _attempt(self, url, policy, number, hedge, attempts, origin, backoff, fetch_args, settled=None,
+                 priority=False, cancel=None):
+        started = time.perf_counter()
+        record = attempt_record(number, hedge, origin, started, backoff)
+        attempts.append(record)
+        try:
+            with self.host_slot(url, fetch_args[0], priority) as observe:
+                if settled is not None and settled.is_set():
+                    # Üres megfigyelés: a host limit nem változik
+                    observe()
+                    raise HedgeCancelled()
+                page = self._fetch_once(url, *fetch_args, observe, cancel)
+            record['status_code'] = page.status_code
+            if page.status_code not in policy.retry_status_codes:
+                policy.latency.observe(time.perf_counter() - started)
+            return page
+        except HedgeCancelled:
+            record['error'] = 'Cancelled'
+            raise
+        except Exception as e:
+            record['error'] = type(e).__name__
+            raise
+        finally:
+            record['duration'] = round(time.perf_counter() - started, 3)
+
+    def _get_hedge_executor(self):
+        if self._hedge_executor is None:
+            with _shared_client_lock:
+                if self._hedge_executor is None:
+                    self._hedge_executor = ThreadPoolExecutor(
+                        max_workers=self.hedge_workers,
+                        thread_name_prefix='seo-hedge'
+                    )
+        return self._hedge_executor
+
+    def _fetch_once(self, url, timeout, max_bytes, deadline, chunk_size, cache, entry, stop_at, verify, observe,
+                    cancel=None):
+        started = time.perf_counter()
+        with collect_connection_timings() as connections:
+            response = self.get(
+                url,
+                timeout=timeout,
+                allow_redirects=True,
+                stream=True,
+                headers=entry.validators() if entry is not None else None,
+                verify=verify
+            )
+        # Fejlécek és TTFB rögzítése még a törzs megérkezése előtt
+        ttfb = time.perf_counter() - started
+        setup = connection_setup(response)
+        observe(ttfb, response.status_code, parse_retry_after(response.headers.get('Retry-After')))
+
+        if response.status_code == 304 and entry is not None:
+            # Nem változott: a tárolt törzs újrahasznosítása letöltés nélkül
+            response.close()
+            cache.refresh(entry, response.headers)
+            page = self._page_from_cache(entry, 'revalidated', response.elapsed, ttfb)
+            if page is not None:
+                page.timings = build_timings(connections, ttfb, 0.0, len(response.history), setup)
+                return page
+            with collect_connection_timings() as retry_connections:
+                response = self.get(url, timeout=timeout, allow_redirects=True, stream=True, verify=verify)
+            connections.extend(retry_connections)
+            ttfb = time.perf_counter() - started
+            setup = connection_setup(response)
+
+        try:
+            content, truncated_reason = read_body(
+                response.iter_content(chunk_size), started, max_bytes, deadline, stop_at, cancel
+            )
+        finally:
+            # Csonkolt letöltésnél a kapcsolat eldobásra kerül, egyébként visszakerül a poolba
+            response.close()
+        download_time = time.perf_counter() - started - ttfb
+        page = FetchedPage(
+            url=response.url,
+            status_code=response.status_code,
+            headers=response.headers,
+            content=content,
+            elapsed=response.elapsed,
+            reason=response.reason or '',
+            ttfb=ttfb,
+            download_time=download_time,
+            truncated=truncated_reason is not None,
+            truncated_reason=truncated_reason,
+            cache_status='miss' if cache is not None else None,
+            timings=build_timings(connections, ttfb, download_time, len(response.history), setup)
+        )
+        if cache is not None:
+            cache.put(url, page)
+        return page
+
+    @contextmanager
+    def host_slot(self, url, timeout=None, priority=False):
+        """Host ütemező foglalás (kikapcsolt ütemezőnél üres művelet), legfeljebb timeout másodperc várakozással"""
+        if self.scheduler is None:
+            yield lambda *args, **kwargs: None
+            return
+        try:
+            with self.scheduler.slot(url, timeout, priority) as observe:
+                yield observe
+        except HostSlotTimeout as e:
+            raise SchedulerTimeout(str(e)) from e
+
+    def fetch_robots_txt(self, url):
+        """robots.txt letöltése az ütemező számára (ütemezés nélkül, tanúsítvány ellenőrzéssel)"""
+        response = self.get(url, timeout=5, verify=True)
+        return response.status_code, response.text
+
+    @staticmethod
+    def _page_from_cache(entry, cache_status, elapsed, ttfb=None):
+        content = entry.read_body()
+        if content is None:
+            return None
+        return FetchedPage(
+            url=entry.meta['final_url'],
+            status_code=entry.meta['status_code'],
+            headers=entry.headers,
+            content=content,
+            elapsed=elapsed,
+            reason=entry.meta['reason'],
+            ttfb=ttfb,
+            download_time=0.0,
+            cache_status=cache_status
+        )
+
+    def close(self):
+        """Az összes poolozott kapcsolat lezárása"""
+        if self._hedge_executor is not None:
+            self._hedge_executor.shutdown(wait=False)
+        self.adapter.close()
+        self.verified_adapter.close()
+
+
+_shared_client = None
+_shared_client_lock = threading.Lock()
+
+
+def _reset_after_fork():
+    # A gyermek folyamat nem oszthatja meg a szülő nyitott kapcsolatait
+    global _shared_client, _shared_client_lock
+    _shared_client = None
+    _shared_client_lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def get_http_client():
+    """A folyamat szintű megosztott kliens lekérése (lusta létrehozással)"""
+    global _shared_client
+    if _shared_client is None:
+        with _shared_client_lock:
+            if _shared_client is None:
+                _shared_client = PooledHTTPClient()
+    return _shared_client
+
+
+def configure_http_client(**kwargs):
+    """A megosztott kliens újrakonfigurálása (pl. pool méretek, cache könyvtár)"""
+    global _shared_client
+    with _shared_client_lock:
+        old_client = _shared_client
+        _shared_client = PooledHTTPClient(**kwargs)
+    if old_client is not None:
+        old_client.close()
+    return _shared_client
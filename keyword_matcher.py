@@ -0,0 +1,74 @@
+import re
+
+
+def _trie_pattern(node):
+    """Regex egy trie csomópontból: a közös előtagok egyszer szerepelnek, a hosszabb ág az első"""
+    branches = [re.escape(char) + _trie_pattern(child) for char, child in sorted(node.items()) if char]
+    if not branches:
+        return ''
+    optional = '' in node
+    if len(branches) == 1 and not optional:
+        return branches[0]
+    return '(?:' + '|'.join(branches) + ')' + ('?' if optional else '')
+
+
+def load_keywords(path):
+    """Kulcsszólista fájlból (soronként egy, # kezdetű sorok és üres sorok nélkül)"""
+    with open(path, encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip() and not line.lstrip().startswith('#')]
+
+
+class KeywordMatcher:
+    """Szótár összes előfordulása egyetlen menetben, szóhatár figyeléssel
+
+    A kulcsszavakból trie épül, amely egyetlen regexszé fordul; a keresés minden
+    szó elején egyszer lép be a trie-be, így a futásidő a szótár méretétől
+    gyakorlatilag független. Alapértelmezésben a találatnak szó elején kell
+    kezdődnie, de folytatódhat (toldalékok: budapest -> budapesti);
+    whole_words=True esetén a szó végén is szóhatár kell. A szöveget a hívó
+    adja kisbetűsítve, a kulcsszavak kisbetűsítve kerülnek az automatába.
+    """
+
+    def __init__(self, keywords, whole_words=False):
+        self.keywords = list(dict.fromkeys(keyword.lower() for keyword in keywords if keyword))
+        self.whole_words = whole_words
+        trie = {}
+        for keyword in self.keywords:
+            node = trie
+            for char in keyword:
+                node = node.setdefault(char, {})
+            node[''] = True
+        end = r'(?!\w)' if whole_words else ''
+        self._regex = re.compile(r'(?<!\w)(?=(' + _trie_pattern(trie) + ')' + end + ')')
+        # Egy pozíción a leghosszabb találat jön vissza, a vele kezdődő rövidebb kulcsszavak innen
+        keyword_set = set(self.keywords)
+        self._prefixes = {
+            keyword: [keyword[:length] for length in range(1, len(keyword)) if keyword[:length] in keyword_set]
+            for keyword in self.keywords
+        }
+        self._order = {keyword: position for position, keyword in enumerate(self.keywords)}
+
+    def finditer(self, text):
+        """(pozíció, kulcsszó) párok szöveg sorrendben; egy pozíción a rövidebb kulcsszavak is"""
+        if not self.keywords:
+            return
+        for match in self._regex.finditer(text):
+            start = match.start()
+            longest = match.group(1)
+            for keyword in self._prefixes[longest]:
+                if not self.whole_words or not self._continues(text, start + len(keyword)):
+                    yield start, keyword
+            yield start, longest
+
+    @staticmethod
+    def _continues(text, position):
+        return position < len(text) and (text[position].isalnum() or text[position] == '_')
+
+    def found(self, text):
+        """Az előforduló kulcsszavak a szótár sorrendjében"""
+        hits = {keyword for _, keyword in self.finditer(text)}
+        return sorted(hits, key=self._order.__getitem__)
+
+    def contains_any(self, text):
+        """Előfordul-e legalább egy kulcsszó (az első találatnál megáll)"""
+        return bool(self.keywords) and self._regex.search(text) is not None
@@ -0,0 +1,237 @@
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from parser_backends import TagFilter
+
+# Szakaszok és előfeltételeik: response = letöltött oldal, index = parse-olt dokumentum
+# elemindexszel, text = látható szövegréteg, structured_data = JSON-LD entitások,
+# probes = robots.txt / sitemap hálózati ellenőrzések (a letöltéssel párhuzamosan indulnak)
+STAGES = {
+    'response': (),
+    'index': ('response',),
+    'text': ('index',),
+    'structured_data': ('index',),
+    'probes': (),
+}
+
+# A betöltés után előállítandó közös rétegek és az elemző metódus, amely elkészíti őket
+STAGE_METHODS = {
+    'text': 'get_text_layer',
+    'structured_data': 'get_structured_data',
+}
+
+# Költségosztályok: cheap = indexből olvas, text = teljes szövegen dolgozik, network = hálózatra vár
+COST_CLASSES = ('cheap', 'text', 'network')
+# Párhuzamos futtatásnál az indítási sorrend: a várakozó (I/O) modulok először
+COST_START_ORDER = {'network': 0, 'text': 1, 'cheap': 2}
+
+# Párhuzamos modulfuttatás alapértelmezése (SEO_PARALLEL_MODULES=0: sorban)
+DEFAULT_PARALLEL_MODULES = os.environ.get('SEO_PARALLEL_MODULES', '1') != '0'
+
+
+def _create_module_executor():
+    return ThreadPoolExecutor(
+        max_workers=int(os.environ.get('SEO_MODULE_WORKERS', '8')),
+        thread_name_prefix='seo-module'
+    )
+
+
+def _reset_module_executor():
+    # Fork után a gyermek folyamatban a szülő szálai nem léteznek, új készlet kell
+    global MODULE_EXECUTOR
+    MODULE_EXECUTOR = _create_module_executor()
+
+
+# Közös, korlátos szálkészlet az elemzéseken belüli modulfuttatáshoz
+MODULE_EXECUTOR = _create_module_executor()
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_module_executor)
+
+
+class AnalysisModule:
+    """Elemző modul leírása: név, elemző metódus, súly, bemenetek és költségosztály"""
+
+    def __init__(self, name, method, weight, inputs, cost='cheap'):
+        unknown = [stage for stage in inputs if stage not in STAGES]
+        if unknown:
+            raise ValueError(f'Ismeretlen bemenet ({name}): {", ".join(unknown)}')
+        if cost not in COST_CLASSES:
+            raise ValueError(f'Ismeretlen költségosztály ({name}): {cost}')
+        self.name = name
+        self.method = method
+        self.weight = weight
+        self.inputs = tuple(inputs)
+        self.cost = cost
+
+    def run(self, analyzer):
+        return getattr(analyzer, self.method)()
+
+    def tag_filter(self, analyzer_class):
+        """A metódus requires_tags jelölése (None: teljes dokumentum kell)"""
+        return getattr(getattr(analyzer_class, self.method), 'required_tags', None)
+
+
+# Kimeneti sorrend = regisztrációs sorrend
+MODULES = [
+    AnalysisModule('title', 'analyze_title', 1.2, ('index',)),
+    AnalysisModule('meta_description', 'analyze_meta_description', 1.1, ('index',)),
+    AnalysisModule('headings', 'analyze_headings', 1.0, ('index',)),
+    AnalysisModule('images', 'analyze_images', 0.8, ('index',)),
+    AnalysisModule('links', 'analyze_links', 0.9, ('index',)),
+    AnalysisModule('structured_data', 'analyze_structured_data', 0.7, ('index', 'structured_data')),
+    AnalysisModule('performance', 'analyze_performance', 1.3, ('response',)),
+    AnalysisModule('mobile_friendly', 'analyze_mobile_friendly', 1.1, ('index',)),
+    AnalysisModule('seo_fundamentals', 'analyze_seo_fundamentals', 0.9, ('index', 'probes'), 'network'),
+    AnalysisModule('content_quality', 'analyze_content_quality', 1.0, ('index', 'text'), 'text'),
+    AnalysisModule('technical_seo', 'analyze_technical_seo', 0.9, ('response', 'index')),
+    AnalysisModule('social_media_optimization', 'analyze_social_media_optimization', 0.8, ('index',)),
+    AnalysisModule('accessibility_seo', 'analyze_accessibility_seo', 0.7, ('index',)),
+    AnalysisModule('core_web_vitals', 'analyze_core_web_vitals', 1.2, ('response', 'index')),
+    AnalysisModule('local_seo', 'analyze_local_seo', 0.9, ('index', 'text', 'structured_data'), 'text'),
+    AnalysisModule('e_commerce_seo', 'analyze_e_commerce_seo', 0.8, ('index', 'text', 'structured_data'), 'text'),
+]
+MODULES_BY_NAME = {module.name: module for module in MODULES}
+MODULE_NAMES = tuple(MODULES_BY_NAME)
+
+
+def parse_module_names(value):
+    """'title,links' vagy lista -> modulnevek; üres érték: minden modul (None)"""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = value.split(',')
+    names = [name.strip() for name in value if name and name.strip()]
+    return names or None
+
+
+def _stage_order(stages):
+    # Mélységi bejárás a STAGES előfeltételein: minden szakasz az előfeltételei után következik
+    ordered = []
+
+    def visit(stage):
+        if stage in ordered:
+            return
+        for prerequisite in STAGES[stage]:
+            visit(prerequisite)
+        ordered.append(stage)
+
+    for stage in STAGES:
+        if stage in stages:
+            visit(stage)
+    return ordered
+
+
+class ExecutionPlan:
+    """A kért modulok és a futtatásukhoz szükséges szakaszok, függőségi sorrendben
+
+    A modulok a közös bemeneteikre (szakaszokra) hivatkoznak, a terv csak az
+    igényelt szakaszokat tartalmazza: pl. a title / links / performance elemzés
+    szövegréteg és hálózati ellenőrzések nélkül fut.
+    """
+
+    def __init__(self, modules):
+        self.modules = modules
+        self.stages = _stage_order({stage for module in modules for stage in module.inputs})
+
+    def needs(self, stage):
+        return stage in self.stages
+
+    def tag_filter(self, analyzer_class):
+        """A modulok elemigényének uniója; None, ha valamelyik a teljes dokumentumot igényli"""
+        filters = [module.tag_filter(analyzer_class) for module in self.modules if 'index' in module.inputs]
+        if any(tag_filter is None for tag_filter in filters):
+            return None
+        tag_filter = TagFilter.union(filters)
+        # A választ olvasó modulok (oldalméret, fejlécek) a teljes törzset igénylik
+        if any('response' in module.inputs for module in self.modules):
+            tag_filter.head_only = False
+        return tag_filter
+
+
+def run_plan(plan, analyzer, parallel=False):
+    """A terv közös rétegeinek és moduljainak futtatása; modulnév -> eredmény, regisztrációs sorrendben
+
+    parallel=True esetén a független modulok a közös szálkészleten futnak: előbb
+    a hálózatra váró modulok, majd a rétegek (szöveg, JSON-LD) és a rájuk nem
+    váró modulok, végül a rétegekre épülők. A rétegekre épülő modulok csak a
+    rétegfeladatok elkészülte után kerülnek a sorba, így várakozó modul nem
+    foglal szálat. Az eredmény sorrendje a futási sorrendtől független.
+    """
+    stages = [stage for stage in plan.stages if stage in STAGE_METHODS]
+    if not parallel:
+        for stage in stages:
+            getattr(analyzer, STAGE_METHODS[stage])()
+        return {module.name: module.run(analyzer) for module in plan.modules}
+
+    ordered = sorted(plan.modules, key=lambda module: COST_START_ORDER[module.cost])
+    independent = [module for module in ordered if not any(stage in STAGE_METHODS for stage in module.inputs)]
+    dependent = [module for module in ordered if module not in independent]
+    futures = {}
+    for module in independent:
+        if module.cost == 'network':
+            futures[module.name] = MODULE_EXECUTOR.submit(module.run, analyzer)
+    stage_futures = {
+        stage: MODULE_EXECUTOR.submit(getattr(analyzer, STAGE_METHODS[stage])) for stage in stages
+    }
+    for module in independent:
+        if module.name not in futures:
+            futures[module.name] = MODULE_EXECUTOR.submit(module.run, analyzer)
+    for module in dependent:
+        waits = [stage_futures[stage] for stage in module.inputs if stage in stage_futures]
+        futures[module.name] = _submit_after(waits, module, analyzer)
+    return {module.name: futures[module.name].result() for module in plan.modules}
+
+
+def _submit_after(waits, module, analyzer):
+    """A modul beküldése a szálkészletre, amikor minden várt rétegfeladat elkészült"""
+    result = Future()
+    remaining = [len(waits)]
+    lock = threading.Lock()
+
+    def relay(future):
+        # A modul eredményének (vagy hibájának) továbbítása
+        error = future.exception()
+        if error is not None:
+            result.set_exception(error)
+        else:
+            result.set_result(future.result())
+
+    def submit():
+        try:
+            MODULE_EXECUTOR.submit(module.run, analyzer).add_done_callback(relay)
+        except RuntimeError as e:
+            result.set_exception(e)
+
+    def stage_done(future):
+        with lock:
+            remaining[0] -= 1
+            last = remaining[0] == 0
+        if not last:
+            return
+        for stage_future in waits:
+            error = stage_future.exception()
+            if error is not None:
+                # A réteg hibája a modul hibájaként jelenik meg
+                result.set_exception(error)
+                return
+        submit()
+
+    if not waits:
+        submit()
+    for stage_future in waits:
+        stage_future.add_done_callback(stage_done)
+    return result
+
+
+def build_plan(names=None):
+    """Végrehajtási terv a megadott modulokhoz (None: mind); ismeretlen névre ValueError"""
+    if names is None:
+        return ExecutionPlan(list(MODULES))
+    unknown = [name for name in names if name not in MODULES_BY_NAME]
+    if unknown:
+        raise ValueError(
+            f'Ismeretlen modul: {", ".join(unknown)} (elérhető: {", ".join(MODULE_NAMES)})'
+        )
+    requested = set(names)
+    return ExecutionPlan([module for module in MODULES if module.name in requested])
@@ -0,0 +1,142 @@
+import os
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from retry_policy import RetryPolicy
+from sitemap_parser import sniff_sitemap_type
+
+def _create_probe_executor():
+    return ThreadPoolExecutor(
+        max_workers=int(os.environ.get('SEO_PROBE_WORKERS', '32')),
+        thread_name_prefix='seo-probe'
+    )
+
+
+def _reset_probe_executor():
+    # Fork után a gyermek folyamatban a szülő szálai nem léteznek, új készlet kell
+    global PROBE_EXECUTOR
+    PROBE_EXECUTOR = _create_probe_executor()
+
+
+# Közös szálkészlet a hálózati ellenőrzésekhez (robots.txt, sitemap)
+PROBE_EXECUTOR = _create_probe_executor()
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_probe_executor)
+
+SITEMAP_CANDIDATES = ('sitemap.xml', 'sitemap_index.xml')
+
+# Az ellenőrzésekhez csak a státusz kell; nagy fájloknál a letöltés megszakad
+PROBE_MAX_BYTES = 256 * 1024
+
+# Az ellenőrzések rövidek: egy újrapróbálás, hedging nélkül (saját késleltetési statisztikával)
+PROBE_RETRY_POLICY = RetryPolicy(retries=1, hedge_percentile=None)
+
+
+def probe_result(name, url, page):
+    """Egy ellenőrzés eredménye; sitemapnél a gyökérelem típusával"""
+    result = {'url': url, 'status_code': page.status_code}
+    if name in SITEMAP_CANDIDATES and page.status_code == 200:
+        result['type'] = sniff_sitemap_type(page.content)
+    return result
+
+
+class NetworkTimeline:
+    """Hálózati lépések kezdési/befejezési idejei egy közös időponthoz mérve"""
+
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self.spans = {}
+
+    def record(self, name, started, finished):
+        self.spans[name] = {
+            'start': round(started - self.origin, 3),
+            'end': round(finished - self.origin, 3),
+            'duration': round(finished - started, 3)
+        }
+
+    def timed(self, name, func, *args, **kwargs):
+        """Függvény futtatása és időtartamának rögzítése"""
+        started = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            self.record(name, started, time.perf_counter())
+
+    def to_dict(self):
+        """Idővonal összesítése: szekvenciális összeg vs. tényleges falióra idő"""
+        spans = dict(self.spans)
+        sequential = sum(span['duration'] for span in spans.values())
+        wall = max((span['end'] for span in spans.values()), default=0)
+        return {
+            'spans': spans,
+            'sequential_total': round(sequential, 3),
+            'wall_total': round(wall, 3),
+            'overlap_saved': round(max(0, sequential - wall), 3)
+        }
+
+
+class NetworkProbes:
+    """robots.txt és sitemap ellenőrzések párhuzamos futtatása"""
+
+    def __init__(self, base_url, http_client, timeline=None, timeout=5):
+        self.base_url = base_url.rstrip('/')
+        self.http = http_client
+        self.timeline = timeline or NetworkTimeline()
+        self.timeout = timeout
+        self.futures = {}
+
+    @classmethod
+    def from_results(cls, base_url, results, timeline=None):
+        """Máshol (pl. a szülő folyamatban) már lefutott ellenőrzések eredményeiből"""
+        probes = cls(base_url, None, timeline)
+        for name, result in results.items():
+            future = Future()
+            future.set_result(result)
+            probes.futures[name] = future
+        return probes
+
+    def probe_urls(self):
+        """Ellenőrzés neve -> URL"""
+        return {name: f"{self.base_url}/{name}" for name in ('robots.txt',) + SITEMAP_CANDIDATES}
+
+    def start(self):
+        """Az összes ellenőrzés elindítása a háttérben"""
+        if not self.futures:
+            for name, url in self.probe_urls().items():
+                self.futures[name] = PROBE_EXECUTOR.submit(self.timeline.timed, name, self._probe, name, url)
+        return self
+
+    def _probe(self, name, url):
+        try:
+            # Az ellenőrzések (mint korábban) tanúsítvány ellenőrzéssel futnak
+            page = self.http.fetch(url, timeout=self.timeout, max_bytes=PROBE_MAX_BYTES, use_cache=False,
+                                   retry_policy=PROBE_RETRY_POLICY, verify=True, priority=True)
+            return probe_result(name, url, page)
+        except Exception:
+            return None
+
+    def robots_txt(self):
+        """Robots.txt eredmény"""
+        self.start()
+        result = self.futures['robots.txt'].result()
+        if result is None:
+            return {'exists': False, 'url': '', 'status_code': 0}
+        return {
+            'exists': result['status_code'] == 200,
+            'url': result['url'],
+            'status_code': result['status_code']
+        }
+
+    def sitemap(self):
+        """Első elérhető sitemap a preferencia sorrendjében"""
+        self.start()
+        for name in SITEMAP_CANDIDATES:
+            result = self.futures[name].result()
+            if result is not None and result['status_code'] == 200:
+                return {
+                    'exists': True,
+                    'url': result['url'],
+                    'status_code': result['status_code'],
+                    'type': result.get('type')
+                }
+        return {'exists': False, 'url': '', 'status_code': 0}
@@ -0,0 +1,148 @@
+from bs4 import Tag
+
+HEADING_LEVELS = {'h1': 1, 'h2': 2, 'h3': 3, 'h4': 4, 'h5': 5, 'h6': 6}
+
+
+def attribute_values(value):
+    """Többértékű attribútum (rel, class) értékei listaként"""
+    if value is None:
+        return []
+    if isinstance(value, str):
+        return value.split()
+    return list(value)
+
+
+class PageIndex:
+    """Az oldal elemeinek indexe, egyetlen bejárással a parse után
+
+    Az elemzők ebből olvasnak a soup ismételt bejárása helyett. Minden lista
+    dokumentum sorrendben van; a kulcsok a BeautifulSoup keresésekkel egyező
+    (kis-nagybetű érzékeny) értékek, a meta nevek és property-k kisbetűsítve.
+    """
+
+    def __init__(self, soup, elements=None):
+        self.soup = soup
+        self.tags = {}
+        self.meta_by_name = {}
+        self.meta_by_property = {}
+        self.links_by_rel = {}
+        self.scripts_by_type = {}
+        self.outline = []
+        self.anchors = []
+        self.itemscopes = []
+        self.class_names = set()
+        # A natív parser backend saját elemburkolókat ad, egyébként a soup elemei
+        if elements is None:
+            elements = (element for element in soup.descendants if isinstance(element, Tag))
+        self._build(elements)
+
+    def add(self, element):
+        """Egy elem felvétele (a streaming kinyerés elemenként tölti az indexet)"""
+        self._build((element,))
+
+    def _build(self, elements):
+        tags = self.tags
+        for element in elements:
+            name = element.name
+            attrs = element.attrs
+            bucket = tags.get(name)
+            if bucket is None:
+                bucket = tags[name] = []
+            bucket.append(element)
+
+            if attrs:
+                if 'itemscope' in attrs:
+                    self.itemscopes.append(element)
+                if 'class' in attrs:
+                    self.class_names.update(attribute_values(attrs['class']))
+
+            if name == 'a':
+                if 'href' in attrs:
+                    self.anchors.append(element)
+            elif name == 'meta':
+                if 'name' in attrs:
+                    self.meta_by_name.setdefault(attrs['name'].lower(), []).append(element)
+                if 'property' in attrs:
+                    self.meta_by_property.setdefault(attrs['property'].lower(), []).append(element)
+            elif name == 'link':
+                for rel in dict.fromkeys(attribute_values(attrs.get('rel'))):
+                    self.links_by_rel.setdefault(rel, []).append(element)
+            elif name == 'script':
+                self.scripts_by_type.setdefault(attrs.get('type'), []).append(element)
+            elif name in HEADING_LEVELS:
+                self.outline.append((HEADING_LEVELS[name], element))
+
+    def all(self, name):
+        """Adott nevű elemek dokumentum sorrendben"""
+        return self.tags.get(name, [])
+
+    def first(self, name):
+        """Első adott nevű elem (None, ha nincs)"""
+        elements = self.tags.get(name)
+        return elements[0] if elements else None
+
+    def with_attribute(self, name, attribute):
+        """Adott nevű elemek, amelyeken az attribútum szerepel"""
+        return [element for element in self.all(name) if attribute in element.attrs]
+
+    def first_matching(self, name, attribute, pattern):
+        """Első elem, amelynek attribútuma illeszkedik a mintára"""
+        for element in self.all(name):
+            value = element.get(attribute)
+            if value is not None and pattern.search(value):
+                return element
+        return None
+
+    def meta(self, name, ignore_case=False):
+        """Első meta tag a name attribútum alapján"""
+        for tag in self.meta_by_name.get(name.lower(), ()):
+            if ignore_case or tag.get('name') == name:
+                return tag
+        return None
+
+    def meta_with_prefix(self, attribute, prefix, ignore_case=False):
+        """Meta tagek, amelyek name / property értéke a prefixszel kezdődik"""
+        if ignore_case:
+            prefix = prefix.lower()
+        tags = []
+        for tag in self.all('meta'):
+            value = tag.get(attribute)
+            if value is None:
+                continue
+            if ignore_case:
+                value = value.lower()
+            if value.startswith(prefix):
+                tags.append(tag)
+        return tags
+
+    def links(self, rel):
+        """<link> elemek, amelyek rel értékei között szerepel a megadott"""
+        return self.links_by_rel.get(rel, [])
+
+    def first_link(self, rel):
+        """Első <link> elem a megadott rel értékkel (None, ha nincs)"""
+        links = self.links_by_rel.get(rel)
+        return links[0] if links else None
+
+    def links_with_rel_value(self, value):
+        """<link> elemek, amelyek teljes rel értéke megegyezik (CSS [rel="..."] szerint)"""
+        return [tag for tag in self.all('link') if ' '.join(attribute_values(tag.get('rel'))) == value]
+
+    def scripts(self, script_type):
+        """Adott type attribútumú <script> elemek"""
+        return self.scripts_by_type.get(script_type, [])
+
+    def headings(self, level):
+        """Adott szintű címsorok dokumentum sorrendben"""
+        return self.all(f'h{level}')
+
+    def head_scripts(self):
+        """Külső (src) scriptek az első <head> elemen belül"""
+        head = self.first('head')
+        if head is None:
+            return []
+        return [script for script in head.find_all('script') if 'src' in script.attrs]
+
+    def has_class(self, pattern):
+        """Van-e a mintára illeszkedő class az oldalon"""
+        return any(pattern.search(class_name) for class_name in self.class_names)
@@ -0,0 +1,374 @@
+import os
+import re
+from abc import ABC, abstractmethod
+
+from bs4 import BeautifulSoup, CData, NavigableString, SoupStrainer, Tag
+from bs4.builder import HTMLTreeBuilder
+
+from page_index import PageIndex
+
+try:
+    import lxml.html
+    from lxml import etree
+except ImportError:
+    lxml = None
+
+# Üzemeltetési alapértelmezés; kérésenként a 'parser' mezővel felülírható
+DEFAULT_PARSER_BACKEND = os.environ.get('SEO_PARSER_BACKEND', 'lxml')
+
+# A BeautifulSoup szabályai, hogy a natív fa ugyanazt adja az elemzőknek
+MULTI_VALUED_ATTRIBUTES = HTMLTreeBuilder.DEFAULT_CDATA_LIST_ATTRIBUTES
+STRING_CONTAINERS = frozenset(HTMLTreeBuilder.DEFAULT_STRING_CONTAINERS)
+PRESERVE_WHITESPACE_TAGS = frozenset(HTMLTreeBuilder.DEFAULT_PRESERVE_WHITESPACE_TAGS)
+ASCII_SPACES = BeautifulSoup.ASCII_SPACES
+# A látható szövegből kimaradó elemek (a get_text() a noscript tartalmát még visszaadja)
+HIDDEN_TEXT_TAGS = frozenset(('script', 'style', 'noscript', 'template'))
+# A BeautifulSoup get_text() alapértelmezésben csak ezeket a szövegtípusokat adja vissza
+VISIBLE_STRING_TYPES = (NavigableString, CData)
+# Csak head elemeket olvasó moduloknál a letöltés eddig tart
+HEAD_END_RE = re.compile(rb'</head\s*>', re.I)
+
+
+def requires_tags(*tags, attributes=(), head_only=False):
+    """Elemző modul által olvasott elemek megjelölése
+
+    Az egymodulos végpontok ez alapján csak a megadott nevű (vagy a megadott
+    attribútumot hordozó) elemeket és azok teljes részfáját parse-olják;
+    head_only esetén a letöltés is megáll a </head> után. Jelölés nélküli
+    modul a teljes dokumentumot kapja.
+    """
+    def decorate(method):
+        method.required_tags = TagFilter(tags, attributes, head_only)
+        return method
+    return decorate
+
+
+class TagFilter:
+    """Modul elemigénye: elemnevek, attribútumok és hogy elég-e a <head>"""
+
+    def __init__(self, tags, attributes=(), head_only=False):
+        self.tags = frozenset(tags)
+        self.attributes = tuple(attributes)
+        self.head_only = head_only
+
+    @classmethod
+    def union(cls, filters):
+        """Több modul igényének uniója; a <head> csak akkor elég, ha mindegyiknek elég"""
+        filters = list(filters)
+        return cls(
+            set().union(*(tag_filter.tags for tag_filter in filters)),
+            dict.fromkeys(attribute for tag_filter in filters for attribute in tag_filter.attributes),
+            bool(filters) and all(tag_filter.head_only for tag_filter in filters)
+        )
+
+    def matches(self, name, attrs):
+        return name in self.tags or any(attribute in attrs for attribute in self.attributes)
+
+    def strainer(self):
+        # A hívható név (név, attribútumok) párt kap; egyező elem alatt minden megmarad
+        return SoupStrainer(self.matches)
+
+
+class ParserBackend(ABC):
+    """HTML parser backend: szövegből dokumentum és elemindex"""
+
+    name = None
+    # Streamelő backend: bájtokat kap a dekódolt szöveg helyett
+    streaming = False
+
+    @abstractmethod
+    def parse(self, text, only=None):
+        """Dokumentum a szövegből; only (TagFilter) esetén csak a kért elemekkel, ha a backend támogatja"""
+
+    def index(self, document):
+        return PageIndex(document)
+
+    def visible_strings(self, document):
+        """Látható szövegdarabok dokumentum sorrendben (script/style/noscript/template nélkül)"""
+        stack = [iter(document.contents)]
+        while stack:
+            for node in stack[-1]:
+                if type(node) in VISIBLE_STRING_TYPES:
+                    yield node
+                elif isinstance(node, Tag) and node.name not in HIDDEN_TEXT_TAGS:
+                    stack.append(iter(node.contents))
+                    break
+            else:
+                stack.pop()
+
+    def release(self, document):
+        """Dokumentum felszabadítása: a BeautifulSoup fa körkörös hivatkozásait azonnal bontja"""
+        document.decompose()
+
+
+class HTMLParserBackend(ParserBackend):
+    """Tiszta Python html.parser BeautifulSoup-pal (nincs külső függőség)"""
+
+    name = 'html.parser'
+
+    def parse(self, text, only=None):
+        return BeautifulSoup(text, 'html.parser', parse_only=only.strainer() if only else None)
+
+
+class LxmlSoupBackend(ParserBackend):
+    """lxml parser BeautifulSoup fával"""
+
+    name = 'lxml'
+
+    def parse(self, text, only=None):
+        if only is not None:
+            # Szűrt fánál az üres eredmény nem jelez hibát, ezért az árva záró tagek előre kikerülnek
+            from streaming_extractor import strip_leading_end_tags
+            return BeautifulSoup(strip_leading_end_tags(text), 'lxml', parse_only=only.strainer())
+        soup = BeautifulSoup(text, 'lxml')
+        # A <html> előtti árva záró tag miatt a BeautifulSoup lxml buildere üres fát ad
+        if soup.find() is None and '<' in text:
+            return BeautifulSoup(text, 'html.parser')
+        return soup
+
+
+class NativeLxmlBackend(ParserBackend):
+    """lxml.html fa BeautifulSoup nélkül, vékony elemburkolókkal"""
+
+    name = 'lxml-native'
+
+    def parse(self, text, only=None):
+        # A natív fa építése olcsó, szűrés nélkül készül
+        try:
+            root = lxml.html.document_fromstring(text)
+        except ValueError:
+            # XML deklarációval kezdődő szöveget az lxml csak bájtként fogad el
+            root = lxml.html.document_fromstring(text.encode('utf-8'), parser=lxml.html.HTMLParser(encoding='utf-8'))
+        except etree.ParserError:
+            # Csak whitespace / komment: üres dokumentum, mint a BeautifulSoup-nál
+            root = lxml.html.document_fromstring('<html></html>')
+        return LxmlDocument(root)
+
+    def index(self, document):
+        return PageIndex(document, document.elements())
+
+    def visible_strings(self, document):
+        return _iter_strings(document.root, None, None, False, HIDDEN_TEXT_TAGS)
+
+    def release(self, document):
+        # A C fa az utolsó hivatkozással együtt szabadul fel
+        pass
+
+
+class StreamingBackend(ParserBackend):
+    """Fa nélküli, eseményalapú kinyerés (lxml target parser): csak rekordok, index és szöveg
+
+    Az elemző a teljes letöltés után kapja meg a page.content bájtjait, és azokat
+    chunk_size méretű darabokban adja a parsernek: a megtakarítás a DOM és a teljes
+    dekódolt szöveg elhagyásából ered, a letöltéssel párhuzamos feldolgozás nincs.
+    """
+
+    name = 'stream'
+    streaming = True
+    chunk_size = 64 * 1024
+
+    def parse(self, text, only=None):
+        # A streamelő kinyerés eleve csak az elemzők által olvasott elemeket rögzíti
+        from streaming_extractor import StreamingExtractor
+        extractor = StreamingExtractor()
+        extractor.feed(text)
+        return extractor.close()
+
+    def parse_bytes(self, content, content_type=None, encoding=None):
+        """Bájtok darabonkénti feldolgozása; a dokumentum encoding / encoding_source mezőivel"""
+        from streaming_extractor import StreamingExtractor
+        extractor = StreamingExtractor(content_type, encoding)
+        for start in range(0, len(content), self.chunk_size):
+            extractor.feed(content[start:start + self.chunk_size])
+        return extractor.close()
+
+    def index(self, document):
+        return document.index
+
+    def visible_strings(self, document):
+        return document.visible_strings()
+
+    def release(self, document):
+        pass
+
+
+def _is_element(node):
+    # Kommentek és feldolgozási utasítások tag-je nem szöveg
+    return isinstance(node.tag, str)
+
+
+def _text_context(node):
+    """A legbelső script/style/template/rt/rp ős neve, és hogy pre/textarea-n belül van-e"""
+    container = None
+    preserve = False
+    for ancestor in node.iterancestors():
+        if container is None and ancestor.tag in STRING_CONTAINERS:
+            container = ancestor.tag
+        if ancestor.tag in PRESERVE_WHITESPACE_TAGS:
+            preserve = True
+    return container, preserve
+
+
+def _collapse(text, preserve):
+    # A BeautifulSoup a csak whitespace-ből álló szöveget egy szóközre / sortörésre cseréli
+    if preserve or text.strip(ASCII_SPACES):
+        return text
+    return '\n' if '\n' in text else ' '
+
+
+def _iter_strings(node, wanted, container, preserve, skip=frozenset()):
+    """Szövegdarabok dokumentum sorrendben, a BeautifulSoup get_text() szűrésével
+
+    Egy szöveg akkor kerül be, ha a legbelső tartalmazó script/style/... eleme
+    megegyezik a lekérdezett elemével (közönséges elemnél: nincs ilyen ős).
+    A skip elemeinek tartalma kimarad, a mögöttük álló szöveg nem.
+    """
+    containers = STRING_CONTAINERS
+    preserving = PRESERVE_WHITESPACE_TAGS
+    own = node.tag if node.tag in containers else container
+    inner = preserve or node.tag in preserving
+    if node.text and own == wanted:
+        yield _collapse(node.text, inner)
+    # (gyermekek, tartalmazó, pre-n belül, lezárandó elem); a farokszöveg a részfa után következik
+    stack = [(iter(node), own, inner, None)]
+    while stack:
+        children, own, inner, closing = stack[-1]
+        for child in children:
+            tag = child.tag
+            if tag.__class__ is str and tag not in skip:
+                child_own = tag if tag in containers else own
+                child_inner = inner or tag in preserving
+                text = child.text
+                if text and child_own == wanted:
+                    yield text if child_inner or text.strip(ASCII_SPACES) else _collapse(text, False)
+                if len(child):
+                    stack.append((iter(child), child_own, child_inner, (child, own, inner)))
+                    break
+            tail = child.tail
+            if tail and own == wanted:
+                yield tail if inner or tail.strip(ASCII_SPACES) else _collapse(tail, False)
+        else:
+            stack.pop()
+            if closing is not None:
+                element, outer, outer_preserve = closing
+                if element.tail and outer == wanted:
+                    yield _collapse(element.tail, outer_preserve)
+
+
+def join_strings(strings, separator, strip):
+    if strip:
+        strings = (string.strip() for string in strings)
+        strings = (string for string in strings if string)
+    return separator.join(strings)
+
+
+_multi_valued_keys = {}
+
+
+def element_attributes(name, attrib):
+    """Attribútumok szótárként; a többértékűek (class, rel, ...) listaként, mint a BeautifulSoup-ban"""
+    if not attrib:
+        return {}
+    attrs = dict(attrib.items())
+    keys = _multi_valued_keys.get(name)
+    if keys is None:
+        keys = _multi_valued_keys[name] = tuple(MULTI_VALUED_ATTRIBUTES['*'] + MULTI_VALUED_ATTRIBUTES.get(name, []))
+    for key in keys:
+        value = attrs.get(key)
+        if value is not None:
+            attrs[key] = value.split()
+    return attrs
+
+
+class LxmlElement:
+    """lxml elem a BeautifulSoup Tag azon felületével, amelyet az elemzők használnak"""
+
+    __slots__ = ('node', 'name', 'attrs')
+
+    def __init__(self, node):
+        self.node = node
+        self.name = node.tag
+        self.attrs = element_attributes(node.tag, node.attrib)
+
+    def __bool__(self):
+        return True
+
+    def __getitem__(self, key):
+        return self.attrs[key]
+
+    def get(self, key, default=None):
+        return self.attrs.get(key, default)
+
+    def has_attr(self, key):
+        return key in self.attrs
+
+    def get_text(self, separator='', strip=False):
+        wanted = self.name if self.name in STRING_CONTAINERS else None
+        strings = _iter_strings(self.node, wanted, *_text_context(self.node))
+        return join_strings(strings, separator, strip)
+
+    @property
+    def string(self):
+        """Az egyetlen szöveges gyermek (None, ha több vagy nincs)"""
+        node = self.node
+        children = list(node)
+        if not children:
+            return node.text
+        if len(children) == 1 and not node.text and not children[0].tail and _is_element(children[0]):
+            return LxmlElement(children[0]).string
+        return None
+
+    def find_all(self, name):
+        names = [name] if isinstance(name, str) else list(name)
+        return [LxmlElement(node) for node in self.node.iterdescendants(*names)]
+
+    def find(self, name, attrs=None):
+        for node in self.node.iterdescendants(name):
+            element = LxmlElement(node)
+            if all(element.get(key) == value for key, value in (attrs or {}).items()):
+                return element
+        return None
+
+    def __repr__(self):
+        return f'<LxmlElement {self.name}>'
+
+
+class LxmlDocument:
+    """Natív lxml dokumentum a BeautifulSoup objektum helyén"""
+
+    def __init__(self, root):
+        self.root = root
+
+    def elements(self):
+        """Minden elem dokumentum sorrendben, burkolva"""
+        return (LxmlElement(node) for node in self.root.iter(etree.Element))
+
+    def get_text(self, separator='', strip=False):
+        return join_strings(_iter_strings(self.root, None, None, False), separator, strip)
+
+
+PARSER_BACKENDS = {
+    backend.name: backend()
+    for backend in (HTMLParserBackend, LxmlSoupBackend, NativeLxmlBackend, StreamingBackend)
+}
+LXML_BACKENDS = ('lxml', 'lxml-native', 'stream')
+
+
+def available_parser_backends():
+    """A telepített csomagokkal használható backendek nevei"""
+    return [name for name in PARSER_BACKENDS if lxml is not None or name not in LXML_BACKENDS]
+
+
+def get_parser_backend(name=None):
+    """Parser backend név alapján (None: SEO_PARSER_BACKEND vagy lxml, ennek hiányában html.parser)"""
+    if isinstance(name, ParserBackend):
+        return name
+    if name is None:
+        name = DEFAULT_PARSER_BACKEND
+        if lxml is None and name in LXML_BACKENDS:
+            name = HTMLParserBackend.name
+    if name not in PARSER_BACKENDS:
+        raise ValueError(f"Ismeretlen parser backend: {name} (választható: {', '.join(PARSER_BACKENDS)})")
+    if name not in available_parser_backends():
+        raise ValueError(f"A(z) {name} parser backendhez az lxml csomag szükséges")
+    return PARSER_BACKENDS[name]
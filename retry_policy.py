@@ -0,0 +1,91 @@
+import os
+import random
+import threading
+from collections import deque
+
+# Átmeneti hibát jelző státuszkódok, ezeknél érdemes újrapróbálni
+RETRYABLE_STATUS_CODES = (429, 502, 503, 504)
+
+DEFAULT_FETCH_RETRIES = int(os.environ.get('SEO_FETCH_RETRIES', '3'))
+DEFAULT_BACKOFF_BASE = float(os.environ.get('SEO_RETRY_BACKOFF', '0.5'))
+DEFAULT_BACKOFF_MAX = float(os.environ.get('SEO_RETRY_BACKOFF_MAX', '10'))
+# Hedged kérések: üres értéknél kikapcsolva, egyébként a késleltetési percentilis (pl. 95)
+DEFAULT_HEDGE_PERCENTILE = float(os.environ.get('SEO_HEDGE_PERCENTILE') or 0) or None
+
+
+class HedgeCancelled(Exception):
+    """A párhuzamos kérések közül a másik már nyert, ez a próbálkozás el sem indult"""
+
+
+class LatencyTracker:
+    """Az utolsó N sikeres próbálkozás időtartama percentilis számításhoz"""
+
+    def __init__(self, window=256):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def observe(self, duration):
+        with self._lock:
+            self._samples.append(duration)
+
+    def __len__(self):
+        return len(self._samples)
+
+    def percentile(self, percent):
+        """Legközelebbi rang szerinti percentilis (None, ha nincs minta)"""
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return None
+        rank = max(0, min(len(samples) - 1, int(round(percent / 100.0 * len(samples))) - 1))
+        return samples[rank]
+
+
+class RetryPolicy:
+    """Újrapróbálási szabályok: jitteres exponenciális visszalépés, Retry-After, hedged kérések"""
+
+    def __init__(self, retries=DEFAULT_FETCH_RETRIES, backoff_base=DEFAULT_BACKOFF_BASE,
+                 backoff_max=DEFAULT_BACKOFF_MAX, max_retry_after=60.0,
+                 retry_status_codes=RETRYABLE_STATUS_CODES, hedge_percentile=DEFAULT_HEDGE_PERCENTILE,
+                 hedge_min_samples=20, hedge_min_delay=0.05):
+        self.retries = retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.max_retry_after = max_retry_after
+        self.retry_status_codes = retry_status_codes
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self.hedge_min_delay = hedge_min_delay
+        self.latency = LatencyTracker()
+
+    def should_retry(self, attempt, status_code=None):
+        """Van-e még próbálkozás, és átmeneti-e a hiba (status_code=None: kivétel történt)"""
+        if attempt > self.retries:
+            return False
+        return status_code is None or status_code in self.retry_status_codes
+
+    def backoff(self, attempt, retry_after=None):
+        """Várakozás a következő próbálkozás előtt; a Retry-After fejléc elsőbbséget élvez"""
+        if retry_after is not None:
+            return min(retry_after, self.max_retry_after)
+        # Full jitter: egyenletes eloszlás 0 és az exponenciálisan növő felső korlát között
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** (attempt - 1))))
+
+    def hedge_delay(self):
+        """Ennyi idő után indul párhuzamos második kérés (None: nincs hedging)"""
+        if not self.hedge_percentile or len(self.latency) < self.hedge_min_samples:
+            return None
+        return max(self.hedge_min_delay, self.latency.percentile(self.hedge_percentile))
+
+
+def attempt_record(number, hedge, origin, started, backoff):
+    """Egy próbálkozás időzítési bejegyzése (a fetch.attempts listához)"""
+    return {
+        'attempt': number,
+        'hedge': hedge,
+        'start': round(started - origin, 3),
+        'backoff': round(backoff, 3),
+        'duration': None,
+        'status_code': None,
+        'error': None
+    }
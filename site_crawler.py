@@ -0,0 +1,154 @@
+import asyncio
+import time
+import urllib.parse
+from collections import deque
+
+from app import normalize_url
+from batch_engine import BatchEngine, iterate_in_thread
+from module_registry import MODULE_NAMES
+
+
+class SiteCrawler:
+    """Webhely bejárása egy kezdő URL-ről, minden megtalált oldal teljes elemzésével
+
+    A frontier FIFO sor (szélességi bejárás): a belső linkeket az analyze_links
+    besorolása adja, abszolút és normalizált formában (fragment, alapértelmezett
+    port nélkül), a már látott URL-ek nem kerülnek újra sorba. A letöltés és a
+    host-onkénti párhuzamosság (AIMD, crawl-delay) az AsyncSEOEngine-é, a
+    parse-olás és az elemzés a BatchEngine munkafolyamataiban fut, a robots.txt
+    szabályait a host ütemező ellenőrzi. Futás közben a progress() adja a
+    számlálókat.
+
+    A robots.txt és sitemap ellenőrzés hostonként egyszer, a host gyökerén fut
+    (site_checks: origin -> {'robots_txt', 'sitemap'}); az oldalankénti
+    modulok közül a seo_fundamentals kimarad, mert oldalanként három további
+    kérést indítana az oldal URL-jéből képzett címekre.
+    """
+
+    def __init__(self, seed, max_depth=3, max_pages=1000, modules=None, respect_robots=True,
+                 allowed_hosts=None, **batch_options):
+        if '://' not in seed:
+            seed = 'https://' + seed
+        self.seed = normalize_url(seed)
+        if self.seed is None:
+            raise ValueError(f'Érvénytelen kezdő URL: {seed}')
+        self.max_depth = max_depth
+        self.max_pages = max_pages
+        self.respect_robots = respect_robots
+        self.allowed_hosts = set(allowed_hosts or ()) | {urllib.parse.urlsplit(self.seed).netloc}
+        modules = [name for name in (modules or MODULE_NAMES) if name != 'seo_fundamentals']
+        # A linkek kinyeréséhez az anchor elemek kellenek a dokumentumba
+        if 'links' not in modules:
+            modules.append('links')
+        self.batch = BatchEngine(modules=modules, **batch_options)
+        self.frontier = deque()
+        self.seen = set()
+        self.site_checks = {}
+        self._host_tasks = {}
+        self.stats = {
+            'discovered': 0,
+            'queued': 0,
+            'analyzed': 0,
+            'failed': 0,
+            'robots_blocked': 0,
+            'skipped_limit': 0,
+            'in_flight': 0,
+        }
+        self.started = None
+        self.finished = None
+
+    def progress(self):
+        """Számlálók pillanatképe (más szálból is hívható) oldal/másodperc sebességgel"""
+        data = dict(self.stats)
+        data['frontier'] = len(self.frontier)
+        elapsed = ((self.finished or time.monotonic()) - self.started) if self.started else 0.0
+        data['elapsed'] = round(elapsed, 2)
+        done = data['analyzed'] + data['failed']
+        data['pages_per_second'] = round(done / elapsed, 1) if elapsed > 0 else 0.0
+        return data
+
+    def _enqueue(self, url, depth):
+        if url in self.seen or urllib.parse.urlsplit(url).netloc not in self.allowed_hosts:
+            return
+        self.seen.add(url)
+        self.stats['discovered'] += 1
+        # A robots.txt által tiltott oldalak nem számítanak bele a keretbe
+        if self.stats['queued'] - self.stats['robots_blocked'] >= self.max_pages:
+            self.stats['skipped_limit'] += 1
+            return
+        self.frontier.append((url, depth))
+        self.stats['queued'] += 1
+
+    def _check_host(self, url):
+        """A host robots.txt és sitemap ellenőrzésének indítása az első oldalánál"""
+        parts = urllib.parse.urlsplit(url)
+        origin = f'{parts.scheme}://{parts.netloc}'
+        if origin not in self._host_tasks:
+            self._host_tasks[origin] = asyncio.ensure_future(self._run_host_checks(origin))
+
+    async def _run_host_checks(self, origin):
+        probes = await self.batch.engine.site_checks(origin)
+        self.site_checks[origin] = {'robots_txt': probes.robots_txt(), 'sitemap': probes.sitemap()}
+
+    async def _visit(self, url, depth):
+        """Egy oldal: robots.txt ellenőrzés, letöltés, elemzés; tiltott oldalnál None"""
+        self._check_host(url)
+        self.stats['in_flight'] += 1
+        try:
+            # A robots.txt hostonként egyszer töltődik le, a motor session-jével
+            if self.respect_robots and not await self.batch.engine.can_fetch(url):
+                self.stats['robots_blocked'] += 1
+                return None
+            url, success, result, links = await self.batch.analyze_with_links(url)
+            self.stats['analyzed' if success else 'failed'] += 1
+            return url, depth, success, result, links
+        finally:
+            self.stats['in_flight'] -= 1
+
+    async def crawl(self):
+        """(url, mélység, siker, AnalysisResult vagy hibaüzenet) négyesek a befejezés sorrendjében"""
+        self.started = time.monotonic()
+        self.finished = None
+        self._enqueue(self.seed, 0)
+        running = set()
+        try:
+            async with self.batch:
+                limit = self.batch.engine.concurrency + self.batch.max_pending
+                try:
+                    while self.frontier or running:
+                        while self.frontier and len(running) < limit:
+                            running.add(asyncio.ensure_future(self._visit(*self.frontier.popleft())))
+                        done, running = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                        for task in done:
+                            outcome = task.result()
+                            if outcome is None:
+                                continue
+                            url, depth, success, result, links = outcome
+                            if depth == 0 and success and result.fetch:
+                                # Átirányított kezdő URL (pl. www. előtag): a cél host is belsőnek számít
+                                final_url = normalize_url(result.fetch.get('final_url') or url)
+                                if final_url is not None:
+                                    self.allowed_hosts.add(urllib.parse.urlsplit(final_url).netloc)
+                            if depth < self.max_depth:
+                                for link in links:
+                                    self._enqueue(link, depth + 1)
+                            yield url, depth, success, result
+                    await asyncio.gather(*self._host_tasks.values())
+                finally:
+                    # Megszakításnál a folyamatban lévő oldalak a motor lezárása előtt állnak le
+                    pending = [task for task in list(running) + list(self._host_tasks.values()) if not task.done()]
+                    for task in pending:
+                        task.cancel()
+                    if pending:
+                        await asyncio.gather(*pending, return_exceptions=True)
+        finally:
+            self.finished = time.monotonic()
+
+    def run(self, deadline=None):
+        """Szinkron bejárás generátorként (háttérszálon futó eseményhurokkal); a progress() közben is hívható"""
+        return iterate_in_thread(self.crawl(), deadline)
+
+
+def crawl_site(seed, deadline=None, **options):
+    """Egyszerű belépési pont: SiteCrawler(seed, **options).run(deadline)"""
+    return SiteCrawler(seed, **options).run(deadline)
@@ -0,0 +1,211 @@
+import gzip
+import io
+import queue
+import threading
+import time
+import zlib
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from lxml import etree
+
+from http_client import get_http_client
+
+GZIP_MAGIC = b'\x1f\x8b'
+
+SitemapEntry = namedtuple('SitemapEntry', ['loc', 'lastmod', 'priority', 'changefreq', 'sitemap'])
+
+_DONE = object()
+
+
+def _local_name(tag):
+    return tag.rsplit('}', 1)[-1] if isinstance(tag, str) else ''
+
+
+class _CountingReader(io.RawIOBase):
+    """Olvasott bájtok számlálása és felső korlát érvényesítése"""
+
+    def __init__(self, source, max_bytes):
+        self.source = source
+        self.max_bytes = max_bytes
+        self.bytes_read = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        data = self.source.read(len(buffer))
+        self.bytes_read += len(data)
+        if self.bytes_read > self.max_bytes:
+            raise ValueError(f'A sitemap meghaladta a {self.max_bytes} bájtos keretet')
+        buffer[:len(data)] = data
+        return len(data)
+
+
+def open_sitemap_stream(raw, max_bytes):
+    """Bájtfolyam előkészítése: .xml.gz esetén menet közbeni kitömörítés"""
+    # Az urllib3 a folyam végén magától lezárna, ami a pufferelt olvasónál hibát okoz
+    if hasattr(raw, 'auto_close'):
+        raw.auto_close = False
+    buffered = io.BufferedReader(raw, buffer_size=64 * 1024)
+    if buffered.peek(2)[:2] == GZIP_MAGIC:
+        return io.BufferedReader(_CountingReader(gzip.GzipFile(fileobj=buffered), max_bytes))
+    return io.BufferedReader(_CountingReader(buffered, max_bytes))
+
+
+def iter_sitemap_elements(stream, source_url=''):
+    """Sitemap XML inkrementális feldolgozása
+
+    ('url', SitemapEntry) és ('sitemap', loc) párokat ad vissza; a feldolgozott
+    elemek azonnal törlődnek, így a memóriahasználat a fájl méretétől független.
+    """
+    for _, element in etree.iterparse(stream, events=('end',), no_network=True, load_dtd=False,
+                                      remove_comments=True, recover=True):
+        name = _local_name(element.tag)
+        if name not in ('url', 'sitemap'):
+            continue
+        fields = {}
+        for child in element:
+            child_name = _local_name(child.tag)
+            if child_name in ('loc', 'lastmod', 'priority', 'changefreq') and child.text:
+                fields[child_name] = child.text.strip()
+        loc = fields.get('loc')
+        if loc:
+            if name == 'url':
+                priority = fields.get('priority')
+                try:
+                    priority = float(priority) if priority is not None else None
+                except ValueError:
+                    priority = None
+                yield 'url', SitemapEntry(loc, fields.get('lastmod'), priority, fields.get('changefreq'), source_url)
+            else:
+                yield 'sitemap', loc
+        # Feldolgozott elemek felszabadítása
+        element.clear()
+        parent = element.getparent()
+        if parent is not None:
+            while element.getprevious() is not None:
+                del parent[0]
+
+
+def sniff_sitemap_type(content):
+    """Gyökérelem meghatározása a letöltés elejéből ('urlset', 'sitemapindex' vagy None)"""
+    if not content:
+        return None
+    if content[:2] == GZIP_MAGIC:
+        try:
+            content = zlib.decompressobj(31).decompress(content, 64 * 1024)
+        except zlib.error:
+            return None
+    try:
+        parser = etree.XMLPullParser(events=('start',), no_network=True, load_dtd=False, recover=True)
+        parser.feed(content[:64 * 1024])
+        for _, element in parser.read_events():
+            name = _local_name(element.tag)
+            return name if name in ('urlset', 'sitemapindex') else None
+    except etree.LxmlError:
+        return None
+    return None
+
+
+class SitemapCrawler:
+    """Sitemap indexek rekurzív bejárása párhuzamos gyermek letöltésekkel, korlátos memóriával"""
+
+    def __init__(self, http_client=None, max_workers=8, max_depth=5, max_sitemaps=50000,
+                 queue_size=10000, timeout=20, max_bytes=200 * 1024 * 1024):
+        self.http = http_client or get_http_client()
+        self.max_workers = max_workers
+        self.max_depth = max_depth
+        self.max_sitemaps = max_sitemaps
+        self.queue_size = queue_size
+        self.timeout = timeout
+        self.max_bytes = max_bytes
+        self.errors = []
+        self.sitemaps_processed = 0
+
+    def iter_urls(self, sitemap_url):
+        """URL bejegyzések generátora (SitemapEntry), a gyermek sitemapek párhuzamos feldolgozásával
+
+        A gyermek sitemapek hibái a self.errors listába kerülnek, a gyökér sitemap
+        hibája a bejárás végén (a már feldolgozott bejegyzések után) kivételként jelenik meg.
+        """
+        results = queue.Queue(maxsize=self.queue_size)
+        stop = threading.Event()
+        lock = threading.Lock()
+        seen = {sitemap_url}
+        pending = [1]
+        root_error = []
+
+        executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='seo-sitemap')
+
+        def emit(item):
+            # Visszanyomás: telített sornál a feldolgozó vár a fogyasztóra
+            while not stop.is_set():
+                try:
+                    results.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def finish():
+            with lock:
+                pending[0] -= 1
+                done = pending[0] == 0
+            if done:
+                emit(_DONE)
+
+        def schedule(child_url, depth):
+            with lock:
+                if child_url in seen or len(seen) >= self.max_sitemaps or depth > self.max_depth:
+                    return
+                seen.add(child_url)
+                pending[0] += 1
+            executor.submit(process, child_url, depth)
+
+        def process(url, depth):
+            try:
+                for kind, item in self._stream(url):
+                    if stop.is_set():
+                        break
+                    if kind == 'url':
+                        if not emit(item):
+                            break
+                    else:
+                        schedule(item, depth + 1)
+                with lock:
+                    self.sitemaps_processed += 1
+            except Exception as e:
+                with lock:
+                    self.errors.append({'url': url, 'error': str(e)})
+                    if depth == 0:
+                        root_error.append(e)
+            finally:
+                finish()
+
+        executor.submit(process, sitemap_url, 0)
+        try:
+            while True:
+                item = results.get()
+                if item is _DONE:
+                    break
+                yield item
+        finally:
+            stop.set()
+            executor.shutdown(wait=False, cancel_futures=True)
+        if root_error:
+            raise root_error[0]
+
+    def _stream(self, url):
+        with self.http.host_slot(url, self.timeout) as observe:
+            started = time.perf_counter()
+            response = self.http.get(url, timeout=self.timeout, stream=True, allow_redirects=True)
+            observe(time.perf_counter() - started, response.status_code)
+            try:
+                if response.status_code != 200:
+                    raise ValueError(f'HTTP {response.status_code}')
+                response.raw.decode_content = True
+                stream = open_sitemap_stream(response.raw, self.max_bytes)
+                yield from iter_sitemap_elements(stream, url)
+            finally:
+                response.close()
@@ -0,0 +1,363 @@
+import codecs
+import re
+
+from lxml import etree
+
+from charset import (
+    DETECTION_PREFIX_BYTES, META_SNIFF_BYTES, detect_encoding, encoding_from_bom,
+    encoding_from_content_type, encoding_from_meta, normalize_encoding
+)
+from page_index import HEADING_LEVELS, PageIndex
+from parser_backends import (
+    ASCII_SPACES, HIDDEN_TEXT_TAGS, PRESERVE_WHITESPACE_TAGS, STRING_CONTAINERS, element_attributes, join_strings
+)
+
+# Csak ezekből az elemekből lesz rekord (plusz minden itemscope-os elemből)
+RECORDED_TAGS = frozenset((
+    'html', 'head', 'title', 'meta', 'link', 'script', 'style', 'a', 'img', 'p', 'nav',
+    'form', 'input', 'textarea', 'select', 'label'
+) + tuple(HEADING_LEVELS))
+# Ezeknek az elemeknek a szövegét olvassák az elemzők
+TEXT_TAGS = frozenset(('title', 'a', 'p', 'script', 'style') + tuple(HEADING_LEVELS))
+# Ezekben az elemekben keresnek az elemzők (head scriptjei, űrlap mezői és címkéi)
+DESCENDANT_TAGS = frozenset(('head', 'form'))
+
+# A <html> előtti árva záró tagek után az lxml eseményalapú parsere nem ad több eseményt
+_LEADING_MARKUP_RE = re.compile(r'\A(?:\s+|<!--.*?-->|<![^>]*>|<\?[^>]*>|</[^>]*>)*', re.S)
+_END_TAG_RE = re.compile(r'</[^>]*>')
+# A darabhatáron visszatartott szöveg felső korlátja (karakter): afölött a maradék
+# szövegként megy tovább, így egy '>' nélküli hosszú szakasz sem okoz négyzetes költséget
+MAX_HELD_CHARS = 8 * 1024
+
+
+def strip_leading_end_tags(text):
+    """Árva záró tagek eltávolítása a dokumentum elejéről (a fa alapú parserek ezeket úgyis eldobják)"""
+    leading = _LEADING_MARKUP_RE.match(text).group()
+    if '</' not in leading:
+        return text
+    return _END_TAG_RE.sub('', leading) + text[len(leading):]
+
+
+# A libxml2 push parser a nem UTF-8 <meta charset> után a következő darabokat újradekódolná,
+# ezért ezek az attribútumok álnéven mennek át rajta, és a rekordban visszakapják a nevüket
+HIDDEN_ATTRIBUTE_PREFIX = 'data-stream-hidden-'
+_META_TAG_RE = re.compile(r'<meta\b[^>]*>', re.I)
+_META_CHARSET_RE = re.compile(r'charset\s*=\s*["\']?\s*([a-zA-Z0-9_:.\-]+)', re.I)
+_ATTRIBUTE_RE = re.compile(r'([\s/]+)([^\s"\'>/=]+)(\s*=\s*(?:"[^"]*"|\'[^\']*\'|[^\s"\'>]*))?')
+_ENCODING_ATTRIBUTES = frozenset(('charset', 'http-equiv'))
+
+
+def _hide_attribute(match):
+    separator, name, value = match.group(1), match.group(2), match.group(3) or ''
+    if name.lower() in _ENCODING_ATTRIBUTES:
+        name = HIDDEN_ATTRIBUTE_PREFIX + name
+    return separator + name + value
+
+
+def _hide_encoding_declaration(match):
+    tag = match.group()
+    declared = _META_CHARSET_RE.search(tag)
+    if declared is None or normalize_encoding(declared.group(1)) == 'utf-8':
+        return tag
+    return tag[:5] + _ATTRIBUTE_RE.sub(_hide_attribute, tag[5:])
+
+
+def _restore_attributes(attrib):
+    prefix_length = len(HIDDEN_ATTRIBUTE_PREFIX)
+    return {
+        key[prefix_length:] if key.startswith(HIDDEN_ATTRIBUTE_PREFIX) else key: value
+        for key, value in attrib.items()
+    }
+
+
+def _is_valid_utf8(content, final):
+    try:
+        codecs.getincrementaldecoder('utf-8')().decode(content, final)
+    except UnicodeDecodeError:
+        return False
+    return True
+
+
+class StreamElement:
+    """Elem rekord DOM nélkül: név, attribútumok és csak az elemzők által olvasott adatok"""
+
+    __slots__ = ('name', 'attrs', 'strings', 'descendants', 'children', 'text_child')
+
+    def __init__(self, name, attrs):
+        self.name = name
+        self.attrs = attrs
+        self.strings = [] if name in TEXT_TAGS else None
+        self.descendants = [] if name in DESCENDANT_TAGS else None
+        self.children = 0
+        self.text_child = None
+
+    def __bool__(self):
+        return True
+
+    def __getitem__(self, key):
+        return self.attrs[key]
+
+    def get(self, key, default=None):
+        return self.attrs.get(key, default)
+
+    def has_attr(self, key):
+        return key in self.attrs
+
+    def get_text(self, separator='', strip=False):
+        if self.strings is None:
+            raise ValueError(f"A(z) <{self.name}> elem szövegét a streaming kinyerés nem gyűjti")
+        return join_strings(self.strings, separator, strip)
+
+    @property
+    def string(self):
+        """Az egyetlen szöveges gyermek (None, ha több gyermek vagy nem szöveg van)"""
+        return self.text_child if self.children == 1 else None
+
+    def find_all(self, name):
+        if self.descendants is None:
+            raise ValueError(f"A(z) <{self.name}> elem leszármazottait a streaming kinyerés nem gyűjti")
+        names = {name} if isinstance(name, str) else set(name)
+        return [element for element in self.descendants if element.name in names]
+
+    def find(self, name, attrs=None):
+        for element in self.find_all(name):
+            if all(element.get(key) == value for key, value in (attrs or {}).items()):
+                return element
+        return None
+
+    def __repr__(self):
+        return f'<StreamElement {self.name}>'
+
+
+class StreamDocument:
+    """A soup helyén álló eredmény: a látható szöveg darabjai és az elemindex"""
+
+    def __init__(self):
+        self.strings = []
+        # A noscript elemeken belüli szövegdarabok sorszámai (a get_text() tartalmazza őket)
+        self.hidden = set()
+        self.index = PageIndex(self, ())
+        self.encoding = None
+        self.encoding_source = None
+
+    def get_text(self, separator='', strip=False):
+        return join_strings(self.strings, separator, strip)
+
+    def visible_strings(self):
+        """Látható szövegdarabok (script/style/noscript/template nélkül)"""
+        hidden = self.hidden
+        return (string for position, string in enumerate(self.strings) if position not in hidden)
+
+
+class _EventHandler:
+    """lxml parser target: a HTML eseményekből közvetlenül tölti a dokumentumot
+
+    A szövegkezelés a BeautifulSoup szabályait követi: a szövegdarabok a következő
+    tagig / kommentig összefűződnek, a csak whitespace-ből állók pre/textarea-n kívül
+    összeesnek, és a script/style/template/rt/rp tartalma csak a saját elemé.
+    """
+
+    def __init__(self, document):
+        self.document = document
+        self.index = document.index
+        # (név, rekord vagy None, legbelső tartalmazó, pre-n belül, rejtett elemen belül)
+        self.stack = []
+        # (rekord, elvárt tartalmazó) a nyitott, szöveget gyűjtő rekordokhoz
+        self.collectors = []
+        # Nyitott head / form rekordok, amelyek a leszármazottaikat gyűjtik
+        self.owners = []
+        self.pending = []
+
+    def _flush(self):
+        if not self.pending:
+            return
+        text = ''.join(self.pending)
+        self.pending = []
+        if self.stack:
+            _, _, container, preserve, hidden = self.stack[-1]
+        else:
+            container, preserve, hidden = None, False, False
+        if not preserve and not text.strip(ASCII_SPACES):
+            text = '\n' if '\n' in text else ' '
+        if container is None:
+            if hidden:
+                self.document.hidden.add(len(self.document.strings))
+            self.document.strings.append(text)
+        for record, wanted in self.collectors:
+            if wanted == container:
+                record.strings.append(text)
+        self._add_child(text)
+
+    def _add_child(self, text=None):
+        if self.stack:
+            parent = self.stack[-1][1]
+            if parent is not None:
+                parent.children += 1
+                parent.text_child = text
+
+    def start(self, tag, attrib):
+        self._flush()
+        self._add_child()
+        if self.stack:
+            _, _, container, preserve, hidden = self.stack[-1]
+        else:
+            container, preserve, hidden = None, False, False
+        if tag in STRING_CONTAINERS:
+            container = tag
+        preserve = preserve or tag in PRESERVE_WHITESPACE_TAGS
+        hidden = hidden or tag in HIDDEN_TEXT_TAGS
+
+        record = None
+        if tag == 'meta' and any(key.startswith(HIDDEN_ATTRIBUTE_PREFIX) for key in attrib):
+            attrib = _restore_attributes(attrib)
+        if tag in RECORDED_TAGS or 'itemscope' in attrib:
+            record = StreamElement(tag, element_attributes(tag, attrib))
+            for owner in self.owners:
+                owner.descendants.append(record)
+            self.index.add(record)
+            if record.strings is not None:
+                self.collectors.append((record, tag if tag in STRING_CONTAINERS else None))
+            if record.descendants is not None:
+                self.owners.append(record)
+        elif 'class' in attrib:
+            self.index.class_names.update(attrib['class'].split())
+        self.stack.append((tag, record, container, preserve, hidden))
+
+    def end(self, tag):
+        self._flush()
+        # A BeautifulSoup-hoz hasonlóan a legutóbbi azonos nevű nyitott elemig zár
+        for position in range(len(self.stack) - 1, -1, -1):
+            if self.stack[position][0] == tag:
+                break
+        else:
+            return
+        while len(self.stack) > position:
+            record = self.stack.pop()[1]
+            if record is None:
+                continue
+            if record.strings is not None:
+                self.collectors.pop()
+            if record.descendants is not None:
+                self.owners.pop()
+
+    def data(self, content):
+        self.pending.append(content)
+
+    def comment(self, text):
+        self._flush()
+        self._add_child()
+
+    def doctype(self, *args):
+        self._flush()
+        self._add_child()
+
+    def pi(self, target, data=None):
+        self._flush()
+        self._add_child()
+
+    def close(self):
+        self._flush()
+        return self.document
+
+
+class StreamingExtractor:
+    """Fa nélküli, inkrementális kinyerés: feed() bájt- vagy szövegdarabokkal, close() a dokumentummal
+
+    DOM nem készül: csak a rekordok (title, meta, link, címsorok, képek, linkek,
+    scriptek, űrlapok, itemscope-os elemek), a class nevek és a látható szöveg
+    marad meg. Bájtoknál a kódolás a decode_html sorrendjét követi; a felismeréshez
+    legfeljebb az oldal eleje (64 KB) pufferelődik, utána minden darab azonnal a
+    parserbe megy (a darabhatáron kettévágott tag legfeljebb MAX_HELD_CHARS
+    karakterig tartódik vissza).
+    """
+
+    def __init__(self, content_type=None, encoding=None):
+        self.content_type = content_type
+        self.document = StreamDocument()
+        self._handler = _EventHandler(self.document)
+        # A parser a már dekódolt szöveget kapja vissza UTF-8 bájtokként
+        self._parser = etree.HTMLParser(target=self._handler, recover=True, encoding='utf-8')
+        self._decoder = None
+        self._prefix = []
+        self._started = False
+        self._held = ''
+        if encoding:
+            self._set_encoding(encoding, 'preset')
+
+    def _set_encoding(self, encoding, source):
+        self._decoder = codecs.getincrementaldecoder(encoding)('replace')
+        self.document.encoding = encoding
+        self.document.encoding_source = source
+
+    def _resolve_encoding(self, final):
+        """Kódolás kiválasztása a pufferelt elejéből; False, ha még több bájt kell"""
+        content = b''.join(self._prefix)
+        if not final and len(content) < 4:
+            return False
+        encoding, bom_length = encoding_from_bom(content)
+        source = 'bom'
+        if not encoding:
+            encoding, source = encoding_from_content_type(self.content_type), 'header'
+        if not encoding:
+            if not final and len(content) < META_SNIFF_BYTES:
+                return False
+            encoding, source = encoding_from_meta(content), 'meta'
+        if not encoding:
+            if not final and len(content) < DETECTION_PREFIX_BYTES:
+                return False
+            # A decode_html az egész oldalt ellenőrzi, itt csak az elejét
+            if _is_valid_utf8(content, final):
+                encoding, source = 'utf-8', 'utf-8'
+            else:
+                encoding, source = detect_encoding(content), 'detected'
+                if not encoding:
+                    encoding, source = normalize_encoding('windows-1252'), 'fallback'
+        self._set_encoding(encoding, source)
+        self._prefix = None
+        self._feed_text(self._decoder.decode(content[bom_length:], final), final)
+        return True
+
+    def _feed_text(self, text, final=False):
+        text = self._held + text
+        self._held = ''
+        # A libxml2 push parser elveszíti a darabhatáron kettévágott </script> / </style> tageket,
+        # ezért a lezáratlan utolsó tag a következő darabbal együtt megy tovább (legfeljebb MAX_HELD_CHARS)
+        cut = text.find('<', text.rfind('>') + 1)
+        if not final and cut >= 0 and len(text) - cut <= MAX_HELD_CHARS:
+            self._held = text[cut:]
+            text = text[:cut]
+        if not text:
+            return
+        if not self._started:
+            # A dokumentum eleje (whitespace, doctype, kommentek, záró tagek) egyben kerül tisztításra
+            rest = text[_LEADING_MARKUP_RE.match(text).end():][:2]
+            if not final and len(text) <= MAX_HELD_CHARS and (len(rest) < 2 or rest[0] == '<' and rest[1] in '!/?'):
+                self._held = text + self._held
+                return
+            text = strip_leading_end_tags(text)
+            self._started = True
+        self._parser.feed(_META_TAG_RE.sub(_hide_encoding_declaration, text).encode('utf-8', 'surrogatepass'))
+
+    def feed(self, data):
+        """Következő darab (bytes a hálózatról vagy már dekódolt str)"""
+        if isinstance(data, str):
+            self._feed_text(data)
+        elif self._decoder is not None:
+            self._feed_text(self._decoder.decode(data))
+        else:
+            self._prefix.append(data)
+            self._resolve_encoding(final=False)
+
+    def close(self):
+        """Bemenet vége: a kinyert dokumentum (StreamDocument)"""
+        if self._prefix:
+            self._resolve_encoding(final=True)
+        elif self._decoder is not None:
+            self._feed_text(self._decoder.decode(b'', True), final=True)
+        else:
+            self._feed_text('', final=True)
+        try:
+            return self._parser.close()
+        except etree.XMLSyntaxError:
+            # Üres bemenet: üres dokumentum, mint a fa alapú backendeknél
+            return self._handler.close()
@@ -0,0 +1,83 @@
+import json
+
+
+def entity_types(entity):
+    """Az entitás @type értékei listaként (szöveg vagy lista is lehet)"""
+    value = entity.get('@type')
+    if isinstance(value, str):
+        return [value]
+    if isinstance(value, list):
+        return [item for item in value if isinstance(item, str)]
+    return []
+
+
+class StructuredData:
+    """Az oldal JSON-LD blokkjai egyszer feldolgozva, típus szerinti entitásindexszel
+
+    A @graph tömbök és a beágyazott entitások (pl. Product -> offers -> Offer)
+    kilapítva kerülnek az indexbe, dokumentum sorrendben. A legfelső szintű
+    entitások (a blokk gyökere, tömbjének elemei és @graph tagjai) külön is
+    elérhetők.
+    """
+
+    def __init__(self, scripts):
+        self.blocks = []
+        self.top_level = []
+        self.entities = []
+        self.by_type = {}
+        for script in scripts:
+            # Üres script nem számít blokknak
+            if not script.string:
+                continue
+            try:
+                data = json.loads(script.string.strip())
+            except json.JSONDecodeError as e:
+                self.blocks.append({'valid': False, 'error': str(e)})
+                continue
+            self.blocks.append({'valid': True, 'data': data})
+            self._collect_top_level(data)
+            self._collect_entities(data)
+
+    def _collect_top_level(self, data):
+        pending = [data]
+        while pending:
+            node = pending.pop()
+            if isinstance(node, list):
+                pending.extend(reversed(node))
+            elif isinstance(node, dict):
+                if '@type' in node:
+                    self.top_level.append(node)
+                graph = node.get('@graph')
+                if isinstance(graph, (list, dict)):
+                    pending.append(graph)
+
+    def _collect_entities(self, data):
+        # Bejárás veremmel: a több ezer termékes katalógusok sem futnak rekurziós korlátba
+        pending = [data]
+        while pending:
+            node = pending.pop()
+            if isinstance(node, list):
+                pending.extend(reversed(node))
+            elif isinstance(node, dict):
+                types = entity_types(node)
+                if types:
+                    self.entities.append(node)
+                    for schema_type in dict.fromkeys(types):
+                        self.by_type.setdefault(schema_type, []).append(node)
+                pending.extend(value for value in reversed(list(node.values())) if isinstance(value, (list, dict)))
+
+    @property
+    def valid_count(self):
+        return sum(1 for block in self.blocks if block['valid'])
+
+    def top_level_types(self):
+        """A legfelső szintű entitások típusai, első előfordulás szerint"""
+        return list(dict.fromkeys(schema_type for entity in self.top_level for schema_type in entity_types(entity)))
+
+    def of_type(self, schema_type):
+        """Adott típusú entitások (beágyazottak is)"""
+        return self.by_type.get(schema_type, [])
+
+    def has_type_containing(self, *fragments):
+        """Van-e olyan entitás, amelynek típusneve tartalmazza valamelyik részletet (pl. LocalBusiness)"""
+        return any(fragment in schema_type for schema_type in self.by_type for fragment in fragments)
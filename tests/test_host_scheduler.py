@@ -0,0 +1,181 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from async_engine import AsyncSEOEngine
+from host_scheduler import HostScheduler, HostSlotTimeout, parse_retry_after
+
+URL = 'http://ex.test/oldal'
+HOST = 'http://ex.test'
+
+
+def robots_fetcher(text, status_code=200):
+    calls = []
+
+    def fetch(url):
+        calls.append(url)
+        return status_code, text
+
+    fetch.calls = calls
+    return fetch
+
+
+def test_acquire_release_limit():
+    scheduler = HostScheduler(initial_limit=2)
+    scheduler.acquire(URL)
+    scheduler.acquire(URL)
+    assert scheduler.try_acquire(URL) > 0
+    with pytest.raises(HostSlotTimeout):
+        scheduler.acquire(URL, timeout=0.05)
+    scheduler.release(URL)
+    assert scheduler.try_acquire(URL) == 0
+    assert scheduler.snapshot()[HOST]['in_flight'] == 2
+    # Más host foglalása független
+    assert scheduler.try_acquire('http://masik.test/') == 0
+
+
+def test_release_wakes_waiter():
+    scheduler = HostScheduler(initial_limit=1)
+    scheduler.acquire(URL)
+    acquired = threading.Event()
+
+    def waiter():
+        scheduler.acquire(URL, timeout=5)
+        acquired.set()
+
+    thread = threading.Thread(target=waiter)
+    thread.start()
+    assert not acquired.wait(0.1)
+    scheduler.release(URL, latency=0.01, status_code=200)
+    assert acquired.wait(2)
+    thread.join()
+
+
+def test_priority_bypasses_limit_and_crawl_delay():
+    scheduler = HostScheduler(robots_fetcher=robots_fetcher('User-agent: *\nCrawl-delay: 5\n'), initial_limit=1)
+    scheduler.acquire(URL)
+    assert scheduler.try_acquire(URL) > 0
+    started = time.monotonic()
+    scheduler.acquire(URL, timeout=0.05, priority=True)
+    assert scheduler.try_acquire(URL, priority=True) == 0
+    assert time.monotonic() - started < 0.05
+    snapshot = scheduler.snapshot()[HOST]
+    assert snapshot['in_flight'] == 3
+    assert snapshot['requests'] == 3
+
+
+def test_crawl_delay_from_robots():
+    fetcher = robots_fetcher('User-agent: *\nCrawl-delay: 2\nDisallow: /tilos\n')
+    scheduler = HostScheduler(robots_fetcher=fetcher, initial_limit=4)
+    scheduler.acquire(URL)
+    scheduler.release(URL, latency=0.01, status_code=200)
+    wait = scheduler.try_acquire(URL)
+    assert 1.5 < wait <= 2
+    assert scheduler.snapshot()[HOST]['crawl_delay'] == 2.0
+    assert not scheduler.can_fetch(f'{HOST}/tilos/oldal')
+    assert scheduler.can_fetch(URL)
+    # A robots.txt hostonként egyszer töltődik le
+    assert fetcher.calls == [f'{HOST}/robots.txt']
+
+
+def test_crawl_delay_ignored_when_disabled():
+    scheduler = HostScheduler(robots_fetcher=robots_fetcher('User-agent: *\nCrawl-delay: 2\n'),
+                              respect_crawl_delay=False)
+    scheduler.acquire(URL)
+    scheduler.release(URL, latency=0.01, status_code=200)
+    assert scheduler.try_acquire(URL) == 0
+
+
+def test_aimd_additive_increase():
+    scheduler = HostScheduler(initial_limit=2, max_limit=3)
+    for _ in range(20):
+        scheduler.acquire(URL)
+        scheduler.release(URL, latency=0.01, status_code=200)
+    assert scheduler.snapshot()[HOST]['limit'] == 3
+
+
+def test_aimd_decrease_on_throttle():
+    scheduler = HostScheduler(initial_limit=8)
+    scheduler.acquire(URL)
+    scheduler.release(URL, latency=0.01, status_code=429, retry_after=0.2)
+    snapshot = scheduler.snapshot()[HOST]
+    assert snapshot['limit'] == 4
+    assert snapshot['throttled'] == 1
+    # Retry-After alatt nincs új indítás
+    assert scheduler.try_acquire(URL) > 0
+    # Egy válaszidőn belül nincs újabb csökkentés
+    scheduler.release(URL, latency=0.01, status_code=503)
+    assert scheduler.snapshot()[HOST]['limit'] == 4
+    # A túlterhelési pont felett a limit nem nő vissza
+    time.sleep(0.2)
+    for _ in range(50):
+        scheduler.acquire(URL)
+        scheduler.release(URL, latency=0.01, status_code=200)
+    assert scheduler.snapshot()[HOST]['limit'] < 8
+
+
+def test_aimd_decrease_on_latency_and_error():
+    scheduler = HostScheduler(initial_limit=8, latency_floor=0.01)
+    scheduler.acquire(URL)
+    scheduler.release(URL, latency=0.01, status_code=200)
+    limit = scheduler.snapshot()[HOST]['limit']
+    time.sleep(0.02)
+    scheduler.acquire(URL)
+    scheduler.release(URL, latency=1.0, status_code=200)
+    assert scheduler.snapshot()[HOST]['limit'] == pytest.approx(limit * 0.5, abs=0.01)
+    # A következő csökkentés legkorábban egy (átlagos) válaszidő múlva
+    time.sleep(0.25)
+    with pytest.raises(RuntimeError):
+        with scheduler.slot(URL):
+            raise RuntimeError('kapcsolódási hiba')
+    snapshot = scheduler.snapshot()[HOST]
+    assert snapshot['errors'] == 1
+    assert snapshot['limit'] == pytest.approx(limit * 0.25, abs=0.01)
+    assert snapshot['in_flight'] == 0
+
+
+def test_release_without_observation_keeps_limit():
+    scheduler = HostScheduler(initial_limit=4)
+    scheduler.acquire(URL)
+    scheduler.release(URL)
+    snapshot = scheduler.snapshot()[HOST]
+    assert snapshot['limit'] == 4
+    assert snapshot['in_flight'] == 0
+
+
+def test_parse_retry_after():
+    assert parse_retry_after('7') == 7.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after('nem szám') is None
+
+
+def test_async_engine_queueing_not_capped_by_request_timeout():
+    engine = AsyncSEOEngine(timeout=0.05, politeness=True)
+    engine.scheduler.load_robots(URL, 200, 'User-agent: *\nCrawl-delay: 1\n')
+
+    async def run():
+        await engine._acquire_slot(URL)
+        # A következő foglalás a crawl-delay miatt a kérés időkorlátjánál tovább vár, de nem hiúsul meg
+        await engine._acquire_slot(URL)
+        # A soron kívüli foglalás nem vár
+        started = time.monotonic()
+        await engine._acquire_slot(URL, priority=True)
+        return time.monotonic() - started
+
+    assert asyncio.run(run()) < 0.05
+    assert engine.scheduler.snapshot()[HOST]['in_flight'] == 3
+
+
+def test_async_engine_slot_timeout():
+    engine = AsyncSEOEngine(politeness=True, slot_timeout=0.05)
+    engine.scheduler.load_robots(URL, 200, 'User-agent: *\nCrawl-delay: 5\n')
+
+    async def run():
+        await engine._acquire_slot(URL)
+        await engine._acquire_slot(URL)
+
+    with pytest.raises(HostSlotTimeout):
+        asyncio.run(run())
+    assert 'host ütemező' in engine.error_message(HostSlotTimeout('x'))
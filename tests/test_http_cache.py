@@ -0,0 +1,96 @@
+import json
+import os
+
+import pytest
+
+from http_cache import DiskHTTPCache
+from http_client import PooledHTTPClient
+
+BODY = '<html><head><title>Tárolt oldal</title></head><body>tartalom</body></html>'.encode('utf-8')
+
+
+@pytest.fixture
+def client(tmp_path):
+    client = PooledHTTPClient(cache_dir=str(tmp_path / 'cache'))
+    yield client
+    client.close()
+
+
+def revalidating_route(etags):
+    # Az első válasz 200 ETag-gel, utána 304 (a fejlécnév kisbetűs, ahogy egyes szerverek küldik)
+    def route(handler):
+        if handler.headers.get('If-None-Match'):
+            return 304, {'etag': etags.pop(0), 'Cache-Control': 'max-age=0'}, b''
+        return 200, {'Content-Type': 'text/html; charset=utf-8', 'ETag': '"v1"', 'Cache-Control': 'max-age=0'}, BODY
+    return route
+
+
+def test_revalidation_200_then_304(client, local_site):
+    local_site.routes['/oldal'] = revalidating_route(['"v2"', '"v3"'])
+    url = local_site.url('/oldal')
+
+    first = client.fetch(url)
+    assert first.status_code == 200
+    assert first.cache_status == 'miss'
+
+    second = client.fetch(url)
+    assert second.status_code == 200
+    assert second.cache_status == 'revalidated'
+    assert second.content == BODY
+
+    third = client.fetch(url)
+    assert third.cache_status == 'revalidated'
+    validators = [headers.get('If-None-Match') for _, headers in local_site.requests]
+    # A 304 válasz validátora felülírja a tároltat, nem marad mellette a régi
+    assert validators == [None, '"v1"', '"v2"']
+    assert third.headers['ETag'] == '"v3"'
+
+
+def test_fresh_entry_served_without_request(client, local_site):
+    local_site.routes['/friss'] = (200, {'Content-Type': 'text/html', 'Cache-Control': 'max-age=600'}, BODY)
+    url = local_site.url('/friss')
+    client.fetch(url)
+    page = client.fetch(url)
+    assert page.cache_status == 'hit'
+    assert page.content == BODY
+    assert len(local_site.requests) == 1
+
+
+def test_no_store_not_cached(client, local_site):
+    local_site.routes['/privat'] = (200, {'Content-Type': 'text/html', 'Cache-Control': 'no-store'}, BODY)
+    client.fetch(local_site.url('/privat'))
+    assert client.cache.stats()['entries'] == 0
+
+
+def test_refresh_merges_headers_case_insensitively(tmp_path, local_site):
+    local_site.routes['/oldal'] = (200, {'Content-Type': 'text/html', 'ETag': '"v1"'}, BODY)
+    client = PooledHTTPClient(cache_dir=None)
+    page = client.fetch(local_site.url('/oldal'))
+    client.close()
+
+    cache = DiskHTTPCache(str(tmp_path / 'cache'))
+    cache.put('http://ex.test/', page)
+    entry = cache.get('http://ex.test/')
+    cache.refresh(entry, {'etag': '"v2"', 'last-modified': 'Wed, 01 May 2024 10:00:00 GMT'})
+
+    stored = cache.get('http://ex.test/')
+    assert len([name for name in stored.headers if name.lower() == 'etag']) == 1
+    assert stored.validators() == {'If-None-Match': '"v2"', 'If-Modified-Since': 'Wed, 01 May 2024 10:00:00 GMT'}
+    assert stored.read_body() == BODY
+    # Nem marad ideiglenes fájl
+    shard = os.path.dirname(cache._meta_path(entry.key))
+    assert sorted(os.listdir(shard)) == [entry.key + '.body', entry.key + '.json']
+    with open(cache._meta_path(entry.key), encoding='utf-8') as meta_file:
+        assert '"v1"' not in json.load(meta_file)['headers'].values()
+
+
+def test_lru_eviction(tmp_path, local_site):
+    for name in ('a', 'b', 'c'):
+        local_site.routes[f'/{name}'] = (200, {'Content-Type': 'text/html'}, BODY)
+    client = PooledHTTPClient(cache_dir=str(tmp_path / 'cache'), cache_max_bytes=len(BODY) * 2)
+    for name in ('a', 'b', 'c'):
+        client.fetch(local_site.url(f'/{name}'))
+    assert client.cache.get(local_site.url('/a')) is None
+    assert client.cache.get(local_site.url('/c')) is not None
+    assert client.cache.stats()['entries'] == 2
+    client.close()
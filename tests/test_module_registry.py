@@ -0,0 +1,92 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import module_registry
+from module_registry import AnalysisModule, ExecutionPlan, build_plan, run_plan
+
+
+class RecordingExecutor(ThreadPoolExecutor):
+    def __init__(self, workers):
+        super().__init__(max_workers=workers)
+        self.submitted = []
+
+    def submit(self, fn, *args, **kwargs):
+        self.submitted.append(getattr(fn, '__name__', repr(fn)))
+        return super().submit(fn, *args, **kwargs)
+
+
+class FakeAnalyzer:
+    def __init__(self, text_error=None):
+        self.text_ready = threading.Event()
+        self.text_error = text_error
+        self.text = None
+
+    def get_text_layer(self):
+        self.text_ready.wait(5)
+        if self.text_error:
+            raise self.text_error
+        self.text = 'szöveg'
+        return self.text
+
+    def get_structured_data(self):
+        return []
+
+    def analyze_title(self):
+        return 'cím'
+
+    def analyze_content_quality(self):
+        return f'tartalom: {self.text}'
+
+
+PLAN = ExecutionPlan([
+    AnalysisModule('content_quality', 'analyze_content_quality', 1.0, ('index', 'text'), 'text'),
+    AnalysisModule('title', 'analyze_title', 1.2, ('index',)),
+])
+
+
+@pytest.fixture
+def executor(monkeypatch):
+    executor = RecordingExecutor(1)
+    monkeypatch.setattr(module_registry, 'MODULE_EXECUTOR', executor)
+    yield executor
+    executor.shutdown(wait=True)
+
+
+def test_dependent_module_submitted_after_stage(executor):
+    analyzer = FakeAnalyzer()
+    results = {}
+    runner = threading.Thread(target=lambda: results.update(run_plan(PLAN, analyzer, parallel=True)))
+    runner.start()
+    runner.join(0.2)
+    # Amíg a szövegréteg készül, a rá épülő modul nem foglal szálat
+    assert executor.submitted == ['get_text_layer', 'run']
+    analyzer.text_ready.set()
+    runner.join(5)
+    assert list(results) == ['content_quality', 'title']
+    assert results['content_quality'] == 'tartalom: szöveg'
+    assert executor.submitted == ['get_text_layer', 'run', 'run']
+
+
+def test_stage_error_fails_dependent_module(executor):
+    analyzer = FakeAnalyzer(text_error=ValueError('hibás réteg'))
+    analyzer.text_ready.set()
+    with pytest.raises(ValueError, match='hibás réteg'):
+        run_plan(PLAN, analyzer, parallel=True)
+
+
+def test_parallel_matches_sequential(executor):
+    analyzer = FakeAnalyzer()
+    analyzer.text_ready.set()
+    sequential = FakeAnalyzer()
+    sequential.text_ready.set()
+    assert run_plan(PLAN, analyzer, parallel=True) == run_plan(PLAN, sequential, parallel=False)
+
+
+def test_build_plan():
+    plan = build_plan(['title', 'local_seo'])
+    assert [module.name for module in plan.modules] == ['title', 'local_seo']
+    assert plan.stages == ['response', 'index', 'text', 'structured_data']
+    with pytest.raises(ValueError, match='Ismeretlen modul'):
+        build_plan(['nincs'])
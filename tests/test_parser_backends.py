@@ -0,0 +1,26 @@
+import pytest
+
+from benchmarks.parser_benchmark import REFERENCE_BACKEND, differing_modules, generate_corpus, run_backend
+from parser_backends import available_parser_backends
+
+# Öt oldaltípus, a nagyobbak több 64 KB-os darabban mennek a stream backendbe
+CORPUS = generate_corpus(5, 12)
+
+
+@pytest.fixture(scope='module')
+def reference_results():
+    return run_backend(REFERENCE_BACKEND, CORPUS, 1)[1]
+
+
+def test_corpus_spans_several_stream_chunks():
+    assert max(len(html.encode('utf-8')) for _, html in CORPUS) > 64 * 1024
+
+
+@pytest.mark.parametrize('backend', [name for name in available_parser_backends() if name != REFERENCE_BACKEND])
+def test_backend_matches_reference(backend, reference_results):
+    results = run_backend(backend, CORPUS, 1)[1]
+    differences = {
+        url: differing_modules(reference, result)
+        for (url, _), reference, result in zip(CORPUS, reference_results, results) if reference != result
+    }
+    assert differences == {}
@@ -0,0 +1,97 @@
+import gzip
+import io
+
+import pytest
+
+from app import AdvancedSEOAnalyzer
+from http_client import PooledHTTPClient
+from sitemap_parser import SitemapCrawler, iter_sitemap_elements, open_sitemap_stream, sniff_sitemap_type
+
+XML = {'Content-Type': 'application/xml'}
+
+
+def urlset(locs):
+    entries = ''.join(f'<url><loc>{loc}</loc><lastmod>2024-05-01</lastmod><priority>0.5</priority></url>'
+                      for loc in locs)
+    return ('<?xml version="1.0" encoding="UTF-8"?>'
+            f'<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{entries}</urlset>').encode('utf-8')
+
+
+def sitemap_index(locs):
+    entries = ''.join(f'<sitemap><loc>{loc}</loc></sitemap>' for loc in locs)
+    return ('<?xml version="1.0" encoding="UTF-8"?>'
+            f'<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{entries}</sitemapindex>').encode('utf-8')
+
+
+@pytest.fixture
+def client():
+    client = PooledHTTPClient(cache_dir=None)
+    yield client
+    client.close()
+
+
+@pytest.fixture
+def sitemap_site(local_site):
+    pages = [local_site.url(f'/oldal-{number}') for number in range(6)]
+    local_site.routes.update({
+        '/sitemap_index.xml': (200, XML, sitemap_index([
+            local_site.url('/sitemap-a.xml.gz'),
+            local_site.url('/sitemap-b.xml'),
+            local_site.url('/hianyzo.xml'),
+        ])),
+        # .xml.gz fájl tömörített törzzsel, illetve Content-Encoding: gzip átvitellel
+        '/sitemap-a.xml.gz': (200, {'Content-Type': 'application/gzip'}, gzip.compress(urlset(pages[:3]))),
+        '/sitemap-b.xml': (200, dict(XML, **{'Content-Encoding': 'gzip'}), gzip.compress(urlset(pages[3:]))),
+    })
+    local_site.pages = pages
+    return local_site
+
+
+def test_index_with_gzip_children(client, sitemap_site):
+    crawler = SitemapCrawler(client, max_workers=2)
+    entries = list(crawler.iter_urls(sitemap_site.url('/sitemap_index.xml')))
+    assert sorted(entry.loc for entry in entries) == sorted(sitemap_site.pages)
+    assert {entry.lastmod for entry in entries} == {'2024-05-01'}
+    assert {entry.priority for entry in entries} == {0.5}
+    # A hiányzó gyermek sitemap nem szakítja meg a bejárást, a hibája elérhető
+    assert crawler.errors == [{'url': sitemap_site.url('/hianyzo.xml'), 'error': 'HTTP 404'}]
+    assert crawler.sitemaps_processed == 3
+
+
+def test_root_error_raises(client, local_site):
+    crawler = SitemapCrawler(client)
+    with pytest.raises(ValueError, match='HTTP 404'):
+        list(crawler.iter_urls(local_site.url('/nincs.xml')))
+    assert crawler.errors[0]['url'] == local_site.url('/nincs.xml')
+
+
+def test_max_bytes(client, local_site):
+    local_site.routes['/sitemap.xml'] = (200, XML, urlset([local_site.url(f'/{n}') for n in range(200)]))
+    crawler = SitemapCrawler(client, max_bytes=1024)
+    with pytest.raises(ValueError, match='bájtos keretet'):
+        list(crawler.iter_urls(local_site.url('/sitemap.xml')))
+
+
+def test_depth_limit(client, local_site):
+    local_site.routes['/sitemap_index.xml'] = (200, XML, sitemap_index([local_site.url('/melyebb.xml')]))
+    local_site.routes['/melyebb.xml'] = (200, XML, urlset([local_site.url('/oldal')]))
+    crawler = SitemapCrawler(client, max_depth=0)
+    assert list(crawler.iter_urls(local_site.url('/sitemap_index.xml'))) == []
+
+
+def test_analyzer_exposes_crawler(client, sitemap_site):
+    sitemap_site.routes['/'] = (200, {'Content-Type': 'text/html; charset=utf-8'}, b'<html><title>x</title></html>')
+    analyzer = AdvancedSEOAnalyzer(sitemap_site.url('/'), http_client=client)
+    urls = [entry.loc for entry in analyzer.iter_sitemap_urls(max_workers=2)]
+    assert sorted(urls) == sorted(sitemap_site.pages)
+    assert [error['url'] for error in analyzer.sitemap_crawler.errors] == [sitemap_site.url('/hianyzo.xml')]
+
+
+def test_stream_helpers():
+    content = urlset(['http://ex.test/a', 'http://ex.test/b'])
+    assert sniff_sitemap_type(content) == 'urlset'
+    assert sniff_sitemap_type(gzip.compress(sitemap_index(['http://ex.test/s.xml']))) == 'sitemapindex'
+    assert sniff_sitemap_type(b'<html></html>') is None
+    stream = open_sitemap_stream(io.BytesIO(gzip.compress(content)), 1024 * 1024)
+    assert [(kind, item.loc) for kind, item in iter_sitemap_elements(stream, 'forras')] == [
+        ('url', 'http://ex.test/a'), ('url', 'http://ex.test/b')]
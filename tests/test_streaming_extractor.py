@@ -0,0 +1,48 @@
+import time
+
+from streaming_extractor import MAX_HELD_CHARS, StreamingExtractor
+
+PAGE = (
+    '<!DOCTYPE html><html lang="hu"><head><meta charset="utf-8"><title>Stream teszt</title>'
+    '<script>var x = "<b>"; if (a < b) { x = 1; }</script></head>'
+    '<body><h1>Főcím</h1><p>Első bekezdés <a href="/egy">link</a></p>'
+    '<p>Második bekezdés</p></body></html>'
+)
+
+
+def extract(chunks):
+    extractor = StreamingExtractor(encoding='utf-8')
+    for chunk in chunks:
+        extractor.feed(chunk)
+    return extractor.close()
+
+
+def summary(document):
+    return (
+        [record.get_text() for record in document.index.all('title')],
+        [record.get('href') for record in document.index.all('a')],
+        [record.get_text() for record in document.index.headings(1)],
+        document.get_text(' ', strip=True),
+    )
+
+
+def test_chunk_boundaries_do_not_change_result():
+    data = PAGE.encode('utf-8')
+    whole = summary(extract([data]))
+    for size in (1, 3, 7, 64):
+        assert summary(extract([data[start:start + size] for start in range(0, len(data), size)])) == whole
+
+
+def test_unclosed_tag_remainder_is_capped():
+    # '<' után hosszú, '>' nélküli szöveg: a visszatartott maradék nem nő korlátlanul
+    body = '<html><body><p>a < b ' + 'szöveg ' * 200000 + '</p></body></html>'
+    data = body.encode('utf-8')
+    chunks = [data[start:start + 1024] for start in range(0, len(data), 1024)]
+    extractor = StreamingExtractor(encoding='utf-8')
+    started = time.perf_counter()
+    for chunk in chunks:
+        extractor.feed(chunk)
+        assert len(extractor._held) <= MAX_HELD_CHARS
+    document = extractor.close()
+    assert time.perf_counter() - started < 10
+    assert document.get_text().count('szöveg') == 200000
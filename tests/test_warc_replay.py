@@ -0,0 +1,140 @@
+import gzip
+import os
+
+import pytest
+
+from app import AdvancedSEOAnalyzer
+from warc_replay import WARCArchive, replay_archive
+
+BASE = 'http://ex.test'
+
+PAGE = (
+    '<!DOCTYPE html><html lang="hu"><head><meta charset="utf-8">'
+    '<title>Archivált teszt oldal címe</title>'
+    '<meta name="description" content="Archivált oldal a visszajátszás teszteléséhez.">'
+    '</head><body><h1>Főcím</h1><p>Szöveg <a href="/masik">másik oldal</a></p></body></html>'
+).encode('utf-8')
+
+SITEMAP_INDEX = (
+    '<?xml version="1.0" encoding="UTF-8"?>'
+    '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+    f'<sitemap><loc>{BASE}/sitemap-pages.xml.gz</loc></sitemap>'
+    '</sitemapindex>'
+).encode('utf-8')
+
+SITEMAP_PAGES = (
+    '<?xml version="1.0" encoding="UTF-8"?>'
+    '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+    f'<url><loc>{BASE}/</loc><priority>1.0</priority></url>'
+    f'<url><loc>{BASE}/masik</loc></url>'
+    '</urlset>'
+).encode('utf-8')
+
+
+def http_response(status, reason, headers, body):
+    head = f'HTTP/1.1 {status} {reason}\r\n' + ''.join(f'{name}: {value}\r\n' for name, value in headers)
+    return head.encode('ascii') + b'\r\n' + body
+
+
+def warc_record(uri, block, record_type='response'):
+    head = (
+        f'WARC/1.0\r\nWARC-Type: {record_type}\r\nWARC-Date: 2024-05-01T10:00:00Z\r\n'
+        f'WARC-Target-URI: {uri}\r\nContent-Type: application/http; msgtype={record_type}\r\n'
+        f'Content-Length: {len(block)}\r\n\r\n'
+    )
+    return head.encode('ascii') + block + b'\r\n\r\n'
+
+
+def archive_records():
+    html = [('Content-Type', 'text/html; charset=utf-8')]
+    xml = [('Content-Type', 'application/xml')]
+    return [
+        warc_record(f'{BASE}/', http_response(200, 'OK', html, PAGE)),
+        warc_record(f'{BASE}/', b'GET / HTTP/1.1\r\n\r\n', 'request'),
+        warc_record(f'{BASE}/masik', http_response(200, 'OK', html + [('Content-Encoding', 'gzip')],
+                                                   gzip.compress(PAGE))),
+        warc_record(f'{BASE}/regi', http_response(301, 'Moved Permanently', [('Location', '/')], b'')),
+        warc_record(f'{BASE}/robots.txt', http_response(200, 'OK', [('Content-Type', 'text/plain')],
+                                                        b'User-agent: *\nDisallow:\n')),
+        warc_record(f'{BASE}/sitemap_index.xml', http_response(200, 'OK', xml, SITEMAP_INDEX)),
+        warc_record(f'{BASE}/sitemap-pages.xml.gz',
+                    http_response(200, 'OK', [('Content-Type', 'application/gzip')], gzip.compress(SITEMAP_PAGES))),
+    ]
+
+
+@pytest.fixture(params=['plain', 'gzip'])
+def warc_path(request, tmp_path):
+    records = archive_records()
+    if request.param == 'gzip':
+        # Rekordonként külön gzip tag, ahogy a crawlerek írják
+        path = tmp_path / 'crawl.warc.gz'
+        path.write_bytes(b''.join(gzip.compress(record) for record in records))
+    else:
+        path = tmp_path / 'crawl.warc'
+        path.write_bytes(b''.join(records))
+    return str(path)
+
+
+@pytest.fixture
+def archive(warc_path, tmp_path):
+    archive = WARCArchive(warc_path, index_dir=str(tmp_path / 'index'))
+    yield archive
+    archive.close()
+
+
+def test_index_and_fetch(archive):
+    assert sorted(archive.html_urls()) == [f'{BASE}/', f'{BASE}/masik']
+    page = archive.fetch(f'{BASE}/masik')
+    assert page.status_code == 200
+    # A Content-Encoding dekódolva
+    assert page.content == PAGE
+    assert page.cache_status == 'replay'
+    assert page.archived_at == '2024-05-01T10:00:00Z'
+
+
+def test_redirect_and_missing(archive):
+    page = archive.fetch(f'{BASE}/regi')
+    assert page.url == f'{BASE}/'
+    assert page.status_code == 200
+    assert archive.fetch(f'{BASE}/nincs').status_code == 404
+
+
+def test_index_written_to_index_dir(warc_path, tmp_path):
+    index_dir = tmp_path / 'index'
+    WARCArchive(warc_path, index_dir=str(index_dir)).close()
+    assert [name for name in os.listdir(index_dir) if name.endswith('.seoidx')]
+    assert not [name for name in os.listdir(os.path.dirname(warc_path)) if name.endswith('.seoidx')]
+    # A második megnyitás a mentett indexet használja
+    reopened = WARCArchive(warc_path, index_dir=str(index_dir))
+    assert sorted(reopened.html_urls()) == [f'{BASE}/', f'{BASE}/masik']
+    reopened.close()
+
+
+def test_memory_only_index(warc_path, tmp_path):
+    archive = WARCArchive(warc_path, index_dir='')
+    assert len(archive) == 6
+    archive.close()
+    assert os.listdir(tmp_path) == [os.path.basename(warc_path)]
+
+
+def test_analysis_from_archive(archive):
+    analysis = AdvancedSEOAnalyzer(f'{BASE}/', http_client=archive).get_comprehensive_analysis()
+    assert 'error' not in analysis
+    assert analysis['title']['title'] == 'Archivált teszt oldal címe'
+    checks = analysis['seo_fundamentals']['checks']
+    assert checks['robots_txt']['exists']
+    assert checks['sitemap']['exists']
+
+
+def test_sitemap_urls_from_archive(archive):
+    analyzer = AdvancedSEOAnalyzer(f'{BASE}/', http_client=archive)
+    urls = [entry.loc for entry in analyzer.iter_sitemap_urls()]
+    assert sorted(urls) == [f'{BASE}/', f'{BASE}/masik']
+
+
+def test_replay_archive(warc_path, tmp_path):
+    results = dict(replay_archive(warc_path, workers=1, index_dir=str(tmp_path / 'index')))
+    assert sorted(results) == [f'{BASE}/', f'{BASE}/masik']
+    for analysis in results.values():
+        assert 'error' not in analysis
+        assert analysis['title']['title'] == 'Archivált teszt oldal címe'
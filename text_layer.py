@@ -0,0 +1,53 @@
+import re
+
+from parser_backends import join_strings
+
+_WORD_RE = re.compile(r'\S+')
+
+
+class TextLayer:
+    """Az oldal látható szövege egyszer kinyerve, a modulok közös használatára
+
+    A szöveg a látható darabok (script/style/noscript/template nélkül) szóközzel
+    összefűzve, a darabok szélén levő whitespace elhagyásával. A kisbetűs,
+    casefold, szólista és szó offset változatok első használatkor készülnek el.
+    """
+
+    def __init__(self, strings):
+        self.text = join_strings(strings, ' ', True)
+        self._lower = None
+        self._casefolded = None
+        self._words = None
+        self._word_offsets = None
+
+    @property
+    def lower(self):
+        """Kisbetűs szöveg a kulcsszó- és regex keresésekhez"""
+        if self._lower is None:
+            self._lower = self.text.lower()
+        return self._lower
+
+    @property
+    def casefolded(self):
+        """Casefold szöveg kis-nagybetű független összehasonlításhoz"""
+        if self._casefolded is None:
+            self._casefolded = self.text.casefold()
+        return self._casefolded
+
+    @property
+    def words(self):
+        """Szavak (whitespace mentén) sorrendben"""
+        if self._words is None:
+            self._words = self.text.split()
+        return self._words
+
+    @property
+    def word_offsets(self):
+        """(kezdet, vég) pozíciók a text-ben, a words elemeivel párban"""
+        if self._word_offsets is None:
+            self._word_offsets = [match.span() for match in _WORD_RE.finditer(self.text)]
+        return self._word_offsets
+
+    @property
+    def word_count(self):
+        return len(self.words)
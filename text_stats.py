@@ -0,0 +1,96 @@
+import re
+from collections import Counter
+
+# Szavak (Unicode betűk/számok, belső kötőjellel vagy aposztróffal) és mondatvég jelek egy regexben
+TOKEN_RE = re.compile(r"[.!?]+|\w+(?:['’-]\w+)*")
+SENTENCE_END_CHARS = '.!?'
+SENTENCE_BREAK = '.'
+
+STOP_WORDS = {
+    'hu': frozenset([
+        'a', 'az', 'és', 'de', 'hogy', 'ez', 'is', 'ki', 'be', 'el', 'fel', 'le', 'meg', 'át',
+        'egy', 'nem', 'van', 'vagy', 'mint', 'csak', 'még', 'már', 'volt', 'lesz', 'ezt', 'azt',
+        'ezek', 'azok', 'ahol', 'amely', 'amelyek', 'ami', 'amit', 'aki', 'akik', 'mert', 'majd',
+        'illetve', 'valamint', 'pedig', 'sem', 'nagyon', 'minden', 'több', 'után', 'előtt', 'alatt',
+        'között', 'szerint', 'által', 'lehet', 'kell', 'vannak', 'lett', 'itt', 'ott', 'ezért',
+        'mivel', 'amikor', 'hogyan', 'miért', 'melyek', 'saját', 'ilyen', 'olyan', 'arra', 'erre',
+        'ennek', 'annak', 'neki', 'nekünk', 'önnek', 'ön', 'mi', 'ti', 'ők', 'én', 'te',
+    ]),
+    'en': frozenset([
+        'a', 'an', 'the', 'and', 'or', 'but', 'if', 'of', 'to', 'in', 'on', 'at', 'by', 'for',
+        'with', 'from', 'into', 'about', 'than', 'then', 'that', 'this', 'these', 'those', 'there',
+        'here', 'what', 'which', 'who', 'whom', 'when', 'where', 'why', 'how', 'is', 'are', 'was',
+        'were', 'be', 'been', 'being', 'have', 'has', 'had', 'does', 'did', 'will', 'would',
+        'should', 'could', 'can', 'your', 'yours', 'their', 'they', 'them', 'our', 'ours', 'its',
+        'also', 'more', 'most', 'some', 'such', 'only', 'very', 'just', 'over', 'after', 'before',
+        'other', 'each', 'both', 'all', 'any', 'not', 'no', 'you', 'we', 'he', 'she', 'it',
+    ]),
+}
+DEFAULT_LANGUAGE = 'hu'
+
+
+def stop_words_for(language):
+    """Stop szó készlet a lang attribútum elsődleges része alapján (hu-HU -> hu), ismeretlennél magyar"""
+    primary = (language or '').strip().lower().replace('_', '-').split('-')[0]
+    return STOP_WORDS.get(primary, STOP_WORDS[DEFAULT_LANGUAGE])
+
+
+class TextStats:
+    """Tokenizálás és kulcsszó statisztika egyetlen menetben
+
+    A tokenek (kisbetűsen) egy regex futással készülnek, a mondatvég jelek is
+    tokenek, így a mondatszám és a mondathatáron át nem nyúló n-gramok ugyanebből
+    a listából jönnek. Az összesítés Counter-rel történik; kulcsszónak a
+    legalább min_length hosszú, nem stop szó tokenek számítanak.
+    """
+
+    def __init__(self, text, stop_words=STOP_WORDS[DEFAULT_LANGUAGE], min_length=4, ngram_sizes=(2, 3)):
+        self.stop_words = stop_words
+        self.min_length = min_length
+        tokens = TOKEN_RE.findall(text.lower())
+        self.sentence_breaks = sum(1 for token in tokens if token[0] in SENTENCE_END_CHARS)
+        if self.sentence_breaks:
+            # Minden mondatvég egységesen SENTENCE_BREAK, így az n-gram szűrés egy tartalmazás vizsgálat
+            tokens = [SENTENCE_BREAK if token[0] in SENTENCE_END_CHARS else token for token in tokens]
+            self.words = [token for token in tokens if token != SENTENCE_BREAK]
+        else:
+            self.words = tokens
+        self.word_count = len(self.words)
+        self.keywords = Counter(
+            token for token in self.words if len(token) >= min_length and token not in stop_words
+        )
+        # Az összes szomszédos tokencsoport C szinten számolódik; a szűrés csak a lekérdezett toplistán fut
+        self.ngrams = {size: Counter(zip(*(tokens[offset:] for offset in range(size)))) for size in ngram_sizes}
+
+    def _is_phrase(self, gram):
+        # Mondathatáron nem nyúlik át, és nem kezdődik/végződik stop szóval
+        return SENTENCE_BREAK not in gram and gram[0] not in self.stop_words and gram[-1] not in self.stop_words
+
+    @property
+    def sentence_count(self):
+        """Mondatok száma (mondatvég jel sorozatok + 1, mint a re.split darabszáma)"""
+        return self.sentence_breaks + 1
+
+    def top_keywords(self, limit=5):
+        return self.keywords.most_common(limit)
+
+    def top_ngrams(self, size, limit=5, min_count=2):
+        """Leggyakoribb kifejezések; az egyszer előforduló n-gram nem kifejezés, csak szomszédság"""
+        phrases = []
+        for gram, count in self.ngrams.get(size, Counter()).most_common():
+            if count < min_count or len(phrases) >= limit:
+                break
+            if self._is_phrase(gram):
+                phrases.append((' '.join(gram), count))
+        return phrases
+
+    def density(self, keyword):
+        """Kulcsszó sűrűség százalékban (előfordulás / szószám)"""
+        if not self.word_count:
+            return 0.0
+        return round(self.keywords.get(keyword, 0) / self.word_count * 100, 2)
+
+
+def zone_density(keywords, zones):
+    """Kulcsszavanként a sűrűség zónánként (pl. title, headings, body: zóna -> TextStats)"""
+    return {keyword: {zone: stats.density(keyword) for zone, stats in zones.items()} for keyword in keywords}
@@ -0,0 +1,468 @@
+import glob
+import hashlib
+import io
+import os
+import threading
+import urllib.parse
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from datetime import timedelta
+
+from requests.exceptions import TooManyRedirects
+from requests.structures import CaseInsensitiveDict
+
+from http_client import DEFAULT_MAX_BODY_BYTES, FetchedPage
+
+GZIP_MAGIC = b'\x1f\x8b'
+INDEX_SUFFIX = '.seoidx'
+INDEX_VERSION = 'seo-warc-index 1'
+# Az offset indexek helye (nem a WARC fájlok mellett); üres értéknél az index csak memóriában készül
+DEFAULT_INDEX_DIR = os.environ.get(
+    'SEO_WARC_INDEX_DIR',
+    os.path.join(os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache'), 'seo-analyzer', 'warc-index')
+)
+MAX_REDIRECTS = 10
+SCAN_CHUNK_SIZE = 1024 * 1024
+# Az indexeléshez elég a rekord eleje (WARC és HTTP fejlécek)
+HEAD_BYTES = 64 * 1024
+
+
+class IndexEntry:
+    """Egy rögzített válasz helye az archívumban"""
+
+    __slots__ = ('path', 'offset', 'length', 'status_code', 'content_type')
+
+    def __init__(self, path, offset, length, status_code, content_type):
+        self.path = path
+        self.offset = offset
+        self.length = length
+        self.status_code = status_code
+        self.content_type = content_type
+
+
+def _parse_headers(block):
+    """Fejléc sorok feldolgozása (első sor külön visszaadva)"""
+    lines = block.decode('iso-8859-1').split('\r\n')
+    headers = CaseInsensitiveDict()
+    raw = []
+    for line in lines[1:]:
+        if not line:
+            continue
+        if line[0] in ' \t' and raw:
+            # Folytatósor
+            name, value = raw[-1]
+            raw[-1] = (name, f"{value} {line.strip()}")
+            continue
+        name, _, value = line.partition(':')
+        raw.append((name.strip(), value.strip()))
+    for name, value in raw:
+        headers[name] = value
+    return lines[0], headers
+
+
+def parse_warc_record(data):
+    """WARC rekord szétbontása: (WARC fejlécek, tartalom blokk)"""
+    end = data.find(b'\r\n\r\n')
+    if end < 0 or not data.startswith(b'WARC/'):
+        raise ValueError('Érvénytelen WARC rekord')
+    _, headers = _parse_headers(data[:end])
+    length = int(headers.get('Content-Length', 0))
+    return headers, data[end + 4:end + 4 + length]
+
+
+def parse_http_response(block):
+    """Rögzített HTTP válasz: (státusz, indoklás, fejlécek, törzs)"""
+    end = block.find(b'\r\n\r\n')
+    if end < 0:
+        head, body = block, b''
+    else:
+        head, body = block[:end], block[end + 4:]
+    status_line, headers = _parse_headers(head)
+    parts = status_line.split(' ', 2)
+    status_code = int(parts[1]) if len(parts) > 1 and parts[1].isdigit() else 0
+    reason = parts[2] if len(parts) > 2 else ''
+    return status_code, reason, headers, body
+
+
+def _dechunk(body):
+    """Transfer-Encoding: chunked törzs visszaalakítása"""
+    parts = []
+    position = 0
+    while position < len(body):
+        line_end = body.find(b'\r\n', position)
+        if line_end < 0:
+            break
+        try:
+            size = int(body[position:line_end].split(b';')[0].strip(), 16)
+        except ValueError:
+            # Nem szabályos darabolás: a törzs változatlan
+            return body
+        if size == 0:
+            break
+        start = line_end + 2
+        parts.append(body[start:start + size])
+        position = start + size + 2
+    return b''.join(parts)
+
+
+def decode_body(headers, body):
+    """Átviteli és tartalom kódolás feloldása (chunked, gzip, deflate, br)"""
+    if 'chunked' in headers.get('Transfer-Encoding', '').lower():
+        body = _dechunk(body)
+    encoding = headers.get('Content-Encoding', '').lower().strip()
+    try:
+        if encoding in ('gzip', 'x-gzip'):
+            body = zlib.decompressobj(47).decompress(body)
+        elif encoding == 'deflate':
+            try:
+                body = zlib.decompress(body)
+            except zlib.error:
+                body = zlib.decompress(body, -zlib.MAX_WBITS)
+        elif encoding == 'br':
+            import brotli
+            body = brotli.decompress(body)
+    except Exception:
+        # Sérült kódolás vagy hiányzó brotli csomag: a nyers törzzsel dolgozunk tovább
+        pass
+    return body
+
+
+def _normalize_uri(uri):
+    return uri.strip().strip('<>')
+
+
+def _url_variants(url):
+    url = url.split('#', 1)[0]
+    yield url
+    yield url[:-1] if url.endswith('/') else url + '/'
+
+
+def _index_record(head, index, path, offset, length):
+    """Egy rekord indexbe vétele, ha HTTP válasz"""
+    try:
+        headers, block = parse_warc_record(head)
+    except ValueError:
+        return
+    if headers.get('WARC-Type', '').lower() != 'response':
+        return
+    if not headers.get('Content-Type', '').lower().startswith('application/http'):
+        return
+    uri = _normalize_uri(headers.get('WARC-Target-URI', ''))
+    if not uri:
+        return
+    status_code, _, http_headers, _ = parse_http_response(block)
+    content_type = http_headers.get('Content-Type', '').replace('\t', ' ')
+    # Ugyanannak az URL-nek több rögzítése esetén a legutolsó érvényes
+    index[uri] = IndexEntry(path, offset, length, status_code, content_type)
+
+
+def _scan_gzip(path, index):
+    """Rekordonként tömörített .warc.gz bejárása: minden gzip tag egy rekord"""
+    with open(path, 'rb') as warc:
+        offset = 0
+        pending = b''
+        while True:
+            if not pending:
+                pending = warc.read(SCAN_CHUNK_SIZE)
+                if not pending:
+                    return
+            decompressor = zlib.decompressobj(31)
+            head = b''
+            consumed = 0
+            while not decompressor.eof:
+                if not pending:
+                    pending = warc.read(SCAN_CHUNK_SIZE)
+                    if not pending:
+                        raise ValueError(f'Csonka gzip tag: {path} @ {offset}')
+                output = decompressor.decompress(pending)
+                if len(head) < HEAD_BYTES:
+                    head += output[:HEAD_BYTES - len(head)]
+                consumed += len(pending) - len(decompressor.unused_data)
+                pending = decompressor.unused_data
+            _index_record(head, index, path, offset, consumed)
+            offset += consumed
+
+
+def _scan_plain(path, index):
+    """Tömörítetlen .warc bejárása a Content-Length mezők alapján"""
+    with open(path, 'rb') as warc:
+        offset = 0
+        while True:
+            warc.seek(offset)
+            head = warc.read(HEAD_BYTES)
+            if not head.strip():
+                return
+            # Rekordok közötti üres sorok átugrása
+            stripped = head.lstrip(b'\r\n')
+            offset += len(head) - len(stripped)
+            head = stripped
+            end = head.find(b'\r\n\r\n')
+            if end < 0:
+                raise ValueError(f'Érvénytelen WARC rekord: {path} @ {offset}')
+            _, headers = _parse_headers(head[:end])
+            length = end + 4 + int(headers.get('Content-Length', 0))
+            _index_record(head, index, path, offset, length)
+            offset += length
+
+
+class ReplayResponse:
+    """Archivált válasz requests.Response-szerű felülettel (get(), pl. a sitemap streameléshez)"""
+
+    def __init__(self, url, status_code, reason, headers, content):
+        self.url = url
+        self.status_code = status_code
+        self.reason = reason
+        self.headers = CaseInsensitiveDict(headers or {})
+        self.content = content
+        # A törzs már dekódolt (Content-Encoding nélkül), a raw fájlszerűen olvasható
+        self.raw = io.BytesIO(content)
+
+    @property
+    def ok(self):
+        return self.status_code < 400
+
+    @property
+    def text(self):
+        return self.content.decode('utf-8', 'replace')
+
+    def close(self):
+        self.raw.close()
+
+
+class WARCArchive:
+    """WARC fájl(ok) mint oldalforrás: a rögzített válaszok offset index alapján, hálózat nélkül
+
+    A PooledHTTPClient fetch() felületét valósítja meg, így az elemző és az ellenőrzések
+    változtatás nélkül futnak rajta. Ami nincs az archívumban, arra 404 válasz érkezik.
+    """
+
+    def __init__(self, source, index_dir=DEFAULT_INDEX_DIR):
+        self.paths = self._resolve_paths(source)
+        if not self.paths:
+            raise ValueError(f'Nem található WARC fájl: {source}')
+        self.index_dir = index_dir
+        self.scheduler = None
+        self._index = {}
+        self._files = {}
+        self._lock = threading.Lock()
+        for path in self.paths:
+            self._index.update(self._load_or_build_index(path))
+
+    @staticmethod
+    def _resolve_paths(source):
+        sources = [source] if isinstance(source, (str, os.PathLike)) else list(source)
+        paths = []
+        for item in sources:
+            item = os.fspath(item)
+            if os.path.isdir(item):
+                for pattern in ('*.warc', '*.warc.gz'):
+                    paths.extend(glob.glob(os.path.join(item, '**', pattern), recursive=True))
+            elif os.path.isfile(item):
+                paths.append(item)
+        return sorted(set(os.path.abspath(path) for path in paths))
+
+    def _index_path(self, path):
+        if not self.index_dir:
+            return None
+        # Azonos nevű WARC fájlok különböző könyvtárakból ne írják felül egymás indexét
+        digest = hashlib.sha1(path.encode('utf-8')).hexdigest()[:16]
+        return os.path.join(self.index_dir, f"{os.path.basename(path)}.{digest}{INDEX_SUFFIX}")
+
+    @staticmethod
+    def _signature(path):
+        stat = os.stat(path)
+        return f"{INDEX_VERSION}\t{stat.st_size}\t{int(stat.st_mtime)}"
+
+    @staticmethod
+    def _read_index(path, index_path, signature):
+        try:
+            with open(index_path, 'r', encoding='utf-8') as index_file:
+                if index_file.readline().rstrip('\n') != signature:
+                    return None
+                index = {}
+                for line in index_file:
+                    uri, offset, length, status_code, content_type = line.rstrip('\n').split('\t')
+                    index[uri] = IndexEntry(path, int(offset), int(length), int(status_code), content_type)
+                return index
+        except (OSError, ValueError):
+            return None
+
+    def _load_or_build_index(self, path):
+        """Mentett index betöltése, ha a WARC azóta nem változott; különben újraépítés"""
+        index_path = self._index_path(path)
+        signature = self._signature(path)
+        if index_path is not None:
+            index = self._read_index(path, index_path, signature)
+            if index is not None:
+                return index
+
+        index = {}
+        with open(path, 'rb') as warc:
+            compressed = warc.read(2) == GZIP_MAGIC
+        if compressed:
+            _scan_gzip(path, index)
+        else:
+            _scan_plain(path, index)
+
+        if index_path is None:
+            return index
+        try:
+            os.makedirs(self.index_dir, exist_ok=True)
+            temp_path = f"{index_path}.{os.getpid()}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as index_file:
+                index_file.write(signature + '\n')
+                for uri, entry in index.items():
+                    index_file.write(f"{uri}\t{entry.offset}\t{entry.length}\t{entry.status_code}\t{entry.content_type}\n")
+            os.replace(temp_path, index_path)
+        except OSError:
+            # Nem írható index könyvtár: az index csak memóriában marad
+            pass
+        return index
+
+    def __len__(self):
+        return len(self._index)
+
+    def __contains__(self, url):
+        return self.lookup(url) is not None
+
+    def lookup(self, url):
+        """Indexbejegyzés keresése (a záró perjel eltérése megengedett)"""
+        for variant in _url_variants(url):
+            entry = self._index.get(variant)
+            if entry is not None:
+                return entry
+        return None
+
+    def html_urls(self):
+        """Az archívum sikeres HTML válaszainak URL-jei"""
+        return [uri for uri, entry in self._index.items()
+                if entry.status_code == 200 and 'html' in entry.content_type.lower()]
+
+    def _read(self, entry):
+        fd = self._files.get(entry.path)
+        if fd is None:
+            with self._lock:
+                fd = self._files.get(entry.path)
+                if fd is None:
+                    fd = self._files[entry.path] = os.open(entry.path, os.O_RDONLY)
+        # pread: szálbiztos, közös fájlmutató nélkül
+        data = os.pread(fd, entry.length, entry.offset)
+        if data[:2] == GZIP_MAGIC:
+            data = zlib.decompressobj(31).decompress(data)
+        return data
+
+    def read_response(self, entry):
+        """Rögzített válasz: (státusz, indoklás, fejlécek, dekódolt törzs, WARC dátum)"""
+        warc_headers, block = parse_warc_record(self._read(entry))
+        status_code, reason, headers, body = parse_http_response(block)
+        return status_code, reason, headers, decode_body(headers, body), warc_headers.get('WARC-Date')
+
+    def fetch(self, url, timeout=20, max_bytes=None, deadline=None, chunk_size=None, use_cache=True,
+              retry_policy=None, stop_at=None, verify=None, priority=False):
+        """Oldal visszajátszása az archívumból; az átirányításokat az archívumon belül követi
+
+        A PooledHTTPClient.fetch() paramétereit fogadja; a verify (nincs TLS) és a
+        priority (nincs host ütemezés) itt hatástalan.
+        """
+        max_bytes = DEFAULT_MAX_BODY_BYTES if max_bytes is None else max_bytes
+        current, response = self._replay(url)
+        if response is None:
+            return FetchedPage(current, 404, {}, b'', timedelta(0), reason='Nincs az archívumban',
+                               cache_status='replay')
+        status_code, reason, headers, body, archived_at = response
+        truncated_reason = 'max_bytes' if len(body) > max_bytes else None
+        body = body[:max_bytes]
+        match = stop_at.search(body) if stop_at is not None else None
+        if match is not None and match.end() < len(body):
+            body = body[:match.end()]
+            truncated_reason = 'stop_marker'
+        return FetchedPage(
+            url=current,
+            status_code=status_code,
+            headers=headers,
+            content=body,
+            elapsed=timedelta(0),
+            reason=reason,
+            ttfb=0.0,
+            download_time=0.0,
+            truncated=truncated_reason is not None,
+            truncated_reason=truncated_reason,
+            cache_status='replay',
+            archived_at=archived_at
+        )
+
+    def get(self, url, **kwargs):
+        """GET a PooledHTTPClient.get() helyett: ReplayResponse bájtkeret nélkül (a további paraméterek hatástalanok)"""
+        current, response = self._replay(url)
+        if response is None:
+            return ReplayResponse(current, 404, 'Nincs az archívumban', {}, b'')
+        status_code, reason, headers, body, _ = response
+        return ReplayResponse(current, status_code, reason, headers, body)
+
+    def _replay(self, url):
+        """Átirányítások követése az archívumon belül: (végső URL, read_response() eredménye vagy None)"""
+        current = url
+        for _ in range(MAX_REDIRECTS + 1):
+            entry = self.lookup(current)
+            if entry is None:
+                return current, None
+            response = self.read_response(entry)
+            location = response[2].get('Location')
+            if response[0] in (301, 302, 303, 307, 308) and location:
+                current = urllib.parse.urljoin(current, location)
+                continue
+            return current, response
+        raise TooManyRedirects(f'Túl sok átirányítás az archívumban: {url}')
+
+    @contextmanager
+    def host_slot(self, url, timeout=None, priority=False):
+        """Visszajátszásnál nincs host ütemezés"""
+        yield lambda *args, **kwargs: None
+
+    def close(self):
+        """Megnyitott WARC fájlok lezárása"""
+        with self._lock:
+            for fd in self._files.values():
+                os.close(fd)
+            self._files = {}
+
+
+_archives = {}
+_archives_lock = threading.Lock()
+
+
+def open_warc_archive(source, index_dir=DEFAULT_INDEX_DIR):
+    """Folyamat szinten gyorsítótárazott archívum (az index egyszer töltődik be)"""
+    paths = tuple(WARCArchive._resolve_paths(source))
+    key = (paths, index_dir)
+    with _archives_lock:
+        archive = _archives.get(key)
+        if archive is None:
+            archive = _archives[key] = WARCArchive(list(paths), index_dir)
+        return archive
+
+
+_worker_archive = None
+
+
+def _init_worker(paths, index_dir):
+    global _worker_archive
+    _worker_archive = open_warc_archive(paths, index_dir)
+
+
+def _analyze_url(url):
+    from app import AdvancedSEOAnalyzer
+    # A folyamatkészlet oldalanként párhuzamosít, az oldalon belüli modulok sorban futnak
+    analyzer = AdvancedSEOAnalyzer(url, http_client=_worker_archive, parallel_modules=False)
+    return analyzer.get_comprehensive_analysis()
+
+
+def replay_archive(source, urls=None, workers=None, chunksize=16, index_dir=DEFAULT_INDEX_DIR):
+    """Archivált oldalak elemzése folyamatkészlettel; (url, eredmény) párok a bemenet sorrendjében"""
+    # Az indexek egyszer, a szülő folyamatban épülnek fel; a munkafolyamatok a mentett indexet töltik be
+    archive = open_warc_archive(source, index_dir)
+    urls = list(urls) if urls is not None else archive.html_urls()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(archive.paths, index_dir)) as executor:
+        yield from zip(urls, executor.map(_analyze_url, urls, chunksize=chunksize))